@@ -0,0 +1,138 @@
+# benchmarks/bench_calendrier.py
+# mesure de la recherche de disponibilité sur toute la flotte avec le calendrier d'occupation numpy
+# (matrice véhicules x jours) contre l'index des réservations (une dichotomie par véhicule)
+#
+# structure:
+# - construit un parc de n véhicules (voitures, utilitaires, motos) et 4 réservations confirmées
+#   par véhicule réparties sur l'horizon, puis active le calendrier (730 jours par défaut)
+# - disponibles : véhicules libres d'un type sur des périodes tirées au hasard, réponse numpy
+#   (ids, au jour près) du calendrier contre une boucle de Parc.vehicule_disponible
+# - verifier_disponibilite : la même recherche par le Parc, sans puis avec calendrier
+# - mise à jour : ajout puis annulation d'une réservation (une ligne de la matrice réécrite)
+#
+# utilisation:
+#   python benchmarks/bench_calendrier.py
+#   python benchmarks/bench_calendrier.py 10000 50000
+
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+# ajout du répertoire parent au path pour les imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from model.parc import Parc
+from model.reservation import Reservation
+from model.vehicule import Voiture, Utilitaire, Moto
+
+
+TAILLES_PAR_DEFAUT = [50000]
+NB_JOURS = 730
+NB_RESERVATIONS_PAR_VEHICULE = 4
+NB_REQUETES = 50
+ORIGINE = datetime(2025, 1, 1)
+
+
+def construire_parc(taille):
+    """
+    parc de taille véhicules (un tiers de chaque type) et de leurs réservations confirmées,
+    sans chevauchement par véhicule (une réservation par tranche de l'horizon)
+    """
+    parc = Parc()
+    vehicules = []
+    for i in range(1, taille + 1):
+        if i % 3 == 0:
+            vehicule = Utilitaire(id=i, marque="Renault", modele="Master", annee=2020, kilometrage=40000,
+                                  prix_achat=25000, cout_entretien_annuel=1500, volume=12,
+                                  charge_utile=1200, hayon=True)
+        elif i % 3 == 1:
+            vehicule = Voiture(id=i, marque="Renault", modele="Clio", annee=2020, kilometrage=15000,
+                               prix_achat=15000, cout_entretien_annuel=600, nb_places=5, puissance=90,
+                               carburant="Essence", options=[])
+        else:
+            vehicule = Moto(id=i, marque="Yamaha", modele="MT-07", annee=2022, kilometrage=5000,
+                            prix_achat=7000, cout_entretien_annuel=400, cylindree=690, type_moto="Roadster")
+        vehicules.append(vehicule)
+    parc.vehicules = vehicules
+
+    tranche = NB_JOURS // NB_RESERVATIONS_PAR_VEHICULE
+    reservations = []
+    for vehicule in vehicules:
+        for k in range(NB_RESERVATIONS_PAR_VEHICULE):
+            debut = ORIGINE + timedelta(days=k * tranche + random.randrange(tranche - 15), hours=random.randrange(24))
+            reservations.append(Reservation(
+                id=len(reservations) + 1, client_id=1, vehicule_id=vehicule.id, date_debut=debut,
+                date_fin=debut + timedelta(days=random.randrange(1, 14)), prix_total=100.0))
+    parc.reservations = reservations
+    return parc
+
+
+def periodes_aleatoires():
+    """périodes de 1 à 14 jours dans l'horizon"""
+    periodes = []
+    for _ in range(NB_REQUETES):
+        debut = ORIGINE + timedelta(days=random.randrange(NB_JOURS - 15), hours=random.randrange(24))
+        periodes.append((debut, debut + timedelta(days=random.randrange(1, 14))))
+    return periodes
+
+
+def chronometrer(fonction, periodes):
+    """durée moyenne (en millisecondes) de fonction(debut, fin) sur les périodes"""
+    debut_mesure = time.perf_counter()
+    for debut, fin in periodes:
+        fonction(debut, fin)
+    return (time.perf_counter() - debut_mesure) / len(periodes) * 1000
+
+
+def executer(tailles):
+    """
+    lance la mesure pour chaque taille et affiche un tableau récapitulatif
+    """
+    for taille in tailles:
+        parc = construire_parc(taille)
+        voitures = parc._index_vehicules.du_type("Voiture")
+        periodes = periodes_aleatoires()
+
+        def boucle_index(debut, fin):
+            return [vehicule.id for vehicule in voitures if parc.vehicule_disponible(vehicule.id, debut, fin)]
+
+        def verifier(debut, fin):
+            return parc.verifier_disponibilite("Voiture", {}, debut, fin)
+
+        duree_boucle = chronometrer(boucle_index, periodes)
+        duree_verifier_sans = chronometrer(verifier, periodes)
+
+        debut_mesure = time.perf_counter()
+        calendrier = parc.activer_calendrier(origine=ORIGINE, nb_jours=NB_JOURS)
+        duree_construction = time.perf_counter() - debut_mesure
+
+        duree_calendrier = chronometrer(lambda debut, fin: calendrier.disponibles("Voiture", debut, fin), periodes)
+        duree_verifier_avec = chronometrer(verifier, periodes)
+
+        # libre au jour près => libre à l'heure près
+        for debut, fin in periodes[:5]:
+            assert set(calendrier.disponibles("Voiture", debut, fin).tolist()) <= set(boucle_index(debut, fin))
+
+        reservation = Reservation(id=0, client_id=1, vehicule_id=1, date_debut=ORIGINE + timedelta(days=700),
+                                  date_fin=ORIGINE + timedelta(days=705), prix_total=100.0)
+        debut_mesure = time.perf_counter()
+        parc.reservations.append(reservation)
+        reservation.annuler()
+        duree_mise_a_jour = (time.perf_counter() - debut_mesure) * 1000
+
+        print(f"{taille} véhicules x {NB_JOURS} jours, {len(parc.reservations)} réservations "
+              f"(matrice {calendrier._bits[:calendrier._nb_lignes].nbytes / 1e6:.1f} Mo, "
+              f"construite en {duree_construction:.2f} s)")
+        print(f"  voitures libres, boucle de dichotomies    : {duree_boucle:8.2f} ms par requête")
+        print(f"  voitures libres, calendrier (au jour près) : {duree_calendrier:8.2f} ms par requête")
+        print(f"  verifier_disponibilite sans calendrier     : {duree_verifier_sans:8.2f} ms par requête")
+        print(f"  verifier_disponibilite avec calendrier     : {duree_verifier_avec:8.2f} ms par requête")
+        print(f"  ajout puis annulation d'une réservation    : {duree_mise_a_jour:8.2f} ms")
+
+
+if __name__ == "__main__":
+    random.seed(0)
+    tailles = [int(arg) for arg in sys.argv[1:]] or TAILLES_PAR_DEFAUT
+    executer(tailles)
@@ -0,0 +1,101 @@
+# benchmarks/bench_chargement_parc.py
+# mesure du temps de chargement du parc en fonction de sa taille
+#
+# structure:
+# - remplit une base sqlite temporaire avec n véhicules (insertion directe en sql)
+# - compare l'ancien chargement "n+1" (SELECT id puis charger_vehicule par ligne)
+#   avec le chargement en masse de Database.charger_tous_vehicules
+#
+# utilisation:
+#   python benchmarks/bench_chargement_parc.py
+#   python benchmarks/bench_chargement_parc.py 1000 5000 20000
+
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+# ajout du répertoire parent au path pour les imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.database import Database
+
+
+TAILLES_PAR_DEFAUT = [1000, 5000, 20000]
+
+
+def remplir_parc(db, nb_vehicules):
+    """
+    insère nb_vehicules voitures directement en sql (on ne mesure pas l'écriture ici)
+
+    args:
+        db (Database): base de données cible
+        nb_vehicules (int): nombre de véhicules à insérer
+    """
+    lignes = []
+    for i in range(nb_vehicules):
+        attributs = {
+            "nb_places": 5,
+            "puissance": random.randint(70, 250),
+            "carburant": random.choice(["Essence", "Diesel", "Hybride"]),
+            "options": ["GPS"] if i % 2 else []
+        }
+        lignes.append(("Voiture", "Renault", "Clio", 2020, 10000, 15000.0, 800.0, "Voiture",
+                       json.dumps(attributs)))
+
+    db.cursor.executemany("""
+    INSERT INTO vehicules
+    (type, marque, modele, annee, kilometrage, prix_achat,
+    cout_entretien_annuel, categorie, attributs_specifiques)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, lignes)
+    db.conn.commit()
+
+
+def charger_n_plus_un(db):
+    """
+    reproduit l'ancien chargement : une requête pour les ids puis une par véhicule
+    """
+    db.cursor.execute('SELECT id FROM vehicules')
+    return [db.charger_vehicule(row['id']) for row in db.cursor.fetchall()]
+
+
+def mesurer(fonction, *args):
+    """
+    renvoie la durée d'exécution (en secondes) et le résultat de fonction(*args)
+    """
+    debut = time.perf_counter()
+    resultat = fonction(*args)
+    return time.perf_counter() - debut, resultat
+
+
+def executer(tailles):
+    """
+    lance la mesure pour chaque taille de parc et affiche un tableau récapitulatif
+    """
+    print(f"{'véhicules':>10} | {'n+1 (s)':>9} | {'en masse (s)':>12} | {'gain':>6}")
+    print("-" * 48)
+
+    for taille in tailles:
+        fichier = tempfile.NamedTemporaryFile(delete=False, suffix='.db')
+        fichier.close()
+        db = Database(fichier.name)
+        try:
+            remplir_parc(db, taille)
+
+            duree_ancienne, anciens = mesurer(charger_n_plus_un, db)
+            duree_masse, nouveaux = mesurer(db.charger_tous_vehicules)
+            assert len(anciens) == len(nouveaux) == taille
+
+            gain = duree_ancienne / duree_masse if duree_masse else float('inf')
+            print(f"{taille:>10} | {duree_ancienne:>9.3f} | {duree_masse:>12.3f} | {gain:>5.1f}x")
+        finally:
+            db.fermer()
+            os.unlink(fichier.name)
+
+
+if __name__ == "__main__":
+    tailles = [int(arg) for arg in sys.argv[1:]] or TAILLES_PAR_DEFAUT
+    executer(tailles)
@@ -0,0 +1,92 @@
+# benchmarks/bench_dates_reservations.py
+# mesure du coût de décodage des dates lors de l'hydratation des réservations
+#
+# structure:
+# - compare le décodage de l'ancien format texte (datetime.strptime) avec le format
+#   entier actuel (decoder_date) sur n paires de dates
+# - mesure le chargement complet de n réservations d'un véhicule via la DAL
+#
+# utilisation:
+#   python benchmarks/bench_dates_reservations.py
+#   python benchmarks/bench_dates_reservations.py 100000 1000000
+
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# ajout du répertoire parent au path pour les imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.database import Database, decoder_date, encoder_date
+
+
+TAILLES_PAR_DEFAUT = [10000, 100000]
+
+
+def mesurer_decodage(nb_lignes):
+    """
+    renvoie (durée strptime, durée decoder_date) pour nb_lignes paires de dates
+    """
+    origine = datetime(2020, 1, 1)
+    textes = [(origine + timedelta(hours=i)).strftime('%Y-%m-%d %H:%M:%S') for i in range(nb_lignes)]
+    entiers = [encoder_date(origine + timedelta(hours=i)) for i in range(nb_lignes)]
+
+    debut = time.perf_counter()
+    for texte in textes:
+        datetime.strptime(texte, '%Y-%m-%d %H:%M:%S')
+        datetime.strptime(texte, '%Y-%m-%d %H:%M:%S')
+    duree_texte = time.perf_counter() - debut
+
+    debut = time.perf_counter()
+    for entier in entiers:
+        decoder_date(entier)
+        decoder_date(entier)
+    duree_entier = time.perf_counter() - debut
+
+    return duree_texte, duree_entier
+
+
+def mesurer_chargement(nb_lignes):
+    """
+    renvoie la durée de charger_reservations_vehicule pour nb_lignes réservations
+    """
+    fichier = tempfile.NamedTemporaryFile(delete=False, suffix='.db')
+    fichier.close()
+    db = Database(fichier.name)
+    try:
+        origine = encoder_date(datetime(2020, 1, 1))
+        db.conn.executemany(
+            "INSERT INTO reservations (client_id, vehicule_id, date_debut, date_fin, prix_total, statut) "
+            "VALUES (1, 1, ?, ?, 100.0, 'terminée')",
+            ((origine + i * 3600, origine + i * 3600 + 86400) for i in range(nb_lignes))
+        )
+        db.conn.commit()
+
+        debut = time.perf_counter()
+        reservations = db.charger_reservations_vehicule(1)
+        duree = time.perf_counter() - debut
+        assert len(reservations) == nb_lignes
+        return duree
+    finally:
+        db.fermer()
+        os.unlink(fichier.name)
+
+
+def executer(tailles):
+    """
+    lance les mesures et affiche un tableau récapitulatif
+    """
+    print(f"{'lignes':>9} | {'strptime (s)':>12} | {'entier (s)':>10} | {'gain':>6} | {'chargement DAL (s)':>18}")
+    print("-" * 68)
+    for taille in tailles:
+        duree_texte, duree_entier = mesurer_decodage(taille)
+        duree_chargement = mesurer_chargement(taille)
+        gain = duree_texte / duree_entier if duree_entier else float('inf')
+        print(f"{taille:>9} | {duree_texte:>12.3f} | {duree_entier:>10.3f} | {gain:>5.1f}x | {duree_chargement:>18.3f}")
+
+
+if __name__ == "__main__":
+    tailles = [int(arg) for arg in sys.argv[1:]] or TAILLES_PAR_DEFAUT
+    executer(tailles)
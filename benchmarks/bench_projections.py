@@ -0,0 +1,120 @@
+# benchmarks/bench_projections.py
+# mesure du temps et de la mémoire des listes affichées par les écrans, objets complets
+# contre projections (tuples nommés limités aux colonnes affichées)
+#
+# structure:
+# - remplit une base sqlite temporaire avec n véhicules, n clients et une réservation par client
+# - véhicules : charger_tous_vehicules (objets, json décodé) contre projeter_vehicules
+#   avec les colonnes du tableau des voitures de ReservationScreen
+# - clients : lister_clients (objets et historique) contre projeter_clients (id, nom, prénom)
+# - la mémoire est le pic mesuré par tracemalloc pendant le chargement (résultat compris)
+#
+# utilisation:
+#   python benchmarks/bench_projections.py
+#   python benchmarks/bench_projections.py 10000 100000
+
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# ajout du répertoire parent au path pour les imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.database import Database
+
+
+TAILLES_PAR_DEFAUT = [100000]
+
+# colonnes du tableau des voitures (ReservationScreen._ATTRIBUTS_TABLEAU, sans la disponibilité)
+COLONNES_VOITURES = ("id", "marque", "modele", "annee", "carburant", "puissance", "nb_places")
+
+
+def remplir_base(db, taille):
+    """
+    insère taille voitures, taille clients et une réservation par client directement en sql
+
+    args:
+        db (Database): base de données cible
+        taille (int): nombre de véhicules et de clients
+    """
+    vehicules = []
+    for i in range(taille):
+        attributs = {
+            "nb_places": 5,
+            "puissance": random.randint(70, 250),
+            "carburant": random.choice(["Essence", "Diesel", "Hybride"]),
+            "options": ["GPS", "Climatisation"] if i % 2 else []
+        }
+        vehicules.append(("Voiture", "Renault", "Clio", 2020, 10000, 15000.0, 800.0, "Voiture",
+                          json.dumps(attributs)))
+
+    with db.transaction():
+        db.conn.executemany("""
+        INSERT INTO vehicules
+        (type, marque, modele, annee, kilometrage, prix_achat,
+        cout_entretien_annuel, categorie, attributs_specifiques)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, vehicules)
+        db.conn.executemany(
+            "INSERT INTO clients (nom, prenom, adresse, telephone, email) VALUES (?, ?, ?, ?, ?)",
+            ((f"Nom{i}", f"Prenom{i}", f"{i} rue des Tests", "01 23 45 67 89", f"client{i}@test.com")
+             for i in range(taille)))
+        db.conn.executemany(
+            "INSERT INTO reservations (client_id, vehicule_id, date_debut, date_fin, prix_total, statut) "
+            "VALUES (?, ?, ?, ?, ?, 'terminée')",
+            ((i + 1, i + 1, 1700000000, 1700086400, 100.0) for i in range(taille)))
+
+
+def mesurer(fonction, *args):
+    """
+    renvoie la durée (en secondes), le pic de mémoire (en octets) et le résultat de fonction(*args)
+    """
+    tracemalloc.start()
+    debut = time.perf_counter()
+    resultat = fonction(*args)
+    duree = time.perf_counter() - debut
+    pic = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return duree, pic, resultat
+
+
+def executer(tailles):
+    """
+    lance la mesure pour chaque taille et affiche un tableau récapitulatif
+    """
+    print(f"{'lignes':>8} | {'liste':<9} | {'objets (s)':>10} | {'proj. (s)':>9} | "
+          f"{'objets (Mo)':>11} | {'proj. (Mo)':>10}")
+    print("-" * 74)
+
+    for taille in tailles:
+        fichier = tempfile.NamedTemporaryFile(delete=False, suffix='.db')
+        fichier.close()
+        db = Database(fichier.name)
+        try:
+            remplir_base(db, taille)
+
+            cas = [
+                ("véhicules", (db.charger_tous_vehicules,), (db.projeter_vehicules, COLONNES_VOITURES)),
+                ("clients", (db.lister_clients,), (db.projeter_clients,)),
+            ]
+            for nom, objets, projection in cas:
+                duree_objets, pic_objets, anciens = mesurer(*objets)
+                del anciens
+                duree_projection, pic_projection, lignes = mesurer(*projection)
+                assert len(lignes) == taille
+                del lignes
+
+                print(f"{taille:>8} | {nom:<9} | {duree_objets:>10.3f} | {duree_projection:>9.3f} | "
+                      f"{pic_objets / 1e6:>11.1f} | {pic_projection / 1e6:>10.1f}")
+        finally:
+            db.fermer()
+            os.unlink(fichier.name)
+
+
+if __name__ == "__main__":
+    tailles = [int(arg) for arg in sys.argv[1:]] or TAILLES_PAR_DEFAUT
+    executer(tailles)
@@ -171,19 +171,39 @@ class ClientController:
             return []
 
 
-    def lister_tous_clients(self):
+    def lister_tous_clients(self, avec_historique=True):
         """
         Récupère tous les clients de la base de données
 
+        Args:
+            avec_historique (bool): False pour ne pas charger les réservations
+                (suffisant pour afficher les noms)
+
         Returns:
             list: Liste des objets Client
         """
         try:
-            return self.db.lister_clients()  # ou la méthode équivalente dans ta DB
+            return self.db.lister_clients(avec_historique=avec_historique)
         except Exception as e:
             print(f"Erreur lors de la récupération des clients: {e}")
             return []
 
+    def projeter_clients(self, colonnes=("id", "nom", "prenom")):
+        """
+        récupère seulement quelques colonnes des clients (ex: sélection d'un client par son nom).
+
+        args:
+            colonnes (iterable): colonnes de la table clients
+
+        returns:
+            list: tuples nommés des colonnes demandées
+        """
+        try:
+            return self.db.projeter_clients(colonnes)
+        except Exception as e:
+            print(f"erreur lors de la lecture des clients: {e}")
+            return []
+
     def obtenir_client(self, client_id):
         """
         récupère un client par son id.
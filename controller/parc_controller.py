@@ -5,7 +5,8 @@
 # structure:
 # - importe les modèles parc et les types de vehicules (voiture, utilitaire, moto)
 # - définit la classe parccontroller avec méthodes pour ajouter, supprimer, mettre à jour et rechercher des véhicules
-# - gère la vérification de disponibilité et l'optimisation du parc
+# - gère la vérification de disponibilité et l'optimisation du parc : le parc charge les réservations
+#   confirmées et répond par ses index, rattrapés par le journal des modifications (synchroniser)
 # - calcule les statistiques sur l'état du parc
 #
 # interactions:
@@ -48,24 +49,36 @@ class ParcController:
         charge tous les véhicules et réservations depuis la base de données.
         """
         try:
+            # position du journal avant le chargement : une écriture concurrente sera rejouée
+            # par synchroniser (sans effet si elle est déjà visible)
+            self.parc.seq_journal = self.db.dernier_seq_journal()
+
             # chargement des véhicules
             vehicules = self.db.charger_tous_vehicules()
             for vehicule in vehicules:
                 self.parc.ajouter_vehicule(vehicule)
 
-            # chargement des réservations actives
-            # dans une implémentation complète, il faudrait adapter cette méthode
-            # selon les fonctionnalités de la base de données
-            self.parc.reservations = []  # réinitialisation
-
-            # la méthode à implémenter dans database pourrait être:
-            # reservations = self.db.charger_reservations_actives()
-            # for reservation in reservations:
-            #     self.parc.reservations.append(reservation)
+            # chargement des réservations confirmées, seules indexées pour la disponibilité ;
+            # les autres écritures arrivent ensuite par synchroniser
+            self.parc.reservations = self.db.charger_reservations_confirmees()
 
         except Exception as e:
             print(f"erreur lors du chargement du parc: {e}")
 
+    def synchroniser(self):
+        """
+        met à jour le parc en mémoire avec les modifications faites en base depuis le dernier
+        chargement (autre contrôleur, autre processus), sans tout recharger.
+
+        returns:
+            int: nombre d'objets mis à jour
+        """
+        try:
+            return self.parc.synchroniser(self.db)
+        except Exception as e:
+            print(f"erreur lors de la synchronisation du parc: {e}")
+            return 0
+
     def ajouter_vehicule(self, type_vehicule, **kwargs):
         """
         ajoute un nouveau véhicule au parc.
@@ -242,10 +255,7 @@ class ParcController:
             self.db.sauvegarder_vehicule(vehicule)
 
             # mise à jour du parc
-            for i, v in enumerate(self.parc.vehicules):
-                if v.id == vehicule_id:
-                    self.parc.vehicules[i] = vehicule
-                    break
+            self.parc.remplacer_vehicule(vehicule)
 
             return vehicule
 
@@ -265,9 +275,9 @@ class ParcController:
         """
         try:
             # recherche d'abord dans le parc (pour éviter d'interroger la base de données)
-            for vehicule in self.parc.vehicules:
-                if vehicule.id == vehicule_id:
-                    return vehicule
+            vehicule = self.parc.obtenir_vehicule(vehicule_id)
+            if vehicule is not None:
+                return vehicule
 
             # si non trouvé dans le parc, interroger la base de données
             return self.db.charger_vehicule(vehicule_id)
@@ -281,7 +291,8 @@ class ParcController:
         recherche des véhicules selon certains critères.
 
         args:
-            criteres (dict, optional): critères de recherche
+            criteres (dict ou str, optional): critères de recherche, ou requête texte
+                (ex: "puissance>=100 carburant=Diesel options~GPS", voir model/requete.py)
 
         returns:
             list: liste des véhicules correspondant aux critères
@@ -306,11 +317,34 @@ class ParcController:
             list: liste des véhicules disponibles
         """
         try:
+            # index du parc, rattrapés sur les écritures faites en base depuis le dernier appel
+            self.synchroniser()
             return self.parc.verifier_disponibilite(type_vehicule, criteres, date_debut, date_fin)
         except Exception as e:
             print(f"erreur lors de la vérification de disponibilité: {e}")
             return []
 
+    def projeter_vehicules(self, colonnes, criteres=None, date_debut=None, date_fin=None,
+                           disponibles_seulement=False):
+        """
+        récupère seulement les colonnes affichées des véhicules (écrans de liste).
+
+        args:
+            colonnes (iterable): colonnes voulues, "disponible" compris (voir Database.projeter_vehicules)
+            criteres (dict, optional): critères de recherche
+            date_debut (datetime, optional): début de la période de disponibilité
+            date_fin (datetime, optional): fin de la période de disponibilité
+            disponibles_seulement (bool): ne garder que les véhicules libres sur la période
+
+        returns:
+            list: tuples nommés des colonnes demandées
+        """
+        try:
+            return self.db.projeter_vehicules(colonnes, criteres, date_debut, date_fin, disponibles_seulement)
+        except Exception as e:
+            print(f"erreur lors de la lecture des véhicules: {e}")
+            return []
+
     def verifier_disponibilite_vehicule(self, vehicule_id, date_debut, date_fin, reservation_id_a_exclure=None):
         """
         vérifie si un véhicule spécifique est disponible pour une période donnée.
@@ -330,25 +364,9 @@ class ParcController:
             if not vehicule:
                 return False
 
-            # vérification des réservations existantes
-            for reservation in self.parc.reservations:
-                # ignorer la réservation à exclure
-                if reservation_id_a_exclure and reservation.id == reservation_id_a_exclure:
-                    continue
-
-                # ignorer les réservations qui ne concernent pas ce véhicule
-                if reservation.vehicule_id != vehicule_id:
-                    continue
-
-                # ignorer les réservations annulées
-                if reservation.statut == "annulée":
-                    continue
-
-                # vérifier le chevauchement de périodes
-                if not (reservation.date_fin < date_debut or reservation.date_debut > date_fin):
-                    return False
-
-            return True
+            # recherche d'une réservation confirmée qui chevauche la période, dans l'index du parc
+            self.synchroniser()
+            return self.parc.vehicule_disponible(vehicule_id, date_debut, date_fin, reservation_id_a_exclure)
 
         except Exception as e:
             print(f"erreur lors de la vérification de disponibilité: {e}")
@@ -387,55 +405,26 @@ class ParcController:
             dict: statistiques du parc
         """
         try:
-            # statistiques par type de véhicule
-            stats_par_type = {
-                "Voiture": 0,
-                "Utilitaire": 0,
-                "Moto": 0
-            }
-
-            # âge moyen par type
-            age_total_par_type = {
-                "Voiture": 0,
-                "Utilitaire": 0,
-                "Moto": 0
-            }
-
-            # valeur totale du parc
-            valeur_totale = 0
+            # agrégats par type tenus à jour en base : quelques lignes lues au lieu de parcourir le parc
+            agregats = self.db.charger_statistiques_parc()
 
             # année courante pour calculer l'âge
             annee_courante = datetime.now().year
 
-            # parcours des véhicules
-            for vehicule in self.parc.vehicules:
-                # détermination du type
-                if isinstance(vehicule, Voiture):
-                    type_vehicule = "Voiture"
-                elif isinstance(vehicule, Utilitaire):
-                    type_vehicule = "Utilitaire"
-                elif isinstance(vehicule, Moto):
-                    type_vehicule = "Moto"
-                else:
-                    continue
-
-                # incrémentation du compteur
-                stats_par_type[type_vehicule] += 1
-
-                # cumul de l'âge
-                age_total_par_type[type_vehicule] += (annee_courante - vehicule.annee)
-
-                # cumul de la valeur
-                valeur_totale += vehicule.prix_achat
-
-            # calcul des âges moyens
+            stats_par_type = {}
             age_moyen_par_type = {}
-            for type_vehicule, total in age_total_par_type.items():
-                if stats_par_type[type_vehicule] > 0:
-                    age_moyen_par_type[type_vehicule] = total / stats_par_type[type_vehicule]
+            for type_vehicule in ("Voiture", "Utilitaire", "Moto"):
+                agregat = agregats.get(type_vehicule)
+                nombre = agregat["nb_vehicules"] if agregat else 0
+                stats_par_type[type_vehicule] = nombre
+                if nombre > 0:
+                    age_moyen_par_type[type_vehicule] = annee_courante - agregat["somme_annees"] / nombre
                 else:
                     age_moyen_par_type[type_vehicule] = 0
 
+            # valeur totale du parc
+            valeur_totale = sum(agregat["valeur_totale"] for agregat in agregats.values())
+
             # construction du résultat
             statistiques = {
                 "nombre_total_vehicules": sum(stats_par_type.values()),
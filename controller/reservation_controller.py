@@ -67,23 +67,17 @@ class ReservationController:
             if not vehicule:
                 raise ValueError(f"Véhicule {vehicule_id} non trouvé")
 
-            # Vérification de disponibilité avant création
-            if not self.parc_controller.verifier_disponibilite_vehicule(vehicule_id, date_debut, date_fin):
-                raise ValueError("Véhicule non disponible pour cette période")
-
-            # Génération d'un ID unique pour la réservation
-            reservation_id = self._generer_id_reservation()
-
-            # Création de la réservation
-            reservation = Reservation(reservation_id, client_id, vehicule_id, date_debut, date_fin)
+            # Création de la réservation (l'id est attribué par la base à l'enregistrement)
+            reservation = Reservation(None, client_id, vehicule_id, date_debut, date_fin)
 
             # NOUVEAU: Calcul automatique du prix selon la durée
             prix_calcule = reservation.calculer_prix(vehicule)
             print(f"Prix calculé pour {reservation.calculer_duree_jours()} jours: {prix_calcule}€")
 
-            # Sauvegarde en base de données
-            if hasattr(self, 'db') and self.db:
-                self.db.sauvegarder_reservation(reservation)
+            # Vérification de disponibilité et sauvegarde en une seule transaction :
+            # un autre poste qui réserve le même véhicule en même temps ne peut pas passer entre les deux
+            if not self.db.reserver_atomiquement(reservation):
+                raise ValueError("Véhicule non disponible pour cette période")
 
             # Ajout au parc
             self.parc_controller.parc.reservations.append(reservation)
@@ -104,20 +98,6 @@ class ReservationController:
             print(f"Erreur création réservation: {e}")
             raise e
 
-    def _generer_id_reservation(self):
-        """Génère un ID unique pour la réservation"""
-        try:
-            # Récupérer l'ID max existant
-            existing_ids = []
-            if hasattr(self.parc_controller, 'parc') and self.parc_controller.parc.reservations:
-                existing_ids = [r.id for r in self.parc_controller.parc.reservations if hasattr(r, 'id')]
-
-            return max(existing_ids, default=0) + 1
-        except:
-            # Fallback: utiliser timestamp
-            from datetime import datetime
-            return int(datetime.now().timestamp()) % 10000
-
     def obtenir_devis(self, vehicule_id, date_debut, date_fin):
         """
         Calcule un devis sans créer la réservation
@@ -278,44 +258,53 @@ class ReservationController:
             reservation: réservation modifiée, ou none en cas d'erreur
         """
         try:
-            # chargement de la réservation
-            reservation = self.db.charger_reservation(reservation_id)
-            if not reservation or reservation.statut != "confirmée":
-                return None
-
             # validation des nouvelles dates
             if nouvelle_date_debut >= nouvelle_date_fin:
                 print("la date de fin doit être postérieure à la date de début")
                 return None
 
-            # vérification de la disponibilité du véhicule pour les nouvelles dates
-            # on exclut la réservation actuelle de la vérification
-            if self.parc_controller and not self._verifier_disponibilite(
-                    reservation.vehicule_id,
-                    nouvelle_date_debut,
-                    nouvelle_date_fin,
-                    reservation_id
-            ):
-                print("le véhicule n'est pas disponible pour cette nouvelle période")
-                return None
-
-            # anciennes dates (pour recalculer le prix)
-            ancienne_date_debut = reservation.date_debut
-            ancienne_date_fin = reservation.date_fin
-
-            # mise à jour des dates
-            reservation.date_debut = nouvelle_date_debut
-            reservation.date_fin = nouvelle_date_fin
-
-            # recalcul du prix si la durée a changé
-            if (nouvelle_date_fin - nouvelle_date_debut).days != (ancienne_date_fin - ancienne_date_debut).days:
-                if self.parc_controller:
-                    vehicule = self.parc_controller.obtenir_vehicule(reservation.vehicule_id)
-                    if vehicule:
-                        reservation.calculer_prix(vehicule)
+            # vérification de la disponibilité (la réservation actuelle exclue) et sauvegarde en une
+            # seule transaction, comme reserver_atomiquement : une réservation du même véhicule faite
+            # par un autre poste ne peut pas passer entre les deux
+            with self.db.transaction():
+                # chargement de la réservation
+                reservation = self.db.charger_reservation(reservation_id)
+                if not reservation or reservation.statut != "confirmée":
+                    return None
+
+                if not self.db.vehicule_disponible(reservation.vehicule_id, nouvelle_date_debut,
+                                                   nouvelle_date_fin, reservation_id):
+                    print("le véhicule n'est pas disponible pour cette nouvelle période")
+                    return None
+
+                # anciennes dates (pour recalculer le prix)
+                ancienne_date_debut = reservation.date_debut
+                ancienne_date_fin = reservation.date_fin
+
+                # mise à jour des dates
+                reservation.date_debut = nouvelle_date_debut
+                reservation.date_fin = nouvelle_date_fin
+
+                # recalcul du prix si la durée a changé
+                if (nouvelle_date_fin - nouvelle_date_debut).days != (ancienne_date_fin - ancienne_date_debut).days:
+                    if self.parc_controller:
+                        vehicule = self.parc_controller.obtenir_vehicule(reservation.vehicule_id)
+                        if vehicule:
+                            reservation.calculer_prix(vehicule)
+
+                # sauvegarde des modifications
+                self.db.sauvegarder_reservation(reservation)
 
-            # sauvegarde des modifications
-            self.db.sauvegarder_reservation(reservation)
+            if self.parc_controller:
+                # l'index de disponibilité du parc suit l'objet du parc, qui n'est pas forcément
+                # celui relu en base : c'est lui qui reçoit les nouvelles dates puis est réindexé
+                parc = self.parc_controller.parc
+                reservation_parc = parc.obtenir_reservation(reservation_id)
+                if reservation_parc is not None:
+                    reservation_parc.date_debut = reservation.date_debut
+                    reservation_parc.date_fin = reservation.date_fin
+                    reservation_parc.prix_total = reservation.prix_total
+                    parc.reindexer_reservation(reservation_parc)
 
             # récupération de la réservation mise à jour
             return self.db.charger_reservation(reservation_id)
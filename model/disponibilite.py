@@ -0,0 +1,169 @@
+# model/disponibilite.py
+# ce fichier implémente l'index de disponibilité des véhicules utilisé par la classe Parc
+#
+# structure:
+# - IndexDisponibilite range les réservations confirmées par véhicule, triées par date de début,
+#   avec pour chaque position la plus grande date de fin rencontrée jusque-là : un véhicule est
+#   libre sur [debut, fin] si les réservations commençant avant fin se terminent toutes avant
+#   debut, soit une recherche dichotomique (O(log n)) au lieu d'un parcours de toutes les réservations
+# - Parc.reservations est une ListeIndexee (model/index_parc.py) qui tient cet index à jour
+# - un calendrier d'occupation (model/occupation.py), s'il est activé, suit les mêmes ajouts et retraits
+#
+# interactions:
+# - l'index observe les réservations indexées (pattern Observer de Reservation) : une annulation
+#   ou une terminaison les retire de l'index
+# - un changement de dates doit être signalé par Parc.reindexer_reservation
+
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+
+
+class IndexDisponibilite:
+    """
+    réservations confirmées par véhicule, pour tester la disponibilité en O(log n)
+
+    chaque véhicule a une liste de clés (date_debut, date_fin, numéro) triée et la liste des
+    maxima courants des dates de fin (fins_max[i] = plus grande date de fin des clés 0..i)
+    """
+
+    STATUT_INDEXE = "confirmée"
+
+    def __init__(self):
+        """
+        initialise un index vide
+        """
+        # vehicule_id -> (clés triées, maxima courants des dates de fin)
+        self._calendriers = {}
+        # id(reservation) -> (vehicule_id, clé, réservation) pour retirer une réservation
+        # même après un changement de ses dates
+        self._entrees = {}
+        # CalendrierOccupation tenu à jour avec l'index (voir Parc.activer_calendrier)
+        self.calendrier = None
+
+    def ajouter(self, reservation):
+        """
+        indexe une réservation si elle est confirmée (et pas déjà indexée)
+
+        Args:
+            reservation (Reservation): réservation à indexer
+
+        Returns:
+            bool: True si la réservation a été indexée
+        """
+        if reservation.statut != self.STATUT_INDEXE or id(reservation) in self._entrees:
+            return False
+
+        cles, fins_max = self._calendriers.setdefault(reservation.vehicule_id, ([], []))
+        cle = (reservation.date_debut, reservation.date_fin, id(reservation))
+        position = bisect_left(cles, cle)
+        cles.insert(position, cle)
+        fins_max.insert(position, None)
+        self._recalculer_fins_max(cles, fins_max, position)
+
+        self._entrees[id(reservation)] = (reservation.vehicule_id, cle, reservation)
+        reservation.ajouter_observateur(self)
+        if self.calendrier is not None:
+            self.calendrier.ajouter(reservation)
+        return True
+
+    def retirer(self, reservation):
+        """
+        retire une réservation de l'index
+
+        Args:
+            reservation (Reservation): réservation à retirer
+
+        Returns:
+            bool: True si la réservation était indexée
+        """
+        entree = self._entrees.pop(id(reservation), None)
+        if entree is None:
+            return False
+
+        vehicule_id, cle, _ = entree
+        cles, fins_max = self._calendriers[vehicule_id]
+        position = bisect_left(cles, cle)
+        del cles[position]
+        del fins_max[position]
+        if cles:
+            self._recalculer_fins_max(cles, fins_max, position)
+        else:
+            del self._calendriers[vehicule_id]
+
+        reservation.supprimer_observateur(self)
+        if self.calendrier is not None:
+            self.calendrier.retirer(reservation)
+        return True
+
+    def reconstruire(self, reservations):
+        """
+        vide l'index puis indexe toutes les réservations confirmées de la liste
+
+        Args:
+            reservations (list): réservations du parc
+        """
+        for _, _, reservation in self._entrees.values():
+            reservation.supprimer_observateur(self)
+        self._calendriers.clear()
+        self._entrees.clear()
+
+        for reservation in reservations:
+            if reservation.statut == self.STATUT_INDEXE and id(reservation) not in self._entrees:
+                cle = (reservation.date_debut, reservation.date_fin, id(reservation))
+                self._calendriers.setdefault(reservation.vehicule_id, ([], []))[0].append(cle)
+                self._entrees[id(reservation)] = (reservation.vehicule_id, cle, reservation)
+                reservation.ajouter_observateur(self)
+
+        # un tri par véhicule plutôt qu'une insertion triée par réservation
+        for cles, fins_max in self._calendriers.values():
+            cles.sort()
+            fins_max.extend([None] * len(cles))
+            self._recalculer_fins_max(cles, fins_max, 0)
+
+        if self.calendrier is not None:
+            self.calendrier.reconstruire(reservation for _, _, reservation in self._entrees.values())
+
+    def est_libre(self, vehicule_id, date_debut, date_fin, exclue=None):
+        """
+        vérifie qu'aucune réservation confirmée du véhicule ne chevauche la période
+        (bornes incluses, comme Reservation.est_en_conflit_avec)
+
+        Args:
+            vehicule_id (int): id du véhicule
+            date_debut (datetime): début de la période
+            date_fin (datetime): fin de la période
+            exclue (Reservation, optional): réservation ignorée (modification de ses dates)
+
+        Returns:
+            bool: True si le véhicule est libre sur toute la période
+        """
+        calendrier = self._calendriers.get(vehicule_id)
+        if calendrier is None:
+            return True
+
+        cles, fins_max = calendrier
+        # réservations commençant au plus tard à date_fin
+        nb_candidates = bisect_right(cles, (date_fin, datetime.max, float('inf')))
+        if nb_candidates == 0 or fins_max[nb_candidates - 1] < date_debut:
+            return True
+        if exclue is None:
+            return False
+        # une réservation chevauche : libre seulement si c'est la réservation exclue
+        return all(cle[1] < date_debut or cle[2] == id(exclue) for cle in cles[:nb_candidates])
+
+    def mettre_a_jour(self, reservation, type_evenement, ancien_statut, nouveau_statut):
+        """
+        observateur des réservations indexées : seules les réservations confirmées restent indexées
+        """
+        if nouveau_statut != self.STATUT_INDEXE:
+            self.retirer(reservation)
+
+    @staticmethod
+    def _recalculer_fins_max(cles, fins_max, position):
+        """recalcule les maxima courants des dates de fin à partir d'une position"""
+        courant = fins_max[position - 1] if position > 0 else None
+        for i in range(position, len(cles)):
+            fin = cles[i][1]
+            courant = fin if courant is None or fin > courant else courant
+            fins_max[i] = courant
+
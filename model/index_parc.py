@@ -0,0 +1,416 @@
+# model/index_parc.py
+# ce fichier implémente les index en mémoire de la classe Parc
+#
+# structure:
+# - ListeIndexee : liste (Parc.vehicules, Parc.reservations) qui tient un index à jour à chaque
+#   modification ; ajouts, retraits et remplacements d'un élément sont reportés un par un,
+#   les modifications globales (tranches, tri, vidage) reconstruisent l'index ; une table
+#   id -> position retrouve un élément par son id (position) sans parcourir la liste
+# - IndexVehicules : dictionnaire id -> véhicule et un groupe par type (Voiture, Utilitaire, Moto),
+#   pour trouver un véhicule ou les véhicules d'un type sans parcourir tout le parc
+# - index secondaires d'IndexVehicules, construits à la première condition portant sur un attribut
+#   puis tenus à jour : liste triée (valeur, véhicule) pour les comparaisons (recherche dichotomique),
+#   index inversé valeur -> véhicules pour les conditions =, in (carburant, marque, hayon) et ~
+#   (options) ; filtrer intersecte les ensembles de candidats
+#
+# interactions:
+# - un index fournit ajouter(objet), retirer(objet) et reconstruire(objets)
+#   (IndexVehicules ici, IndexDisponibilite dans model/disponibilite.py)
+# - un véhicule du parc modifié sur place doit être signalé par Parc.reindexer_vehicule
+# - le calendrier d'occupation (model/occupation.py), s'il est activé, suit les types des véhicules
+# - filtrer reçoit une requête compilée (model/requete.py), qui évalue les conditions qu'aucun
+#   index ne sait traiter
+
+from bisect import bisect_left, bisect_right, insort
+
+from model.requete import Requete, valeur_attribut
+from model.vehicule import Vehicule
+
+# opérateur de comparaison -> (début, fin) des clés (valeur, id) qui le satisfont dans une liste triée
+_BORNES = {
+    '>=': lambda cles, valeur: (bisect_left(cles, (valeur,)), len(cles)),
+    '>': lambda cles, valeur: (bisect_right(cles, (valeur, float('inf'))), len(cles)),
+    '<=': lambda cles, valeur: (0, bisect_right(cles, (valeur, float('inf')))),
+    '<': lambda cles, valeur: (0, bisect_left(cles, (valeur,))),
+}
+_ABSENTE = object()
+
+
+class ListeIndexee(list):
+    """
+    liste qui reporte ses modifications sur un index
+    """
+
+    def __init__(self, objets, index):
+        """
+        Args:
+            objets (iterable): éléments initiaux
+            index: index à tenir à jour (ajouter, retirer, reconstruire)
+        """
+        super().__init__(objets)
+        self._index = index
+        # objet.id -> position du premier élément de cet id, None à recalculer après un décalage
+        self._positions = None
+        index.reconstruire(self)
+
+    def position(self, objet_id):
+        """
+        position d'un élément par son id, sans parcourir la liste (sauf après un retrait ou une
+        insertion au milieu, eux-mêmes en O(n), qui font recalculer la table à l'appel suivant)
+
+        Args:
+            objet_id (int): id de l'objet cherché
+
+        Returns:
+            int: position du premier élément de cet id, ou None
+        """
+        if self._positions is None:
+            self._positions = {}
+            for position, objet in enumerate(self):
+                self._positions.setdefault(objet.id, position)
+        return self._positions.get(objet_id)
+
+    def _noter_ajout(self, objet, position):
+        if self._positions is not None:
+            self._positions.setdefault(objet.id, position)
+
+    def append(self, objet):
+        super().append(objet)
+        self._noter_ajout(objet, len(self) - 1)
+        self._index.ajouter(objet)
+
+    def insert(self, position, objet):
+        super().insert(position, objet)
+        if position < len(self) - 1:
+            # insertion au milieu : l'ordre des groupes de l'index suit celui de la liste
+            self._positions = None
+            self._index.reconstruire(self)
+        else:
+            self._noter_ajout(objet, len(self) - 1)
+            self._index.ajouter(objet)
+
+    def extend(self, objets):
+        objets = list(objets)
+        debut = len(self)
+        super().extend(objets)
+        for position, objet in enumerate(objets, debut):
+            self._noter_ajout(objet, position)
+            self._index.ajouter(objet)
+
+    def __iadd__(self, objets):
+        self.extend(objets)
+        return self
+
+    def remove(self, objet):
+        super().remove(objet)
+        self._positions = None
+        self._index.retirer(objet)
+
+    def pop(self, *args):
+        objet = super().pop(*args)
+        if self._positions is not None and self._positions.get(objet.id) == len(self):
+            # dernier élément : les autres positions ne bougent pas
+            del self._positions[objet.id]
+        else:
+            self._positions = None
+        self._index.retirer(objet)
+        return objet
+
+    def __setitem__(self, position, valeur):
+        if isinstance(position, slice):
+            super().__setitem__(position, valeur)
+            self._positions = None
+            self._index.reconstruire(self)
+        else:
+            ancien = self[position]
+            super().__setitem__(position, valeur)
+            if ancien.id != valeur.id:
+                self._positions = None
+            self._index.retirer(ancien)
+            self._index.ajouter(valeur)
+
+    def _reconstruire_apres(nom):
+        """modification globale de la liste suivie d'une reconstruction de l'index"""
+        methode = getattr(list, nom)
+
+        def modifier(self, *args, **kwargs):
+            resultat = methode(self, *args, **kwargs)
+            self._positions = None
+            self._index.reconstruire(self)
+            return resultat
+        modifier.__name__ = nom
+        return modifier
+
+    clear = _reconstruire_apres('clear')
+    sort = _reconstruire_apres('sort')
+    reverse = _reconstruire_apres('reverse')
+    __delitem__ = _reconstruire_apres('__delitem__')
+    del _reconstruire_apres
+
+
+class IndexVehicules:
+    """
+    véhicules du parc par id et par type
+
+    les groupes par type gardent l'ordre d'ajout des véhicules ; un véhicule appartient au groupe
+    de sa classe et de ses classes parentes (même règle que isinstance)
+    """
+
+    def __init__(self):
+        """
+        initialise un index vide
+        """
+        self._par_id = {}
+        # nom de classe -> {id(vehicule): vehicule} (dict : ordre d'insertion, retrait en O(1))
+        self._par_type = {}
+        # id(vehicule) -> rang d'ajout, pour rendre les résultats de filtrer dans l'ordre d'ajout
+        self._rangs = {}
+        self._prochain_rang = 0
+        # attribut -> (liste triée de (valeur, id(vehicule)), {id(vehicule): valeur}),
+        # ou None si les valeurs ne sont pas comparables entre elles
+        self._tries = {}
+        # attribut -> ({(element_de_liste, valeur): ids}, {id(vehicule): clés indexées})
+        self._inverses = {}
+        # CalendrierOccupation tenu à jour avec l'index (voir Parc.activer_calendrier)
+        self.calendrier = None
+
+    @staticmethod
+    def _types(vehicule):
+        """noms des classes de véhicule dont le véhicule est une instance"""
+        return [classe.__name__ for classe in type(vehicule).__mro__
+                if issubclass(classe, Vehicule) and classe is not Vehicule]
+
+    def ajouter(self, vehicule):
+        """
+        indexe un véhicule (le premier véhicule d'un id reste celui renvoyé par obtenir)
+
+        Args:
+            vehicule (Vehicule): véhicule ajouté au parc
+        """
+        self._par_id.setdefault(vehicule.id, vehicule)
+        for nom_type in self._types(vehicule):
+            self._par_type.setdefault(nom_type, {})[id(vehicule)] = vehicule
+        if self.calendrier is not None:
+            self.calendrier.ajouter_vehicule(vehicule)
+        if id(vehicule) in self._rangs:
+            return
+        self._rangs[id(vehicule)] = self._prochain_rang
+        self._prochain_rang += 1
+        for attribut in self._tries:
+            self._indexer_trie(attribut, vehicule)
+        for attribut in self._inverses:
+            self._indexer_inverse(attribut, vehicule)
+
+    def retirer(self, vehicule):
+        """
+        retire un véhicule de l'index
+
+        Args:
+            vehicule (Vehicule): véhicule retiré du parc
+        """
+        if self._par_id.get(vehicule.id) is vehicule:
+            del self._par_id[vehicule.id]
+        for nom_type in self._types(vehicule):
+            self._par_type.get(nom_type, {}).pop(id(vehicule), None)
+        if self.calendrier is not None and vehicule.id not in self._par_id:
+            self.calendrier.retirer_vehicule(vehicule)
+        if self._rangs.pop(id(vehicule), None) is None:
+            return
+        for attribut, index in self._tries.items():
+            if index is not None and id(vehicule) in index[1]:
+                valeur = index[1].pop(id(vehicule))
+                del index[0][bisect_left(index[0], (valeur, id(vehicule)))]
+        for valeurs, cles_par_vehicule in self._inverses.values():
+            for cle in cles_par_vehicule.pop(id(vehicule), ()):
+                valeurs[cle].discard(id(vehicule))
+                if not valeurs[cle]:
+                    del valeurs[cle]
+
+    def reconstruire(self, vehicules):
+        """
+        réindexe toute la liste des véhicules
+
+        Args:
+            vehicules (list): véhicules du parc
+        """
+        self._par_id.clear()
+        self._par_type.clear()
+        self._rangs.clear()
+        # les index secondaires seront reconstruits au prochain critère qui les utilise
+        self._tries.clear()
+        self._inverses.clear()
+        if self.calendrier is not None:
+            self.calendrier.reconstruire_vehicules(())
+        for vehicule in vehicules:
+            self.ajouter(vehicule)
+
+    def reindexer(self, vehicule):
+        """
+        reprend dans l'index un véhicule modifié sur place (même rang dans les résultats de filtrer)
+
+        Args:
+            vehicule (Vehicule): véhicule du parc dont les attributs ont changé
+        """
+        rang = self._rangs.get(id(vehicule))
+        if rang is None:
+            return
+        self.retirer(vehicule)
+        self.ajouter(vehicule)
+        self._rangs[id(vehicule)] = rang
+
+    def obtenir(self, vehicule_id):
+        """
+        Returns:
+            Vehicule: le véhicule de cet id, ou None
+        """
+        return self._par_id.get(vehicule_id)
+
+    def contient(self, vehicule):
+        """
+        Returns:
+            bool: True si cet objet véhicule est dans le parc
+        """
+        return any(id(vehicule) in self._par_type.get(nom_type, {}) for nom_type in self._types(vehicule))
+
+    def du_type(self, nom_type):
+        """
+        Args:
+            nom_type (str): 'Voiture', 'Utilitaire' ou 'Moto'
+
+        Returns:
+            list: véhicules de ce type, dans l'ordre d'ajout
+        """
+        return list(self._par_type.get(nom_type, {}).values())
+
+    def filtrer(self, nom_type, requete):
+        """
+        véhicules d'un type satisfaisant une requête : les ensembles de candidats des conditions
+        indexables sont intersectés (du plus petit au plus grand), puis les autres conditions
+        ne sont évaluées que sur les véhicules restants
+
+        Args:
+            nom_type (str): 'Voiture', 'Utilitaire' ou 'Moto'
+            requete (Requete): requête compilée (model/requete.py)
+
+        Returns:
+            list: véhicules correspondants, dans l'ordre d'ajout
+        """
+        groupe = self._par_type.get(nom_type, {})
+        if not requete:
+            return list(groupe.values())
+
+        ensembles = []
+        restantes = []
+        for condition in requete.conditions:
+            candidats = self._candidats(condition)
+            if candidats is None:
+                restantes.append(condition)
+            else:
+                ensembles.append(candidats)
+
+        if ensembles:
+            ensembles.sort(key=len)
+            ids = set(ensembles[0]).intersection(groupe, *ensembles[1:])
+            vehicules = [groupe[i] for i in sorted(ids, key=self._rangs.__getitem__)]
+        else:
+            vehicules = list(groupe.values())
+
+        if restantes:
+            vehicules = Requete(restantes).filtrer(vehicules)
+        return vehicules
+
+    def _candidats(self, condition):
+        """
+        ids des véhicules qui satisfont une condition, ou None si aucun index ne sait la traiter
+
+        Args:
+            condition (Condition): condition d'une requête compilée
+
+        Returns:
+            set: ids (id(vehicule)) des véhicules candidats, ou None
+        """
+        attribut, operateur, valeur = condition
+        if operateur in _BORNES:
+            index = self._index_trie(attribut)
+            if index is None:
+                return None
+            cles = index[0]
+            try:
+                debut, fin = _BORNES[operateur](cles, valeur)
+            except TypeError:
+                return None
+            return {cle[1] for cle in cles[debut:fin]}
+
+        valeurs_cherchees = valeur if operateur == 'in' else (valeur,)
+        if operateur not in ('=', 'in', '~') or not all(_hachable(v) for v in valeurs_cherchees):
+            return None
+        valeurs = self._index_inverse(attribut)[0]
+        candidats = set()
+        for v in valeurs_cherchees:
+            # = : valeur égale, ou contenue dans un attribut liste ; ~ : contenue ; in : valeur égale
+            if operateur != '~':
+                candidats |= valeurs.get((False, v), set())
+            if operateur != 'in':
+                candidats |= valeurs.get((True, v), set())
+        return candidats
+
+    def _index_trie(self, attribut):
+        """liste triée des valeurs d'un attribut, construite au premier appel"""
+        if attribut not in self._tries:
+            self._tries[attribut] = ([], {})
+            for vehicule in self._tous():
+                self._indexer_trie(attribut, vehicule)
+        return self._tries[attribut]
+
+    def _index_inverse(self, attribut):
+        """index inversé des valeurs d'un attribut, construit au premier appel"""
+        if attribut not in self._inverses:
+            self._inverses[attribut] = ({}, {})
+            for vehicule in self._tous():
+                self._indexer_inverse(attribut, vehicule)
+        return self._inverses[attribut]
+
+    def _tous(self):
+        """véhicules indexés, chacun une fois"""
+        vus = {}
+        for groupe in self._par_type.values():
+            vus.update(groupe)
+        return vus.values()
+
+    def _indexer_trie(self, attribut, vehicule):
+        """ajoute un véhicule à la liste triée d'un attribut (valeurs absentes ou None ignorées)"""
+        index = self._tries[attribut]
+        valeur = valeur_attribut(vehicule, attribut)
+        if index is None or valeur is None:
+            return
+        try:
+            insort(index[0], (valeur, id(vehicule)))
+        except TypeError:
+            # valeurs non comparables : critère évalué véhicule par véhicule
+            self._tries[attribut] = None
+            return
+        index[1][id(vehicule)] = valeur
+
+    def _indexer_inverse(self, attribut, vehicule):
+        """ajoute un véhicule à l'index inversé d'un attribut (chaque élément pour une liste)"""
+        valeur = valeur_attribut(vehicule, attribut, _ABSENTE)
+        if valeur is _ABSENTE:
+            return
+        # une valeur None ne satisfait aucune condition (comme NULL en sql) : pas de clé
+        if isinstance(valeur, list):
+            cles = {(True, element) for element in valeur if _hachable(element)}
+        else:
+            cles = {(False, valeur)} if valeur is not None and _hachable(valeur) else set()
+        valeurs, cles_par_vehicule = self._inverses[attribut]
+        for cle in cles:
+            valeurs.setdefault(cle, set()).add(id(vehicule))
+        cles_par_vehicule[id(vehicule)] = cles
+
+
+def _hachable(valeur):
+    """True si la valeur peut servir de clé de dictionnaire"""
+    try:
+        hash(valeur)
+    except TypeError:
+        return False
+    return True
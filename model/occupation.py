@@ -0,0 +1,333 @@
+# model/occupation.py
+# ce fichier implémente le calendrier d'occupation de la flotte pour les planificateurs :
+# une matrice de bits véhicules x jours sur un horizon glissant (730 jours par défaut)
+#
+# structure:
+# - CalendrierOccupation : une ligne par véhicule, un bit par jour (tableau numpy uint8 compacté par
+#   np.packbits, 92 octets par véhicule sur deux ans), à 1 si une réservation confirmée occupe le jour
+# - une réservation occupe tous les jours de sa date de début à sa date de fin (bornes incluses) ;
+#   seule la partie comprise dans l'horizon est marquée
+# - la disponibilité de tous les véhicules d'un type sur une période est une tranche de colonnes
+#   de la matrice réduite par ligne (disponibles), sans boucle python par véhicule
+# - ajout, annulation ou terminaison d'une réservation ne réécrivent que la ligne du véhicule ;
+#   reconstruire et avancer (déplacement de l'horizon) recalculent toute la matrice en vectorisé
+#
+# interactions:
+# - tenu à jour par IndexDisponibilite (réservations confirmées) et IndexVehicules (types des
+#   véhicules) une fois activé par Parc.activer_calendrier
+# - résolution au jour : un véhicule libre au jour près est libre, un véhicule occupé au jour près
+#   peut encore être libre à l'heure près (Parc.verifier_disponibilite le confirme par l'index
+#   des réservations)
+# - numpy est optionnel : il n'est importé qu'à l'utilisation (ImportError explicite sinon)
+
+from datetime import date, datetime
+
+# codes entiers des types de véhicule (même ordre que utils/colonnes.py)
+TYPES_VEHICULE = ('Voiture', 'Utilitaire', 'Moto')
+
+
+def _numpy():
+    """
+    importe numpy à la demande
+
+    Raises:
+        ImportError: si numpy n'est pas installé
+    """
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError("le calendrier d'occupation nécessite numpy (pip install numpy)")
+    return numpy
+
+
+def _jour(instant):
+    """numéro de jour (ordinal) d'une date ou d'un datetime"""
+    return (instant.date() if isinstance(instant, datetime) else instant).toordinal()
+
+
+def code_type(vehicule):
+    """
+    Returns:
+        int: indice dans TYPES_VEHICULE de la classe du véhicule (ou d'une classe parente), -1 sinon
+    """
+    for classe in type(vehicule).__mro__:
+        if classe.__name__ in TYPES_VEHICULE:
+            return TYPES_VEHICULE.index(classe.__name__)
+    return -1
+
+
+class CalendrierOccupation:
+    """
+    occupation jour par jour des véhicules sur un horizon glissant
+
+    Attributes:
+        origine (date): premier jour de l'horizon
+        nb_jours (int): nombre de jours de l'horizon
+    """
+
+    def __init__(self, origine=None, nb_jours=730):
+        """
+        Args:
+            origine (date ou datetime, optional): premier jour de l'horizon (aujourd'hui par défaut)
+            nb_jours (int): longueur de l'horizon en jours
+
+        Raises:
+            ImportError: si numpy n'est pas installé
+        """
+        self._np = _numpy()
+        self.origine = date.fromordinal(_jour(origine or date.today()))
+        self.nb_jours = nb_jours
+        self._nb_octets = (nb_jours + 7) // 8
+
+        # vehicule_id -> ligne de la matrice (créée au premier véhicule ou à la première réservation)
+        self._lignes = {}
+        self._nb_lignes = 0
+        self._ids = self._np.zeros(0, dtype=self._np.int64)
+        # code du type (TYPES_VEHICULE), -1 si le véhicule n'est pas (ou plus) dans le parc
+        self._types = self._np.zeros(0, dtype=self._np.int8)
+        self._bits = self._np.zeros((0, self._nb_octets), dtype=self._np.uint8)
+        # vehicule_id -> {id(reservation): (premier jour, dernier jour)} en ordinaux
+        self._periodes = {}
+        # id(reservation) -> vehicule_id au moment de l'ajout (retrait après un changement de véhicule)
+        self._vehicule_reservation = {}
+
+    # véhicules
+
+    def _ligne(self, vehicule_id):
+        """ligne du véhicule, créée (type inconnu, aucun jour occupé) au besoin"""
+        ligne = self._lignes.get(vehicule_id)
+        if ligne is None:
+            ligne = self._nb_lignes
+            if ligne == len(self._ids):
+                # capacité doublée : ajout amorti en O(1)
+                capacite = max(2 * ligne, 64)
+                self._ids = self._np.resize(self._ids, capacite)
+                self._types = self._np.resize(self._types, capacite)
+                bits = self._np.zeros((capacite, self._nb_octets), dtype=self._np.uint8)
+                bits[:ligne] = self._bits[:ligne]
+                self._bits = bits
+            self._ids[ligne] = vehicule_id
+            self._types[ligne] = -1
+            self._bits[ligne] = 0
+            self._lignes[vehicule_id] = ligne
+            self._nb_lignes += 1
+        return ligne
+
+    def ajouter_vehicule(self, vehicule):
+        """
+        enregistre le type d'un véhicule du parc
+
+        Args:
+            vehicule (Vehicule): véhicule ajouté au parc
+        """
+        # ligne obtenue avant l'indexation : sa création peut réallouer les tableaux
+        ligne = self._ligne(vehicule.id)
+        self._types[ligne] = code_type(vehicule)
+
+    def retirer_vehicule(self, vehicule):
+        """
+        exclut un véhicule retiré du parc des recherches par type (ses réservations restent)
+
+        Args:
+            vehicule (Vehicule): véhicule retiré du parc
+        """
+        ligne = self._lignes.get(vehicule.id)
+        if ligne is not None:
+            self._types[ligne] = -1
+
+    def reconstruire_vehicules(self, vehicules):
+        """
+        Args:
+            vehicules (list): véhicules du parc
+        """
+        self._types[:self._nb_lignes] = -1
+        for vehicule in vehicules:
+            self.ajouter_vehicule(vehicule)
+
+    # réservations confirmées
+
+    def ajouter(self, reservation):
+        """
+        marque les jours d'une réservation confirmée
+
+        Args:
+            reservation (Reservation): réservation confirmée
+        """
+        periode = (_jour(reservation.date_debut), _jour(reservation.date_fin))
+        self._periodes.setdefault(reservation.vehicule_id, {})[id(reservation)] = periode
+        self._vehicule_reservation[id(reservation)] = reservation.vehicule_id
+        ligne = self._ligne(reservation.vehicule_id)
+        jours = self._np.unpackbits(self._bits[ligne], count=self.nb_jours)
+        self._marquer(jours, *periode)
+        self._bits[ligne] = self._np.packbits(jours)
+
+    def retirer(self, reservation):
+        """
+        libère les jours d'une réservation (annulée, terminée ou retirée du parc) ; les jours
+        occupés par une autre réservation du véhicule le restent
+
+        Args:
+            reservation (Reservation): réservation retirée
+        """
+        vehicule_id = self._vehicule_reservation.pop(id(reservation), None)
+        if vehicule_id is None:
+            return
+        periodes = self._periodes[vehicule_id]
+        del periodes[id(reservation)]
+        jours = self._np.zeros(self.nb_jours, dtype=self._np.uint8)
+        for periode in periodes.values():
+            self._marquer(jours, *periode)
+        self._bits[self._lignes[vehicule_id]] = self._np.packbits(jours)
+
+    def reconstruire(self, reservations):
+        """
+        Args:
+            reservations (iterable): réservations confirmées du parc
+        """
+        self._periodes = {}
+        self._vehicule_reservation = {}
+        for reservation in reservations:
+            self._periodes.setdefault(reservation.vehicule_id, {})[id(reservation)] = (
+                _jour(reservation.date_debut), _jour(reservation.date_fin))
+            self._vehicule_reservation[id(reservation)] = reservation.vehicule_id
+        self._remplir()
+
+    def avancer(self, origine=None):
+        """
+        déplace l'horizon (ex: chaque nuit) ; les jours sortis de l'horizon sont oubliés,
+        les jours entrés sont remplis depuis les réservations connues
+
+        Args:
+            origine (date ou datetime, optional): nouveau premier jour (aujourd'hui par défaut)
+        """
+        self.origine = date.fromordinal(_jour(origine or date.today()))
+        self._remplir()
+
+    def _marquer(self, jours, premier, dernier):
+        """met à 1 les jours [premier, dernier] (ordinaux) compris dans l'horizon d'une ligne dépliée"""
+        debut = max(premier - self.origine.toordinal(), 0)
+        fin = min(dernier - self.origine.toordinal(), self.nb_jours - 1)
+        if debut <= fin:
+            jours[debut:fin + 1] = 1
+
+    def _remplir(self):
+        """recalcule toute la matrice depuis les périodes (sommes cumulées de débuts et de fins)"""
+        np = self._np
+        for vehicule_id in self._periodes:
+            self._ligne(vehicule_id)
+        self._bits[:self._nb_lignes] = 0
+
+        lignes = [self._lignes[vehicule_id]
+                  for vehicule_id, periodes in self._periodes.items() for _ in periodes]
+        if not lignes:
+            return
+        bornes = np.array([periode for periodes in self._periodes.values() for periode in periodes.values()],
+                          dtype=np.int64) - self.origine.toordinal()
+        lignes = np.array(lignes, dtype=np.int64)
+        debuts = np.maximum(bornes[:, 0], 0)
+        fins = np.minimum(bornes[:, 1], self.nb_jours - 1)
+        dans_horizon = debuts <= fins
+        lignes, debuts, fins = lignes[dans_horizon], debuts[dans_horizon], fins[dans_horizon]
+
+        # par paquets de lignes : le tableau des différences reste petit même pour un grand parc
+        taille_paquet = 8192
+        for premiere in range(0, self._nb_lignes, taille_paquet):
+            selection = (lignes >= premiere) & (lignes < premiere + taille_paquet)
+            if not selection.any():
+                continue
+            differences = np.zeros((min(taille_paquet, self._nb_lignes - premiere), self.nb_jours + 1),
+                                   dtype=np.int32)
+            np.add.at(differences, (lignes[selection] - premiere, debuts[selection]), 1)
+            np.add.at(differences, (lignes[selection] - premiere, fins[selection] + 1), -1)
+            occupes = np.cumsum(differences[:, :-1], axis=1) > 0
+            self._bits[premiere:premiere + len(occupes)] = np.packbits(occupes, axis=1)
+
+    # consultations
+
+    def couvre(self, date_debut, date_fin):
+        """
+        Returns:
+            bool: True si la période est entièrement dans l'horizon
+        """
+        debut = _jour(date_debut) - self.origine.toordinal()
+        fin = _jour(date_fin) - self.origine.toordinal()
+        return 0 <= debut <= fin < self.nb_jours
+
+    def _occupes(self, lignes, date_debut, date_fin):
+        """
+        True pour chaque ligne ayant un jour occupé sur la période : tranche des octets couvrant
+        la période, masques sur le premier et le dernier octet, réduction par ligne
+
+        Raises:
+            ValueError: si la période sort de l'horizon
+        """
+        if not self.couvre(date_debut, date_fin):
+            raise ValueError(f"période hors de l'horizon du calendrier ({self.origine}, {self.nb_jours} jours)")
+        debut = _jour(date_debut) - self.origine.toordinal()
+        fin = _jour(date_fin) - self.origine.toordinal()
+        octet_debut, octet_fin = debut >> 3, fin >> 3
+        # np.packbits range le premier jour dans le bit de poids fort de l'octet
+        masque_debut = 0xFF >> (debut & 7)
+        masque_fin = (0xFF << (7 - (fin & 7))) & 0xFF
+
+        bloc = self._bits[lignes, octet_debut:octet_fin + 1]
+        if octet_debut == octet_fin:
+            return (bloc[:, 0] & (masque_debut & masque_fin)) != 0
+        occupes = ((bloc[:, 0] & masque_debut) | (bloc[:, -1] & masque_fin)) != 0
+        if octet_fin - octet_debut > 1:
+            occupes |= bloc[:, 1:-1].any(axis=1)
+        return occupes
+
+    def disponibles(self, type_vehicule, date_debut, date_fin):
+        """
+        véhicules d'un type sans aucun jour occupé sur la période (bornes incluses)
+
+        Args:
+            type_vehicule (str): 'Voiture', 'Utilitaire' ou 'Moto' (None pour tous les types)
+            date_debut (date ou datetime): premier jour
+            date_fin (date ou datetime): dernier jour
+
+        Returns:
+            numpy.ndarray: ids des véhicules libres, dans l'ordre d'ajout
+
+        Raises:
+            ValueError: si la période sort de l'horizon ou si le type est inconnu
+        """
+        lignes = slice(0, self._nb_lignes)
+        types = self._types[lignes]
+        du_type = types >= 0 if type_vehicule is None else types == TYPES_VEHICULE.index(type_vehicule)
+        return self._ids[lignes][du_type & ~self._occupes(lignes, date_debut, date_fin)]
+
+    def occupes(self, vehicule_ids, date_debut, date_fin):
+        """
+        Args:
+            vehicule_ids (iterable): ids des véhicules
+            date_debut (date ou datetime): premier jour
+            date_fin (date ou datetime): dernier jour
+
+        Returns:
+            numpy.ndarray: booléens, True si le véhicule a un jour occupé sur la période
+
+        Raises:
+            ValueError: si la période sort de l'horizon
+        """
+        np = self._np
+        lignes = np.fromiter((self._lignes.get(vehicule_id, -1) for vehicule_id in vehicule_ids), dtype=np.int64)
+        resultat = np.zeros(len(lignes), dtype=bool)
+        connues = lignes >= 0
+        resultat[connues] = self._occupes(lignes[connues], date_debut, date_fin)
+        return resultat
+
+    def taux_occupation(self, type_vehicule=None):
+        """
+        Returns:
+            numpy.ndarray: part des véhicules (du type) occupés, pour chaque jour de l'horizon
+        """
+        np = self._np
+        types = self._types[:self._nb_lignes]
+        lignes = np.flatnonzero(types >= 0 if type_vehicule is None
+                                else types == TYPES_VEHICULE.index(type_vehicule))
+        if not len(lignes):
+            return np.zeros(self.nb_jours)
+        jours = np.unpackbits(self._bits[lignes], axis=1, count=self.nb_jours)
+        return jours.mean(axis=0)
@@ -4,9 +4,17 @@
 #
 # structure:
 # - définit la classe Parc qui gère une collection de véhicules et leurs réservations
-# - implémente des algorithmes de vérification de disponibilité avec récursivité
+# - vérifie la disponibilité par un index des réservations confirmées de chaque véhicule
+#   (model/disponibilite.py), tenu à jour à chaque ajout, annulation ou terminaison
+# - retrouve un véhicule par id et les véhicules d'un type par un index (model/index_parc.py),
+#   sans parcourir toute la liste des véhicules ; les critères de recherche passent par des index
+#   secondaires (listes triées pour min/max, index inversés pour les valeurs exactes et les options)
+# - les critères sont compilés en requête (model/requete.py), la même que celle de la base
+# - calendrier d'occupation numpy optionnel (activer_calendrier, model/occupation.py) : matrice
+#   véhicules x jours qui répond pour tous les candidats d'une recherche en une opération vectorisée
 # - fournit des méthodes pour filtrer les véhicules selon différents critères
 # - propose des fonctionnalités d'optimisation et d'analyse du parc
+# - se synchronise avec la base par le journal des modifications (synchroniser)
 #
 # interactions:
 # - utilisé par le ParcController pour gérer l'inventaire des véhicules
@@ -16,6 +24,9 @@
 
 from datetime import datetime, timedelta
 from model.vehicule import Vehicule, Voiture, Utilitaire, Moto
+from model.disponibilite import IndexDisponibilite
+from model.index_parc import ListeIndexee, IndexVehicules
+from model.requete import compiler_requete
 
 
 class Parc:
@@ -26,6 +37,8 @@ class Parc:
     Attributes:
         vehicules (list): Liste des véhicules du parc
         reservations (list): Liste des réservations associées au parc
+        seq_journal (int): Dernière modification du journal de la base appliquée (voir synchroniser)
+        calendrier (CalendrierOccupation): Occupation jour par jour, None tant qu'il n'est pas activé
     """
 
     def __init__(self):
@@ -33,8 +46,165 @@ class Parc:
         initialise d'un nouveau parc
         """
         # init des listes
+        self._index_vehicules = IndexVehicules()
         self.vehicules = []
+        self._index_disponibilite = IndexDisponibilite()
         self.reservations = []
+        self.seq_journal = 0
+        self.calendrier = None
+
+    @property
+    def vehicules(self):
+        """liste des véhicules, dont les modifications tiennent l'index par id et par type à jour"""
+        return self._vehicules
+
+    @vehicules.setter
+    def vehicules(self, vehicules):
+        self._vehicules = ListeIndexee(vehicules, self._index_vehicules)
+
+    @property
+    def reservations(self):
+        """liste des réservations, dont les modifications tiennent l'index de disponibilité à jour"""
+        return self._reservations
+
+    @reservations.setter
+    def reservations(self, reservations):
+        self._reservations = ListeIndexee(reservations, self._index_disponibilite)
+
+    def vehicule_disponible(self, vehicule_id, date_debut, date_fin, reservation_id_a_exclure=None):
+        """
+        vérifie qu'aucune réservation confirmée du véhicule ne chevauche la période (bornes incluses)
+
+        Args:
+            vehicule_id (int): ID du véhicule
+            date_debut (datetime): Date de début de la période
+            date_fin (datetime): Date de fin de la période
+            reservation_id_a_exclure (int, optional): Réservation du parc ignorée (modification de ses dates)
+
+        Returns:
+            bool: True si le véhicule est libre sur toute la période
+        """
+        exclue = None
+        if reservation_id_a_exclure is not None:
+            exclue = self.obtenir_reservation(reservation_id_a_exclure)
+        return self._index_disponibilite.est_libre(vehicule_id, date_debut, date_fin, exclue)
+
+    def activer_calendrier(self, origine=None, nb_jours=730):
+        """
+        construit le calendrier d'occupation des véhicules du parc, ensuite tenu à jour à chaque
+        ajout, retrait, annulation ou terminaison (nécessite numpy)
+
+        Args:
+            origine (date, optional): premier jour de l'horizon (aujourd'hui par défaut)
+            nb_jours (int): longueur de l'horizon en jours
+
+        Returns:
+            CalendrierOccupation: le calendrier du parc
+
+        Raises:
+            ImportError: si numpy n'est pas installé
+        """
+        from model.occupation import CalendrierOccupation
+
+        self.calendrier = CalendrierOccupation(origine, nb_jours)
+        self._index_vehicules.calendrier = self.calendrier
+        self._index_disponibilite.calendrier = self.calendrier
+        # les reconstructions des index remplissent le calendrier
+        self._index_vehicules.reconstruire(self.vehicules)
+        self._index_disponibilite.reconstruire(self.reservations)
+        return self.calendrier
+
+    def obtenir_reservation(self, reservation_id):
+        """
+        récupère une réservation du parc par son id, sans parcourir la liste des réservations
+
+        Args:
+            reservation_id (int): ID de la réservation
+
+        Returns:
+            Reservation: la réservation du parc, ou None si elle n'y est pas
+        """
+        position = self.reservations.position(reservation_id)
+        return None if position is None else self.reservations[position]
+
+    def reindexer_reservation(self, reservation):
+        """
+        reprend dans l'index une réservation du parc dont les dates ont changé
+
+        Args:
+            reservation (Reservation): Réservation modifiée
+        """
+        if self._index_disponibilite.retirer(reservation):
+            self._index_disponibilite.ajouter(reservation)
+
+    def synchroniser(self, db, depuis_seq=None):
+        """
+        applique au parc les écritures de véhicules et de réservations journalisées en base
+        depuis depuis_seq, y compris celles des autres processus : seuls les objets modifiés
+        sont relus (une requête par table), quel que soit le nombre d'écritures de chacun
+
+        Args:
+            db (Database): base de données du parc
+            depuis_seq (int, optional): dernier seq déjà appliqué (self.seq_journal par défaut)
+
+        Returns:
+            int: nombre d'objets remplacés, ajoutés ou retirés
+        """
+        if depuis_seq is None:
+            depuis_seq = self.seq_journal
+
+        modifications = db.lire_journal(depuis_seq, tables=("vehicules", "reservations"))
+        if not modifications:
+            return 0
+
+        ids_modifies = {"vehicules": set(), "reservations": set()}
+        for _, nom_table, objet_id, _ in modifications:
+            ids_modifies[nom_table].add(objet_id)
+
+        # état actuel relu en base : un objet absent a été supprimé. une écriture postérieure à
+        # la lecture du journal est déjà prise en compte, la rejouer au prochain appel est sans effet
+        if ids_modifies["vehicules"]:
+            self._fusionner(self.vehicules, ids_modifies["vehicules"],
+                            db.charger_vehicules(ids_modifies["vehicules"]))
+        if ids_modifies["reservations"]:
+            self._fusionner(self.reservations, ids_modifies["reservations"],
+                            db.charger_reservations(ids_modifies["reservations"]))
+
+        self.seq_journal = modifications[-1][0]
+        return len(ids_modifies["vehicules"]) + len(ids_modifies["reservations"])
+
+    @staticmethod
+    def _fusionner(objets, ids_modifies, objets_a_jour):
+        """
+        remplace sur place, dans une liste d'objets, ceux dont l'id a été modifié
+
+        les objets modifiés sont retrouvés par la table id -> position de la ListeIndexee, sans
+        parcourir la liste, et les changements sont appliqués objet par objet (remplacement d'un
+        élément, pop, append) : seuls les objets touchés sont réindexés
+
+        Args:
+            objets (ListeIndexee): Liste à mettre à jour (vehicules ou reservations)
+            ids_modifies (set): Ids des objets modifiés
+            objets_a_jour (list): État actuel des objets modifiés encore présents en base
+        """
+        a_jour = {objet.id: objet for objet in objets_a_jour}
+
+        a_retirer = []
+        for objet_id in ids_modifies:
+            position = objets.position(objet_id)
+            if position is None:
+                continue
+            nouvel_objet = a_jour.pop(objet_id, None)
+            if nouvel_objet is None:
+                # supprimé en base
+                a_retirer.append(position)
+            else:
+                objets[position] = nouvel_objet
+        # en partant de la fin : les positions restantes ne bougent pas
+        for position in sorted(a_retirer, reverse=True):
+            objets.pop(position)
+        # objets créés depuis la dernière synchronisation
+        objets.extend(a_jour.values())
 
     def ajouter_vehicule(self, vehicule):
         """
@@ -47,7 +217,7 @@ class Parc:
             bool: True si l'ajout a réussi
         """
         # vérifie que le véhicule n'est pas déjà dans le parc
-        if vehicule not in self.vehicules:
+        if vehicule and not self._index_vehicules.contient(vehicule):
             self.vehicules.append(vehicule)
             return True
         return False
@@ -63,18 +233,45 @@ class Parc:
             bool: True si le retrait a réussi, False sinon
         """
         # recherche du véhicule par son ID
-        for i, vehicule in enumerate(self.vehicules):
-            if vehicule.id == vehicule_id:
-                # vérification qu'il n'y a pas de réservation active
-                if self._a_reservations_actives(vehicule_id):
-                    return False  # ne peut pas retirer un véhicule avec des réservations actives
+        vehicule = self._index_vehicules.obtenir(vehicule_id)
+        if vehicule is None:
+            return False  # pas de véhicule trouvé
 
-                # retrait du véhicule
-                self.vehicules.pop(i)
-                return True
+        # vérification qu'il n'y a pas de réservation active
+        if self._a_reservations_actives(vehicule_id):
+            return False  # ne peut pas retirer un véhicule avec des réservations actives
 
-        # pas de véhicule trouvé
-        return False
+        # retrait du véhicule
+        self.vehicules.remove(vehicule)
+        return True
+
+    def remplacer_vehicule(self, vehicule):
+        """
+        remplace dans le parc le véhicule de même id (ex: après une mise à jour en base)
+
+        Args:
+            vehicule (Vehicule): Nouvel état du véhicule
+
+        Returns:
+            bool: True si un véhicule a été remplacé, False s'il n'est pas dans le parc
+        """
+        ancien = self._index_vehicules.obtenir(vehicule.id)
+        if ancien is None:
+            return False
+        if ancien is vehicule:
+            self.reindexer_vehicule(vehicule)
+        else:
+            self.vehicules[self.vehicules.position(vehicule.id)] = vehicule
+        return True
+
+    def reindexer_vehicule(self, vehicule):
+        """
+        reprend dans les index de recherche un véhicule du parc modifié sur place
+
+        Args:
+            vehicule (Vehicule): Véhicule modifié
+        """
+        self._index_vehicules.reindexer(vehicule)
 
     def _a_reservations_actives(self, vehicule_id):
         """
@@ -86,15 +283,8 @@ class Parc:
         Returns:
             bool: True si le véhicule a des réservations actives, False sinon
         """
-        aujourd_hui = datetime.now()
-
-        for reservation in self.reservations:
-            # vérif que c'est bien le véhicule concerné et la date de fin est dans le futur
-            if (reservation.vehicule_id == vehicule_id and
-                    reservation.statut == "confirmée" and
-                    reservation.date_fin >= aujourd_hui):
-                return True
-        return False
+        # une réservation confirmée qui se termine aujourd'hui ou plus tard
+        return not self.vehicule_disponible(vehicule_id, datetime.now(), datetime.max)
 
     def enregistrer_reservation(self, reservation):
         """
@@ -107,19 +297,13 @@ class Parc:
             bool: True si l'enregistrement a réussi, False sinon
         """
         # vérif de l'existance dans le parc
-        vehicule_trouve = False
-        for vehicule in self.vehicules:
-            if vehicule.id == reservation.vehicule_id:
-                vehicule_trouve = True
-                break
-
-        if not vehicule_trouve:
+        if self._index_vehicules.obtenir(reservation.vehicule_id) is None:
             return False  # véhicule non trouvé
 
-        # pas de conflit avec autre résa
-        for autre_reservation in self.reservations:
-            if reservation.est_en_conflit_avec(autre_reservation):
-                return False  # conflit détecté
+        # pas de conflit avec une autre résa confirmée (seule une résa confirmée peut être en conflit)
+        if (reservation.statut == "confirmée" and
+                not self.vehicule_disponible(reservation.vehicule_id, reservation.date_debut, reservation.date_fin)):
+            return False  # conflit détecté
 
         # enregistrement
         self.reservations.append(reservation)
@@ -128,94 +312,35 @@ class Parc:
     def verifier_disponibilite(self, type_vehicule, criteres, date_debut, date_fin):
         """
         vérif la dispo des véhicules correspondant aux critères sur la période
-        utilisation de recusrivité pour les périodes
+        (critères résolus par les index de l'IndexVehicules, puis une recherche dichotomique
+        par véhicule restant dans l'index des réservations confirmées)
 
         Args:
             type_vehicule (str): Type de véhicule recherché ('Voiture', 'Utilitaire', 'Moto')
-            criteres (dict): Critères spécifiques de recherche
+            criteres: Critères spécifiques de recherche : dict, texte ("puissance>=100 options~GPS")
+                ou Requete déjà compilée (voir model/requete.py)
             date_debut (datetime): Date de début de la période
             date_fin (datetime): Date de fin de la période
 
         Returns:
             list: Liste des véhicules disponibles correspondant aux critères
         """
+        # type demandé (instances directes ou héritées de la classe) et critères, par intersection
+        # des candidats des index ; la requête compilée évalue les conditions non indexables
+        vehicules_filtres = self._index_vehicules.filtrer(type_vehicule, compiler_requete(criteres))
 
-        # on fait une fonction récursive interne pour la dispo
-        def verifier_periode_recursive(vehicule, date_debut, date_fin):
-            """
-            récursivité pour savoir si véhicule dispo pour dates donnés et donne les dates qu'il reste
-
-            Args:
-                vehicule (Vehicule): Véhicule à vérifier
-                date_debut (datetime): Date de début de la période
-                date_fin (datetime): Date de fin de la période
-
-            Returns:
-                bool: True si le véhicule est disponible, False sinon
-            """
-            # si la période est invalide
-            if date_debut > date_fin:
-                return True
-
-            # Recherche un conflit avec une résa déjà passée
-            for reservation in self.reservations:
-                # réservations pour ce véhicule et qui sont "confirmées"
-                if (reservation.vehicule_id == vehicule.id and
-                        reservation.statut == "confirmée"):
-
-                    # Cas 1: La résa est entièrement avant
-                    if reservation.date_fin < date_debut:
-                        continue  # pas de prb
-
-                    # Cas 2: La résa est entièrement après
-                    if reservation.date_debut > date_fin:
-                        continue  # pas de prb
-
-                    # Cas 3: résa chevauche le début de la période
-                    if reservation.date_debut <= date_debut and reservation.date_fin < date_fin:
-                        # on vérifie récursivement la partie restante de la période
-                        return verifier_periode_recursive(vehicule, reservation.date_fin + timedelta(days=1), date_fin)
-
-                    # Cas 4: idem pour la fin
-                    if reservation.date_debut > date_debut and reservation.date_fin >= date_fin:
-                        # idem
-                        return verifier_periode_recursive(vehicule, date_debut, reservation.date_debut - timedelta(days=1))
-
-                    # Cas 5: La résa englobe complètement la période
-                    if reservation.date_debut <= date_debut and reservation.date_fin >= date_fin:
-                        return False  # gros prb
-
-                    # Cas 6: la résa est incluse dans la période donnée
-                    if reservation.date_debut > date_debut and reservation.date_fin < date_fin:
-                        # on doit vérifier les parties de la période restante
-                        return (verifier_periode_recursive(vehicule, date_debut, reservation.date_debut - timedelta(days=1)) and
-                                verifier_periode_recursive(vehicule, reservation.date_fin + timedelta(days=1), date_fin))
-
-            # Si on arrive ici, pas de prb (c'est super)
-            return True
-
-        # recherche du type demandé
-        vehicules_du_type = []
-        for vehicule in self.vehicules:
-            # utilisation de isinstance(objet, classe) qui vérifie si "objet" est une instance directe ou héritée de la "classe"
-            if type_vehicule == 'Voiture' and isinstance(vehicule, Voiture):
-                vehicules_du_type.append(vehicule)
-            elif type_vehicule == 'Utilitaire' and isinstance(vehicule, Utilitaire):
-                vehicules_du_type.append(vehicule)
-            elif type_vehicule == 'Moto' and isinstance(vehicule, Moto):
-                vehicules_du_type.append(vehicule)
-
-        # selon les critères
-        vehicules_filtres = []
-        for vehicule in vehicules_du_type:
-            if self._correspond_criteres(vehicule, criteres):
-                vehicules_filtres.append(vehicule)
+        if self.calendrier is not None and vehicules_filtres and self.calendrier.couvre(date_debut, date_fin):
+            # un seul calcul vectorisé pour tous les candidats : libre au jour près = libre ;
+            # occupé au jour près, la dichotomie tranche à l'heure près
+            occupes = self.calendrier.occupes([vehicule.id for vehicule in vehicules_filtres], date_debut, date_fin)
+            return [vehicule for vehicule, occupe in zip(vehicules_filtres, occupes)
+                    if not occupe or self.vehicule_disponible(vehicule.id, date_debut, date_fin)]
 
         # vérif de dispo pour chaque véhicule filtré
         vehicules_disponibles = []
         for vehicule in vehicules_filtres:
-            if verifier_periode_recursive(vehicule, date_debut, date_fin):
-                vehicules_disponibles.append(vehicule) # on utilise la récursivité ici pour savoir si parmis les véhicules conserver les dates sont bonnes
+            if self.vehicule_disponible(vehicule.id, date_debut, date_fin):
+                vehicules_disponibles.append(vehicule)
 
         return vehicules_disponibles
 
@@ -225,41 +350,13 @@ class Parc:
 
         Args:
             vehicule (Vehicule): Véhicule à vérifier
-            criteres (dict): Critères de recherche (e.g. {"places": 5, "marque": "Renault"} )
+            criteres: Critères de recherche (e.g. {"nb_places": 5, "marque": "Renault"} ou "marque=Renault")
 
         Returns:
             bool: True si le véhicule correspond aux critères, False sinon
         """
-        # cas sans rien
-        if not criteres:
-            return True
-
-        # vérif des critères
-        for cle, valeur in criteres.items():
-            # cas sans clé
-            if not hasattr(vehicule, cle):
-                return False
-
-            # récupère la valeur de l'attribut
-            attr_valeur = getattr(vehicule, cle)
-
-            # comparaison selon le type
-            if isinstance(valeur, dict):
-                # Critère  min/max
-                if "min" in valeur and attr_valeur < valeur["min"]:
-                    return False
-                if "max" in valeur and attr_valeur > valeur["max"]:
-                    return False
-            elif isinstance(attr_valeur, list) and isinstance(valeur, str):
-                # Recherche dans une liste (ex: options)
-                if valeur not in attr_valeur:
-                    return False
-            elif attr_valeur != valeur:
-                # Comparaison simple
-                return False
-
-        # tous les critères sont satisfaits (génial !)
-        return True
+        # même compilation que verifier_disponibilite et Database.rechercher_vehicules
+        return compiler_requete(criteres)(vehicule)
 
     def optimiser_parc(self, historique_reservations, budget_annuel=None):
         """
@@ -392,11 +489,10 @@ class Parc:
         for reservation in historique_reservations:
             if reservation.statut == "annulée":
                 # Recherche du type de véhicule
-                for vehicule in self.vehicules:
-                    if vehicule.id == reservation.vehicule_id:
-                        type_vehicule = vehicule.__class__.__name__
-                        demandes_refusees[type_vehicule] += 1
-                        break
+                vehicule = self._index_vehicules.obtenir(reservation.vehicule_id)
+                if vehicule is not None:
+                    type_vehicule = vehicule.__class__.__name__
+                    demandes_refusees[type_vehicule] += 1
 
         return demandes_refusees
 
@@ -410,10 +506,7 @@ class Parc:
         Returns:
             Vehicule: Le véhicule trouvé ou None si non trouvé
         """
-        for vehicule in self.vehicules:
-            if vehicule.id == vehicule_id:
-                return vehicule
-        return None
+        return self._index_vehicules.obtenir(vehicule_id)
 
     def obtenir_vehicule(self, vehicule_id):
         """
@@ -427,34 +520,6 @@ class Parc:
         """
         return self._trouver_vehicule_par_id(vehicule_id)
 
-    def ajouter_vehicule(self, vehicule):
-        """
-        Ajoute un véhicule au parc
-
-        Args:
-            vehicule: Instance du véhicule à ajouter
-        """
-        if vehicule and vehicule not in self.vehicules:
-            self.vehicules.append(vehicule)
-            return True
-        return False
-
-    def retirer_vehicule(self, vehicule_id):
-        """
-        Retire un véhicule du parc par son ID
-
-        Args:
-            vehicule_id (int): ID du véhicule à retirer
-
-        Returns:
-            bool: True si retiré avec succès, False sinon
-        """
-        vehicule = self._trouver_vehicule_par_id(vehicule_id)
-        if vehicule:
-            self.vehicules.remove(vehicule)
-            return True
-        return False
-
 
 # exemple de ce fichier (n'est executé que si l'on RUN ce fichier)
 if __name__ == "__main__":
@@ -0,0 +1,257 @@
+# model/requete.py
+# ce fichier implémente les requêtes de recherche de véhicules : une même définition de recherche,
+# compilée une fois, filtre les objets en mémoire (Parc) et les lignes en base (Database)
+#
+# structure:
+# - Condition : (attribut, opérateur, valeur), opérateurs =, !=, <, <=, >, >=, in (valeur parmi une
+#   liste) et ~ (option possédée par le véhicule)
+# - compiler_requete accepte :
+#   - un dict de critères (forme historique de rechercher_vehicules) : valeur simple = égalité,
+#     dict min/max = intervalle, liste = valeur parmi la liste, "options" = option(s) possédée(s),
+#     raccourcis annee_min, annee_max et prix_max
+#   - un texte du type "puissance>=100 carburant=Diesel options~GPS" (conditions séparées par des
+#     espaces, "a,b" = valeur parmi a et b, guillemets pour une valeur avec espaces) ; sur les
+#     options, "=" et "~" ont le sens du dict : "options=GPS,Clim" = toutes ces options possédées
+# - Requete : prédicat réutilisable (requete(vehicule) -> bool, un test précompilé par condition)
+#   et clause_sql qui produit la clause WHERE paramétrée équivalente
+# - "type" désigne le type de véhicule (Voiture, Utilitaire, Moto), le type de moto est "type_moto"
+#
+# interactions:
+# - utilisé par Parc.verifier_disponibilite (avec l'IndexVehicules de model/index_parc.py) et par
+#   Database._clause_criteres (rechercher_vehicules, charger_vehicules_disponibles, projeter_vehicules)
+# - une valeur absente (attribut d'un autre type de véhicule, None) ne satisfait aucune condition,
+#   comme NULL en sql
+
+import operator
+import re
+import shlex
+from collections import namedtuple
+from functools import lru_cache
+
+
+Condition = namedtuple('Condition', ('attribut', 'operateur', 'valeur'))
+
+# opérateurs de comparaison : fonction python et opérateur sql
+_COMPARAISONS = {
+    '=': (operator.eq, '='),
+    '!=': (operator.ne, '!='),
+    '<': (operator.lt, '<'),
+    '<=': (operator.le, '<='),
+    '>': (operator.gt, '>'),
+    '>=': (operator.ge, '>='),
+}
+OPERATEURS = tuple(_COMPARAISONS) + ('in', '~')
+
+# critères d'un mot dont le nom diffère de l'attribut de l'objet
+_ATTRIBUTS_OBJET = {'type_moto': 'type'}
+_RACCOURCIS = {'annee_min': ('annee', '>='), 'annee_max': ('annee', '<='), 'prix_max': ('prix_achat', '<=')}
+
+# condition du texte : attribut, opérateur (les opérateurs à deux caractères d'abord), valeur
+_CONDITION_TEXTE = re.compile(r'^([A-Za-z_]\w*)\s*(>=|<=|!=|=|<|>|~)\s*(.+)$')
+
+
+def valeur_attribut(vehicule, attribut, absente=None):
+    """
+    valeur d'un attribut de requête sur un véhicule ("type" = classe, "type_moto" = attribut type)
+
+    Args:
+        vehicule (Vehicule): véhicule
+        attribut (str): attribut de la requête
+        absente: valeur renvoyée si le véhicule n'a pas l'attribut
+
+    Returns:
+        valeur de l'attribut, ou absente
+    """
+    if attribut == 'type':
+        return type(vehicule).__name__
+    return getattr(vehicule, _ATTRIBUTS_OBJET.get(attribut, attribut), absente)
+
+
+class Requete:
+    """
+    requête de recherche de véhicules compilée (conditions combinées par ET)
+
+    Attributes:
+        conditions (tuple): conditions de la requête
+    """
+
+    def __init__(self, conditions=()):
+        """
+        Args:
+            conditions (iterable): objets Condition
+
+        Raises:
+            ValueError: si un opérateur est inconnu
+        """
+        self.conditions = tuple(Condition(*condition) for condition in conditions)
+        self._tests = [self._compiler(condition) for condition in self.conditions]
+
+    @staticmethod
+    def _compiler(condition):
+        """fonction vehicule -> bool d'une condition"""
+        attribut, operateur, valeur = condition
+        if operateur == '~':
+            def tester(vehicule):
+                options = valeur_attribut(vehicule, attribut)
+                return isinstance(options, (list, tuple, set)) and valeur in options
+        elif operateur == 'in':
+            valeurs = frozenset(valeur)
+
+            def tester(vehicule):
+                actuelle = valeur_attribut(vehicule, attribut)
+                return actuelle is not None and not isinstance(actuelle, list) and actuelle in valeurs
+        elif operateur in _COMPARAISONS:
+            comparer = _COMPARAISONS[operateur][0]
+
+            def tester(vehicule):
+                actuelle = valeur_attribut(vehicule, attribut)
+                if actuelle is None:
+                    return False
+                if operateur == '=' and isinstance(actuelle, list):
+                    # égalité avec un attribut liste : valeur contenue (ex: {"options": "GPS"})
+                    return valeur in actuelle
+                try:
+                    return comparer(actuelle, valeur)
+                except TypeError:
+                    return False
+        else:
+            raise ValueError(f"opérateur de requête inconnu: {operateur!r}")
+        return tester
+
+    def __call__(self, vehicule):
+        """
+        Returns:
+            bool: True si le véhicule satisfait toutes les conditions
+        """
+        return all(tester(vehicule) for tester in self._tests)
+
+    def __bool__(self):
+        return bool(self.conditions)
+
+    def __repr__(self):
+        return f"Requete({list(self.conditions)!r})"
+
+    def filtrer(self, vehicules):
+        """
+        Returns:
+            list: véhicules satisfaisant la requête, dans l'ordre donné
+        """
+        return [vehicule for vehicule in vehicules if self(vehicule)]
+
+    def clause_sql(self, colonnes):
+        """
+        clause sql équivalente sur la table vehicules (les options passent par vehicule_options)
+
+        Args:
+            colonnes (iterable): colonnes de la table autorisées dans une condition
+
+        Returns:
+            tuple: (conditions " AND ..." à ajouter après un WHERE, paramètres)
+
+        Raises:
+            ValueError: si une condition porte sur une colonne inconnue
+        """
+        colonnes = set(colonnes)
+        query = ''
+        params = []
+        for attribut, operateur, valeur in self.conditions:
+            if operateur == '~' or (attribut == 'options' and operateur == '='):
+                if attribut != 'options':
+                    raise ValueError(f"l'opérateur ~ ne s'applique qu'aux options, pas à {attribut}")
+                # sous-requête servie par la clé primaire (option, vehicule_id)
+                query += " AND vehicules.id IN (SELECT vehicule_id FROM vehicule_options WHERE option = ?)"
+                params.append(valeur)
+                continue
+            if attribut not in colonnes:
+                raise ValueError(f"critère de recherche inconnu: {attribut}")
+            if operateur == 'in':
+                query += f" AND {attribut} IN ({', '.join('?' * len(valeur))})"
+                params.extend(valeur)
+            else:
+                query += f" AND {attribut} {_COMPARAISONS[operateur][1]} ?"
+                params.append(valeur)
+        return query, params
+
+
+def compiler_requete(source):
+    """
+    compile une recherche de véhicules
+
+    Args:
+        source: dict de critères, texte de requête, Requete (renvoyée telle quelle) ou None
+
+    Returns:
+        Requete: requête compilée
+
+    Raises:
+        ValueError: si le texte est mal formé
+    """
+    if isinstance(source, Requete):
+        return source
+    if not source:
+        return Requete()
+    if isinstance(source, str):
+        return _compiler_texte(source)
+    return Requete(_conditions_criteres(source))
+
+
+def _conditions_criteres(criteres):
+    """conditions d'un dict de critères (voir Database.rechercher_vehicules)"""
+    conditions = []
+    for cle, valeur in criteres.items():
+        if cle in _RACCOURCIS:
+            conditions.append(Condition(*_RACCOURCIS[cle], valeur))
+        elif cle == 'options':
+            for option in ([valeur] if isinstance(valeur, str) else valeur):
+                conditions.append(Condition('options', '~', option))
+        elif isinstance(valeur, dict):
+            if "min" in valeur:
+                conditions.append(Condition(cle, '>=', valeur["min"]))
+            if "max" in valeur:
+                conditions.append(Condition(cle, '<=', valeur["max"]))
+        elif isinstance(valeur, (list, tuple, set, frozenset)):
+            conditions.append(Condition(cle, 'in', tuple(valeur)))
+        else:
+            conditions.append(Condition(cle, '=', valeur))
+    return conditions
+
+
+@lru_cache(maxsize=128)
+def _compiler_texte(texte):
+    """requête d'un texte (mise en cache : une recherche répétée n'est analysée qu'une fois)"""
+    try:
+        morceaux = shlex.split(texte)
+    except ValueError as e:
+        raise ValueError(f"requête mal formée: {e}") from None
+
+    conditions = []
+    for morceau in morceaux:
+        correspondance = _CONDITION_TEXTE.match(morceau)
+        if correspondance is None:
+            raise ValueError(f"condition mal formée: {morceau!r} (attendu attribut, opérateur, valeur)")
+        attribut, operateur, texte_valeur = correspondance.groups()
+        attribut, operateur = _RACCOURCIS.get(attribut, (attribut, operateur))
+        if attribut == 'options':
+            # comme {"options": [...]} : chaque option de la liste doit être possédée
+            if operateur not in ('=', '~'):
+                raise ValueError(f"condition mal formée: {morceau!r} (les options n'acceptent que = et ~)")
+            conditions.extend(Condition('options', '~', option) for option in texte_valeur.split(','))
+        elif operateur == '=' and ',' in texte_valeur:
+            conditions.append(Condition(attribut, 'in', tuple(_convertir(v) for v in texte_valeur.split(','))))
+        else:
+            conditions.append(Condition(attribut, operateur, _convertir(texte_valeur)))
+    return Requete(conditions)
+
+
+def _convertir(texte):
+    """valeur d'un texte de requête : booléen, entier, décimal ou chaîne"""
+    if texte.lower() in ('true', 'vrai', 'oui'):
+        return True
+    if texte.lower() in ('false', 'faux', 'non'):
+        return False
+    for conversion in (int, float):
+        try:
+            return conversion(texte)
+        except ValueError:
+            pass
+    return texte
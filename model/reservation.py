@@ -259,7 +259,8 @@ class Reservation:
             ancien_statut (str): Ancien statut de la réservation
             nouveau_statut (str): Nouveau statut de la réservation
         """
-        for observateur in self._observateurs:
+        # copie : un observateur peut se désabonner pendant la notification (ex: IndexDisponibilite)
+        for observateur in list(self._observateurs):
             observateur.mettre_a_jour(self, type_evenement, ancien_statut, nouveau_statut)
 
     def __str__(self):
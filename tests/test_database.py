@@ -6,15 +6,20 @@ import unittest
 import sys
 import os
 import tempfile
+import sqlite3
+import threading
+import gc
 from datetime import datetime, timedelta
 
 # Ajout du répertoire parent au path pour les imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from utils.database import Database
-from model.vehicule import Voiture
+from utils.database import Database, encoder_date
+from utils.migrations import MIGRATIONS
+from model.vehicule import Voiture, Utilitaire, Moto
 from model.client import Client
 from model.reservation import Reservation
+from model.facture import Facture
 
 
 class TestDatabase(unittest.TestCase):
@@ -182,6 +187,40 @@ class TestDatabase(unittest.TestCase):
         self.assertEqual(len(recents), 1)
         self.assertEqual(recents[0].annee, 2021)
 
+    def test_recherche_vehicules_attributs_specifiques(self):
+        """Test des critères min/max, d'égalité et d'option sur les attributs spécifiques"""
+        utilitaire = Utilitaire(
+            id=None, marque="Renault", modele="Master", annee=2019,
+            kilometrage=40000, prix_achat=25000, cout_entretien_annuel=1500,
+            volume=12, charge_utile=1200, hayon=True
+        )
+        moto = Moto(
+            id=None, marque="Yamaha", modele="MT-07", annee=2022,
+            kilometrage=5000, prix_achat=7000, cout_entretien_annuel=400,
+            cylindree=690, type_moto="Roadster"
+        )
+        for vehicule in (self.voiture_test, utilitaire, moto):
+            self.db.sauvegarder_vehicule(vehicule)
+
+        def ids(criteres):
+            return [v.id for v in self.db.rechercher_vehicules(criteres)]
+
+        self.assertEqual(ids({"puissance": {"min": 100}}), [self.voiture_test.id])
+        self.assertEqual(ids({"puissance": {"min": 150}}), [])
+        self.assertEqual(ids({"carburant": ["Diesel", "Hybride"]}), [self.voiture_test.id])
+        self.assertEqual(ids({"options": "GPS"}), [self.voiture_test.id])
+        self.assertEqual(ids({"options": ["GPS", "Toit ouvrant"]}), [])
+        self.assertEqual(ids({"hayon": True, "volume": {"min": 10, "max": 15}}), [utilitaire.id])
+        self.assertEqual(ids({"type_moto": "Roadster", "cylindree": {"max": 700}}), [moto.id])
+
+        # les options suivent les mises à jour et la suppression du véhicule
+        self.voiture_test.options = ["Toit ouvrant"]
+        self.db.sauvegarder_vehicule(self.voiture_test)
+        self.assertEqual(ids({"options": "GPS"}), [])
+        self.assertEqual(ids({"options": "Toit ouvrant"}), [self.voiture_test.id])
+        self.db.supprimer_vehicule(self.voiture_test.id)
+        self.assertEqual(self.db.conn.execute("SELECT COUNT(*) FROM vehicule_options").fetchone()[0], 0)
+
     def test_suppression_vehicule_sans_reservation(self):
         """Test de suppression d'un véhicule sans réservation"""
         vehicule_id = self.db.sauvegarder_vehicule(self.voiture_test)
@@ -231,6 +270,1084 @@ class TestDatabase(unittest.TestCase):
         reservations = self.db.charger_reservations_client(client_id)
         self.assertEqual(len(reservations), 3)
 
+    def test_chargement_tous_vehicules_types_mixtes(self):
+        """Test du chargement en masse pour les trois types de véhicules"""
+        utilitaire = Utilitaire(
+            id=None, marque="Renault", modele="Master", annee=2019,
+            kilometrage=40000, prix_achat=25000, cout_entretien_annuel=1500,
+            volume=12, charge_utile=1200, hayon=True
+        )
+        moto = Moto(
+            id=None, marque="Yamaha", modele="MT-07", annee=2022,
+            kilometrage=5000, prix_achat=7000, cout_entretien_annuel=400,
+            cylindree=690, type_moto="Roadster"
+        )
+
+        for vehicule in (self.voiture_test, utilitaire, moto):
+            self.db.sauvegarder_vehicule(vehicule)
+
+        tous_vehicules = {v.id: v for v in self.db.charger_tous_vehicules()}
+        self.assertIsInstance(tous_vehicules[self.voiture_test.id], Voiture)
+        self.assertTrue(tous_vehicules[utilitaire.id].hayon)
+        self.assertEqual(tous_vehicules[moto.id].type, "Roadster")
+
+    def test_chargement_toutes_factures(self):
+        """Test du chargement en masse des factures"""
+        vehicule_id = self.db.sauvegarder_vehicule(self.voiture_test)
+        client_id = self.db.sauvegarder_client(self.client_test)
+
+        reservation = Reservation(
+            id=None, client_id=client_id, vehicule_id=vehicule_id,
+            date_debut=datetime.now() - timedelta(days=5),
+            date_fin=datetime.now() - timedelta(days=1),
+            prix_total=240.0, statut="terminée"
+        )
+        self.db.sauvegarder_reservation(reservation)
+
+        facture = Facture(id=None, reservation_id=reservation.id,
+                          date_emission=datetime.now(), montant_ht=200.0)
+        self.db.sauvegarder_facture(facture)
+
+        factures = self.db.charger_toutes_factures()
+        self.assertEqual(len(factures), 1)
+        self.assertAlmostEqual(factures[0].montant_ttc, 240.0)
+        self.assertEqual(self.db.charger_facture_par_reservation(reservation.id).id, facture.id)
+
+    def test_chargement_clients_groupes(self):
+        """Test du chargement des clients avec historiques regroupés en mémoire"""
+        vehicule_id = self.db.sauvegarder_vehicule(self.voiture_test)
+        client_id = self.db.sauvegarder_client(self.client_test)
+        autre_client = Client(id=None, nom="Durand", prenom="Marie", adresse="1 rue des Lilas",
+                              telephone="06 12 34 56 78", email="marie.durand@test.com")
+        autre_id = self.db.sauvegarder_client(autre_client)
+
+        for i in range(2):
+            self.db.sauvegarder_reservation(Reservation(
+                id=None, client_id=client_id, vehicule_id=vehicule_id,
+                date_debut=datetime.now() + timedelta(days=i * 7),
+                date_fin=datetime.now() + timedelta(days=i * 7 + 3),
+                prix_total=100.0
+            ))
+
+        clients = {c.id: c for c in self.db.charger_clients()}
+        self.assertEqual(len(clients[client_id].historique_reservations), 2)
+        self.assertEqual(clients[autre_id].historique_reservations, [])
+
+        # sélection par ids
+        selection = self.db.charger_clients([client_id])
+        self.assertEqual([c.id for c in selection], [client_id])
+        self.assertEqual(len(selection[0].historique_reservations), 2)
+
+        # sans historique (ex: liste de sélection par nom)
+        sans_historique = self.db.lister_clients(avec_historique=False)
+        self.assertEqual(len(sans_historique), 2)
+        self.assertTrue(all(c.historique_reservations == [] for c in sans_historique))
+
+    def test_transaction_validee_en_fin_de_bloc(self):
+        """Les écritures d'un bloc transaction sont validées ensemble"""
+        with self.db.transaction():
+            self.db.sauvegarder_vehicule(self.voiture_test)
+            self.db.sauvegarder_client(self.client_test)
+            # rien n'est encore validé sur disque
+            self.assertTrue(self.db.conn.in_transaction)
+
+        self.assertFalse(self.db.conn.in_transaction)
+        self.assertIsNotNone(self.db.charger_vehicule(self.voiture_test.id))
+        self.assertIsNotNone(self.db.charger_client(self.client_test.id))
+
+    def test_transaction_annulee_sur_exception(self):
+        """Une exception dans le bloc annule toutes les écritures"""
+        with self.assertRaises(ValueError):
+            with self.db.transaction():
+                self.db.sauvegarder_vehicule(self.voiture_test)
+                self.db.sauvegarder_client(self.client_test)
+                raise ValueError("échec volontaire")
+
+        self.assertEqual(self.db.charger_tous_vehicules(), [])
+        self.assertEqual(self.db.charger_tous_clients(), [])
+
+    def test_transaction_imbriquee(self):
+        """L'échec d'un bloc imbriqué n'annule que ses propres écritures"""
+        with self.db.transaction():
+            self.db.sauvegarder_vehicule(self.voiture_test)
+            try:
+                with self.db.transaction():
+                    self.db.sauvegarder_client(self.client_test)
+                    raise ValueError("échec volontaire")
+            except ValueError:
+                pass
+
+        self.assertEqual(len(self.db.charger_tous_vehicules()), 1)
+        self.assertEqual(self.db.charger_tous_clients(), [])
+
+    def test_sauvegarde_en_masse_generateur(self):
+        """Sauvegarde en masse depuis un générateur avec réaffectation des ids"""
+        self.db.sauvegarder_vehicule(self.voiture_test)
+        client_id = self.db.sauvegarder_client(self.client_test)
+
+        reservations = (
+            Reservation(
+                id=None, client_id=client_id, vehicule_id=self.voiture_test.id,
+                date_debut=datetime(2024, 1, 1) + timedelta(days=i * 10),
+                date_fin=datetime(2024, 1, 3) + timedelta(days=i * 10),
+                prix_total=float(i)
+            )
+            for i in range(25)
+        )
+
+        ids = self.db.sauvegarder_reservations_bulk(reservations, taille_lot=10)
+        self.assertEqual(len(ids), 25)
+        self.assertEqual(len(set(ids)), 25)
+
+        # chaque id réaffecté correspond bien à la ligne écrite
+        for i, reservation_id in enumerate(ids):
+            self.assertEqual(self.db.charger_reservation(reservation_id).prix_total, float(i))
+
+    def test_sauvegarde_en_masse_mise_a_jour(self):
+        """Les objets ayant déjà un id sont mis à jour, les autres insérés"""
+        self.db.sauvegarder_client(self.client_test)
+        self.client_test.telephone = "07 00 00 00 00"
+        nouveau = Client(id=None, nom="Durand", prenom="Marie", adresse="1 rue des Lilas",
+                         telephone="06 12 34 56 78", email="marie.durand@test.com")
+
+        ids = self.db.sauvegarder_clients_bulk([self.client_test, nouveau])
+
+        self.assertEqual(ids, [self.client_test.id, nouveau.id])
+        self.assertEqual(self.db.charger_client(self.client_test.id).telephone, "07 00 00 00 00")
+        self.assertEqual(self.db.charger_client(nouveau.id).nom, "Durand")
+
+    def test_sauvegarde_en_masse_atomique(self):
+        """Une erreur en cours d'import annule tous les lots déjà écrits"""
+        def vehicules():
+            for i in range(5):
+                yield Voiture(
+                    id=None, marque="Renault", modele="Clio", annee=2020,
+                    kilometrage=1000, prix_achat=15000, cout_entretien_annuel=500,
+                    nb_places=5, puissance=90, carburant="Essence", options=[]
+                )
+            raise ValueError("flux interrompu")
+
+        with self.assertRaises(ValueError):
+            self.db.sauvegarder_vehicules_bulk(vehicules(), taille_lot=2)
+
+        self.assertEqual(self.db.charger_tous_vehicules(), [])
+
+
+
+    def test_vehicules_disponibles(self):
+        """Disponibilité calculée en base : chevauchement, réservations annulées et critères"""
+        autre = Voiture(
+            id=None, marque="Renault", modele="Clio", annee=2020,
+            kilometrage=30000, prix_achat=15000, cout_entretien_annuel=600,
+            nb_places=5, puissance=90, carburant="Essence", options=[]
+        )
+        moto = Moto(
+            id=None, marque="Yamaha", modele="MT-07", annee=2022,
+            kilometrage=5000, prix_achat=7000, cout_entretien_annuel=400,
+            cylindree=690, type_moto="Roadster"
+        )
+        for vehicule in (self.voiture_test, autre, moto):
+            self.db.sauvegarder_vehicule(vehicule)
+        client_id = self.db.sauvegarder_client(self.client_test)
+
+        reservation = Reservation(id=None, client_id=client_id, vehicule_id=self.voiture_test.id,
+                                  date_debut=datetime(2024, 6, 10), date_fin=datetime(2024, 6, 15),
+                                  prix_total=300.0)
+        annulee = Reservation(id=None, client_id=client_id, vehicule_id=autre.id,
+                              date_debut=datetime(2024, 6, 10), date_fin=datetime(2024, 6, 15),
+                              prix_total=200.0)
+        annulee.annuler()
+        self.db.sauvegarder_reservations_bulk([reservation, annulee])
+
+        def disponibles(criteres, debut, fin):
+            return sorted(v.id for v in self.db.charger_vehicules_disponibles("Voiture", criteres, debut, fin))
+
+        # chevauchement (bornes incluses) : seule la voiture dont la réservation est annulée reste libre
+        self.assertEqual(disponibles({}, datetime(2024, 6, 15), datetime(2024, 6, 20)), [autre.id])
+        self.assertEqual(disponibles({}, datetime(2024, 6, 16), datetime(2024, 6, 20)),
+                         sorted([self.voiture_test.id, autre.id]))
+        self.assertEqual(disponibles({"puissance": {"min": 100}}, datetime(2024, 6, 16), datetime(2024, 6, 20)),
+                         [self.voiture_test.id])
+
+        self.assertFalse(self.db.vehicule_disponible(self.voiture_test.id, datetime(2024, 6, 1), datetime(2024, 6, 10)))
+        self.assertTrue(self.db.vehicule_disponible(self.voiture_test.id, datetime(2024, 6, 1), datetime(2024, 6, 10),
+                                                    reservation_id_a_exclure=reservation.id))
+
+        # comme dans le modèle, une réservation terminée ne bloque plus le véhicule
+        reservation.terminer()
+        self.db.sauvegarder_reservation(reservation)
+        self.assertEqual(disponibles({}, datetime(2024, 6, 15), datetime(2024, 6, 20)),
+                         sorted([self.voiture_test.id, autre.id]))
+
+    def test_disponibilite_par_index_partiel(self):
+        """Les requêtes de disponibilité sont servies par l'index partiel des réservations confirmées"""
+        requetes = []
+        self.db.conn.set_trace_callback(requetes.append)
+        self.db.vehicule_disponible(1, datetime(2024, 6, 10), datetime(2024, 6, 15))
+        self.db.charger_vehicules_disponibles("Voiture", {}, datetime(2024, 6, 10), datetime(2024, 6, 15))
+        self.db.conn.set_trace_callback(None)
+
+        self.assertEqual(len(requetes), 2)
+        for requete in requetes:
+            plan = " ".join(row[3] for row in self.db.conn.execute("EXPLAIN QUERY PLAN " + requete))
+            self.assertIn("idx_reservations_confirmees", plan)
+
+    def test_projections(self):
+        """Les projections ne lisent que les colonnes demandées, disponibilité comprise"""
+        moto = Moto(
+            id=None, marque="Yamaha", modele="MT-07", annee=2022,
+            kilometrage=5000, prix_achat=7000, cout_entretien_annuel=400,
+            cylindree=690, type_moto="Roadster"
+        )
+        self.db.sauvegarder_vehicules_bulk([self.voiture_test, moto])
+        client_id = self.db.sauvegarder_client(self.client_test)
+        self.db.sauvegarder_reservation(Reservation(
+            id=None, client_id=client_id, vehicule_id=self.voiture_test.id,
+            date_debut=datetime(2024, 6, 10), date_fin=datetime(2024, 6, 15), prix_total=300.0))
+
+        lignes = self.db.projeter_vehicules(("id", "marque", "puissance", "type_moto", "disponible"),
+                                            date_debut=datetime(2024, 6, 12), date_fin=datetime(2024, 6, 20))
+        self.assertEqual([tuple(ligne) for ligne in lignes],
+                         [(self.voiture_test.id, "Toyota", 120, None, 0), (moto.id, "Yamaha", None, "Roadster", 1)])
+        self.assertEqual(lignes[1].type_moto, "Roadster")
+        self.assertFalse(hasattr(lignes[0], "__dict__"))
+
+        libres = self.db.projeter_vehicules(("id",), {"type": "Voiture"}, datetime(2024, 6, 16),
+                                            datetime(2024, 6, 20), disponibles_seulement=True)
+        self.assertEqual([ligne.id for ligne in libres], [self.voiture_test.id])
+
+        self.assertEqual(self.db.projeter_clients(), [(client_id, "Martin", "Sophie")])
+        with self.assertRaises(ValueError):
+            self.db.projeter_vehicules(("id", "attributs_specifiques"))
+        with self.assertRaises(ValueError):
+            self.db.projeter_vehicules(("id", "disponible"))
+
+    def test_parcours_par_paquets(self):
+        """Les variantes iter_* renvoient les mêmes objets que les chargements de listes"""
+        clients = [Client(id=None, nom=f"Nom {i}", prenom="Test", adresse="1 rue des Tests",
+                          telephone="01 00 00 00 00", email=f"client{i}@test.com") for i in range(7)]
+        self.db.sauvegarder_clients_bulk(clients)
+        self.db.sauvegarder_vehicule(self.voiture_test)
+        self.db.sauvegarder_reservations_bulk(
+            Reservation(id=None, client_id=clients[i % 2].id, vehicule_id=self.voiture_test.id,
+                        date_debut=datetime(2024, 1, 1) + timedelta(days=i * 10),
+                        date_fin=datetime(2024, 1, 3) + timedelta(days=i * 10), prix_total=float(i))
+            for i in range(5)
+        )
+
+        # paquets plus petits que la table : les historiques sont remplis paquet par paquet
+        parcourus = list(self.db.iter_clients(taille_lot=3))
+        self.assertEqual([c.id for c in parcourus], [c.id for c in clients])
+        self.assertEqual(len(parcourus[0].historique_reservations), 3)
+        self.assertEqual(len(parcourus[1].historique_reservations), 2)
+
+        self.assertEqual([r.prix_total for r in self.db.iter_reservations(taille_lot=2)],
+                         [0.0, 1.0, 2.0, 3.0, 4.0])
+        periode = self.db.iter_reservations_vehicule(self.voiture_test.id, datetime(2024, 1, 10), datetime(2024, 1, 25))
+        self.assertEqual([r.prix_total for r in periode], [1.0, 2.0])
+        self.assertEqual([v.id for v in self.db.iter_vehicules()], [self.voiture_test.id])
+
+    def test_pagination_par_cle(self):
+        """apres_id / limite parcourent une table page par page"""
+        clients = [Client(id=None, nom=f"Nom {i}", prenom="Test", adresse="1 rue des Tests",
+                          telephone="01 00 00 00 00", email=f"client{i}@test.com") for i in range(5)]
+        self.db.sauvegarder_clients_bulk(clients)
+
+        pages = []
+        dernier_id = None
+        while True:
+            page = list(self.db.iter_clients(avec_historique=False, apres_id=dernier_id, limite=2))
+            if not page:
+                break
+            pages.append([c.id for c in page])
+            dernier_id = page[-1].id
+
+        self.assertEqual([len(page) for page in pages], [2, 2, 1])
+        self.assertEqual(sum(pages, []), [c.id for c in clients])
+
+        # un parcours abandonné ne bloque pas les écritures suivantes
+        parcours = self.db.iter_clients(taille_lot=1)
+        next(parcours)
+        parcours.close()
+        self.db.sauvegarder_client(self.client_test)
+
+
+class TestIndexDatabase(unittest.TestCase):
+    """Vérifie les index secondaires et leur utilisation par les requêtes de la DAL"""
+
+    def setUp(self):
+        self.temp_db = tempfile.NamedTemporaryFile(delete=False, suffix='.db')
+        self.temp_db.close()
+        self.db = Database(self.temp_db.name)
+
+        self.vehicule = Voiture(
+            id=None, marque="Toyota", modele="Corolla", annee=2021,
+            kilometrage=10000, prix_achat=20000, cout_entretien_annuel=700,
+            nb_places=5, puissance=120, carburant="Hybride", options=[]
+        )
+        self.client = Client(id=None, nom="Martin", prenom="Sophie", adresse="1 rue des Tests",
+                             telephone="01 98 76 54 32", email="sophie.martin@test.com")
+        self.db.sauvegarder_vehicule(self.vehicule)
+        self.db.sauvegarder_client(self.client)
+
+    def tearDown(self):
+        self.db.fermer()
+        os.unlink(self.temp_db.name)
+
+    def _noms_index(self):
+        self.db.cursor.execute("SELECT name FROM sqlite_master WHERE type = 'index'")
+        return {row[0] for row in self.db.cursor.fetchall()}
+
+    def test_index_crees(self):
+        """Tous les index gérés existent après l'ouverture"""
+        self.assertTrue(set(Database.INDEX_SECONDAIRES) <= self._noms_index())
+
+    def test_synchronisation_index(self):
+        """Un index modifié est reconstruit et un index obsolète est supprimé"""
+        self.db.cursor.execute("DROP INDEX idx_reservations_client")
+        self.db.cursor.execute("CREATE INDEX idx_reservations_client ON reservations (statut)")
+        self.db.cursor.execute("CREATE INDEX idx_obsolete ON clients (nom)")
+        self.db.conn.commit()
+
+        self.db._synchroniser_index()
+        self.assertNotIn("idx_obsolete", self._noms_index())
+        self.db.cursor.execute("SELECT sql FROM sqlite_master WHERE name = 'idx_reservations_client'")
+        self.assertIn("client_id", self.db.cursor.fetchone()[0])
+
+    def test_requetes_dal_utilisent_un_index(self):
+        """EXPLAIN QUERY PLAN : aucune requête filtrée de la DAL ne parcourt toute une table"""
+        requetes = []
+        self.db.conn.set_trace_callback(requetes.append)
+
+        reservation = Reservation(
+            id=None, client_id=self.client.id, vehicule_id=self.vehicule.id,
+            date_debut=datetime.now() + timedelta(days=1),
+            date_fin=datetime.now() + timedelta(days=3),
+            prix_total=150.0
+        )
+        self.db.sauvegarder_reservation(reservation)
+        self.db.charger_reservation(reservation.id)
+        self.db.charger_client(self.client.id)
+        self.db.charger_clients([self.client.id])
+        self.db.charger_reservations_vehicule(self.vehicule.id, datetime.now(), datetime.now() + timedelta(days=7))
+        self.db.charger_facture_par_reservation(reservation.id)
+        self.db.rechercher_vehicules({"marque": "Toyota"})
+        self.db.rechercher_vehicules({"type": "Voiture", "annee_min": 2020})
+        self.db.rechercher_vehicules({"prix_max": 30000})
+        self.db.rechercher_vehicules({"type": "Voiture", "puissance": {"min": 100}})
+        self.db.rechercher_vehicules({"carburant": "Hybride", "options": "GPS"})
+        list(self.db.iter_reservations_vehicule(self.vehicule.id, datetime.now(), apres_id=0, limite=10))
+        list(self.db.iter_clients(apres_id=0, limite=10))
+        self.db.charger_vehicules_disponibles("Voiture", {"puissance": {"min": 100}},
+                                              datetime.now(), datetime.now() + timedelta(days=2))
+        self.db.vehicule_disponible(self.vehicule.id, datetime.now(), datetime.now() + timedelta(days=2))
+        self.db.rechercher_clients({"nom": "mart"}, limite=10)
+        self.db.supprimer_vehicule(self.vehicule.id)
+        self.db.supprimer_client(self.client.id)
+        self.db.supprimer_reservation(reservation.id)
+
+        self.db.conn.set_trace_callback(None)
+
+        requetes_filtrees = [r for r in requetes if r.lstrip().upper().startswith("SELECT") and "WHERE" in r.upper()]
+        self.assertTrue(requetes_filtrees)
+
+        for requete in requetes_filtrees:
+            self.db.cursor.execute("EXPLAIN QUERY PLAN " + requete)
+            plan = [row[3] for row in self.db.cursor.fetchall()]
+            for etape in plan:
+                self.assertFalse(etape.startswith("SCAN") and "INDEX" not in etape,
+                                 f"parcours complet pour: {requete.strip()} -> {plan}")
+
+
+class TestCacheDatabase(unittest.TestCase):
+    """Vérifie la carte d'identité et le cache LRU des chargements unitaires"""
+
+    def setUp(self):
+        self.temp_db = tempfile.NamedTemporaryFile(delete=False, suffix='.db')
+        self.temp_db.close()
+        self.db = Database(self.temp_db.name, taille_cache=2)
+
+        self.vehicules = [
+            Voiture(id=None, marque="Toyota", modele=f"Modele {i}", annee=2021,
+                    kilometrage=10000, prix_achat=20000, cout_entretien_annuel=700,
+                    nb_places=5, puissance=120, carburant="Hybride", options=[])
+            for i in range(3)
+        ]
+        self.db.sauvegarder_vehicules_bulk(self.vehicules)
+        self.client = Client(id=None, nom="Martin", prenom="Sophie", adresse="1 rue des Tests",
+                             telephone="01 98 76 54 32", email="sophie.martin@test.com")
+        self.db.sauvegarder_client(self.client)
+
+    def tearDown(self):
+        self.db.fermer()
+        os.unlink(self.temp_db.name)
+
+    def test_meme_objet_pour_le_meme_id(self):
+        """Deux chargements du même véhicule renvoient le même objet"""
+        premier = self.db.charger_vehicule(self.vehicules[0].id)
+        self.assertIs(self.db.charger_vehicule(self.vehicules[0].id), premier)
+        self.assertEqual(self.db.cache.succes, 1)
+        self.assertEqual(self.db.cache.echecs, 1)
+
+    def test_lru_borne(self):
+        """Le cache LRU ne garde que les derniers objets chargés"""
+        for vehicule in self.vehicules:
+            self.db.charger_vehicule(vehicule.id)
+        gc.collect()
+
+        stats = self.db.cache.statistiques()
+        self.assertEqual(stats["lru"], 2)
+        # le premier véhicule, évincé et plus référencé, est relu depuis la base
+        self.db.charger_vehicule(self.vehicules[0].id)
+        self.db.charger_vehicule(self.vehicules[2].id)
+        self.assertEqual(self.db.cache.echecs, 4)
+        self.assertEqual(self.db.cache.succes, 1)
+
+    def test_invalidation_par_les_ecritures(self):
+        """Sauvegarde et suppression retirent les objets du cache"""
+        vehicule = self.db.charger_vehicule(self.vehicules[0].id)
+        copie = Voiture(id=vehicule.id, marque="Toyota", modele="Yaris", annee=2021,
+                        kilometrage=10000, prix_achat=20000, cout_entretien_annuel=700,
+                        nb_places=5, puissance=120, carburant="Hybride", options=[])
+        self.db.sauvegarder_vehicule(copie)
+        self.assertEqual(self.db.charger_vehicule(vehicule.id).modele, "Yaris")
+
+        self.db.supprimer_vehicule(vehicule.id)
+        self.assertIsNone(self.db.charger_vehicule(vehicule.id))
+
+    def test_historique_client_invalide_par_une_reservation(self):
+        """Une nouvelle réservation retire le client (et son historique) du cache"""
+        client = self.db.charger_client(self.client.id)
+        self.assertEqual(client.historique_reservations, [])
+
+        self.db.sauvegarder_reservation(Reservation(
+            id=None, client_id=self.client.id, vehicule_id=self.vehicules[0].id,
+            date_debut=datetime(2024, 1, 1), date_fin=datetime(2024, 1, 3), prix_total=100.0
+        ))
+        self.assertEqual(len(self.db.charger_client(self.client.id).historique_reservations), 1)
+
+    def test_reservation_invalide_seulement_son_client(self):
+        """Une réservation ne retire du cache que son client (ancien et nouveau en cas de réattribution)"""
+        autre = Client(id=None, nom="Durand", prenom="Paul", adresse="2 rue des Tests",
+                       telephone="01 11 22 33 44", email="paul.durand@test.com")
+        self.db.sauvegarder_client(autre)
+        client, client_autre = self.db.charger_client(self.client.id), self.db.charger_client(autre.id)
+
+        reservation = Reservation(id=None, client_id=self.client.id, vehicule_id=self.vehicules[0].id,
+                                  date_debut=datetime(2024, 1, 1), date_fin=datetime(2024, 1, 3), prix_total=100.0)
+        self.db.sauvegarder_reservation(reservation)
+        self.assertIs(self.db.charger_client(autre.id), client_autre)
+        client = self.db.charger_client(self.client.id)
+        self.assertEqual(len(client.historique_reservations), 1)
+
+        # réattribution : l'ancien et le nouveau client sont relus
+        reservation.client_id = autre.id
+        self.db.sauvegarder_reservation(reservation)
+        self.assertEqual(self.db.charger_client(self.client.id).historique_reservations, [])
+        self.assertEqual(len(self.db.charger_client(autre.id).historique_reservations), 1)
+
+        client_autre = self.db.charger_client(autre.id)
+        self.db.supprimer_reservation(reservation.id)
+        self.assertIsNot(self.db.charger_client(autre.id), client_autre)
+
+    def test_invalidation_par_table(self):
+        """Vider une table du cache ne touche pas aux autres tables, LRU compris"""
+        vehicules = [self.db.charger_vehicule(vehicule.id) for vehicule in self.vehicules]
+        client = self.db.charger_client(self.client.id)
+
+        self.db.cache.invalider_table('clients')
+        self.assertIs(self.db.charger_vehicule(self.vehicules[2].id), vehicules[2])
+        self.assertIsNot(self.db.charger_client(self.client.id), client)
+        self.assertEqual(self.db.cache.statistiques()["lru"], 2)
+
+        self.db.cache.invalider_table('vehicules')
+        self.assertEqual(self.db.cache.statistiques()["lru"], 1)
+
+    def test_cache_vide_apres_annulation(self):
+        """Un objet chargé dans une transaction annulée n'est pas conservé"""
+        with self.assertRaises(ValueError):
+            with self.db.transaction():
+                self.vehicules[1].modele = "Annulé"
+                self.db.sauvegarder_vehicule(self.vehicules[1])
+                self.assertEqual(self.db.charger_vehicule(self.vehicules[1].id).modele, "Annulé")
+                raise ValueError("annulation")
+
+        self.assertEqual(self.db.charger_vehicule(self.vehicules[1].id).modele, "Modele 1")
+
+    def test_chargements_en_masse_par_la_carte_identite(self):
+        """Les chargements en masse renvoient les objets déjà chargés et alimentent le cache"""
+        vehicule = self.db.charger_vehicule(self.vehicules[0].id)
+        tous = self.db.charger_tous_vehicules()
+        self.assertIs(tous[0], vehicule)
+        self.assertIs(self.db.charger_vehicule(self.vehicules[1].id), tous[1])
+        self.assertIs(self.db.rechercher_vehicules({"modele": "Modele 2"})[0], tous[2])
+
+        reservation = Reservation(id=None, client_id=self.client.id, vehicule_id=self.vehicules[0].id,
+                                  date_debut=datetime(2024, 1, 1), date_fin=datetime(2024, 1, 3), prix_total=100.0)
+        self.db.sauvegarder_reservation(reservation)
+        client = self.db.charger_clients([self.client.id])[0]
+        self.assertIs(self.db.charger_client(self.client.id), client)
+        self.assertIs(self.db.charger_reservation(reservation.id), client.historique_reservations[0])
+        self.assertIs(self.db.charger_reservations_vehicule(self.vehicules[0].id)[0],
+                      client.historique_reservations[0])
+
+    def test_objet_lu_pendant_une_invalidation_non_enregistre(self):
+        """Un objet lu avant une invalidation concurrente n'entre pas dans le cache"""
+        generation = self.db.cache.generation
+        objet = self.db._vehicule_depuis_row(
+            self.db.conn.execute('SELECT * FROM vehicules WHERE id = ?', (self.vehicules[0].id,)).fetchone())
+        self.db.cache.invalider('vehicules', self.vehicules[0].id)
+
+        self.assertIs(self.db.cache.enregistrer('vehicules', objet.id, objet, generation), objet)
+        self.assertIsNot(self.db.charger_vehicule(objet.id), objet)
+
+
+class TestRechercheClients(unittest.TestCase):
+    """Vérifie la recherche de clients (index plein texte FTS5 et repli LIKE)"""
+
+    def setUp(self):
+        self.temp_db = tempfile.NamedTemporaryFile(delete=False, suffix='.db')
+        self.temp_db.close()
+        self.db = Database(self.temp_db.name)
+
+        self.clients = [
+            Client(id=None, nom="Dupont", prenom="Hélène", adresse="1 rue des Tests",
+                   telephone="01 23 45 67 89", email="helene.dupont@test.com"),
+            Client(id=None, nom="Dupuis", prenom="Jean", adresse="2 rue des Tests",
+                   telephone="06 11 22 33 44", email="jean.dupuis@test.com"),
+            Client(id=None, nom="Lefèvre", prenom="Éric", adresse="3 rue des Tests",
+                   telephone="07 98 76 54 32", email="eric@exemple.fr"),
+        ]
+        self.db.sauvegarder_clients_bulk(self.clients)
+
+    def tearDown(self):
+        self.db.fermer()
+        os.unlink(self.temp_db.name)
+
+    def _noms(self, criteres, limite=None):
+        return sorted(c.nom for c in self.db.rechercher_clients(criteres, limite=limite))
+
+    @unittest.skipUnless(sqlite3.connect(":memory:").execute(
+        "SELECT sqlite_compileoption_used('ENABLE_FTS5')").fetchone()[0], "sqlite sans FTS5")
+    def test_recherche_prefixe_sans_accents(self):
+        """Recherche par début de mot, sans tenir compte des accents ni de la casse"""
+        self.assertTrue(self.db.recherche_plein_texte)
+        self.assertEqual(self._noms({"nom": "dup"}), ["Dupont", "Dupuis"])
+        self.assertEqual(self._noms({"prenom": "helene"}), ["Dupont"])
+        self.assertEqual(self._noms({"texte": "LEFEV"}), ["Lefèvre"])
+        self.assertEqual(self._noms({"texte": "jean.dup"}), ["Dupuis"])
+        self.assertEqual(self._noms({"nom": "dup", "prenom": "je"}), ["Dupuis"])
+        self.assertEqual(len(self._noms({"nom": "dup"}, limite=1)), 1)
+        # la syntaxe fts5 dans la saisie est neutralisée (guillemets, opérateurs cherchés comme des mots)
+        self.assertEqual(self._noms({"texte": 'dup"*'}), ["Dupont", "Dupuis"])
+        self.assertEqual(self._noms({"texte": "dup NOT jean"}), [])
+
+    @unittest.skipUnless(sqlite3.connect(":memory:").execute(
+        "SELECT sqlite_compileoption_used('ENABLE_FTS5')").fetchone()[0], "sqlite sans FTS5")
+    def test_index_suit_les_ecritures(self):
+        """Les triggers tiennent l'index plein texte à jour"""
+        client = self.clients[0]
+        client.nom = "Martin"
+        self.db.sauvegarder_client(client)
+        self.assertEqual(self._noms({"nom": "dupo"}), [])
+        self.assertEqual(self._noms({"nom": "mart"}), ["Martin"])
+
+        self.db.supprimer_client(client.id)
+        self.assertEqual(self._noms({"nom": "mart"}), [])
+        # intégrité de l'index à contenu externe
+        self.db.conn.execute("INSERT INTO clients_fts (clients_fts) VALUES ('integrity-check')")
+
+    def test_repli_like(self):
+        """Sans index plein texte, recherche par sous-chaîne"""
+        self.db.recherche_plein_texte = False
+        self.assertEqual(self._noms({"nom": "upo"}), ["Dupont"])
+        self.assertEqual(self._noms({"texte": "exemple"}), ["Lefèvre"])
+
+
+class TestArchiveDatabase(unittest.TestCase):
+    """Vérifie l'archivage des réservations clôturées dans un fichier attaché"""
+
+    def setUp(self):
+        self.temp_db = tempfile.NamedTemporaryFile(delete=False, suffix='.db')
+        self.temp_db.close()
+        self.temp_archive = tempfile.NamedTemporaryFile(delete=False, suffix='.db')
+        self.temp_archive.close()
+        self.db = Database(self.temp_db.name, chemin_archive=self.temp_archive.name)
+
+        self.vehicule = Voiture(
+            id=None, marque="Toyota", modele="Corolla", annee=2021,
+            kilometrage=10000, prix_achat=20000, cout_entretien_annuel=700,
+            nb_places=5, puissance=120, carburant="Hybride", options=[]
+        )
+        self.client = Client(id=None, nom="Martin", prenom="Sophie", adresse="1 rue des Tests",
+                             telephone="01 98 76 54 32", email="sophie.martin@test.com")
+        self.db.sauvegarder_vehicule(self.vehicule)
+        self.db.sauvegarder_client(self.client)
+
+        def reservation(debut, statut):
+            return Reservation(id=None, client_id=self.client.id, vehicule_id=self.vehicule.id,
+                               date_debut=debut, date_fin=debut + timedelta(days=2), prix_total=100.0,
+                               statut=statut)
+
+        # deux réservations anciennes et clôturées, une ancienne encore confirmée, une récente terminée
+        self.reservations = [
+            reservation(datetime(2020, 1, 1), "terminée"),
+            reservation(datetime(2020, 2, 1), "annulée"),
+            reservation(datetime(2020, 3, 1), "confirmée"),
+            reservation(datetime(2024, 5, 1), "terminée"),
+        ]
+        self.db.sauvegarder_reservations_bulk(self.reservations)
+
+    def tearDown(self):
+        self.db.fermer()
+        os.unlink(self.temp_db.name)
+        os.unlink(self.temp_archive.name)
+
+    def test_archivage_par_lots(self):
+        """Seules les réservations clôturées plus anciennes que l'horizon sont déplacées"""
+        nb = self.db.archiver_reservations(horizon_jours=365, taille_lot=1, maintenant=datetime(2024, 6, 1))
+        self.assertEqual(nb, 2)
+
+        courantes = self.db.conn.execute("SELECT id FROM main.reservations ORDER BY id").fetchall()
+        archivees = self.db.conn.execute("SELECT id FROM archive.reservations ORDER BY id").fetchall()
+        self.assertEqual([row[0] for row in courantes], [self.reservations[2].id, self.reservations[3].id])
+        self.assertEqual([row[0] for row in archivees], [self.reservations[0].id, self.reservations[1].id])
+
+        # un nouvel archivage ne trouve plus rien
+        self.assertEqual(self.db.archiver_reservations(horizon_jours=365, maintenant=datetime(2024, 6, 1)), 0)
+
+    def test_consultation_des_deux_fichiers(self):
+        """Historiques et exports lisent l'archive, la disponibilité seulement la table courante"""
+        self.db.archiver_reservations(horizon_jours=365, maintenant=datetime(2024, 6, 1))
+
+        self.assertEqual(len(self.db.charger_reservations_client(self.client.id)), 4)
+        self.assertEqual(len(self.db.charger_client(self.client.id).historique_reservations), 4)
+        self.assertEqual([r.id for r in self.db.iter_reservations()], [r.id for r in self.reservations])
+        self.assertEqual(self.db.charger_reservation(self.reservations[0].id).statut, "terminée")
+        self.assertEqual(len(self.db.charger_reservations_vehicule(self.vehicule.id)), 2)
+
+        # le client garde des réservations (archivées) : suppression refusée
+        self.assertFalse(self.db.supprimer_client(self.client.id))
+
+        # une autre session (ex: poste de reporting) voit aussi l'archive
+        autre = Database(self.temp_db.name, chemin_archive=self.temp_archive.name)
+        self.assertEqual(len(autre.charger_reservations_client(self.client.id)), 4)
+        autre.fermer()
+
+    def _nouvelle_reservation(self, debut):
+        reservation = Reservation(id=None, client_id=self.client.id, vehicule_id=self.vehicule.id,
+                                  date_debut=debut, date_fin=debut + timedelta(days=2), prix_total=50.0,
+                                  statut="terminée")
+        self.db.sauvegarder_reservation(reservation)
+        return reservation
+
+    def test_ids_jamais_reattribues(self):
+        """Une réservation créée après l'archivage des plus récentes ne reprend pas leur id"""
+        # la réservation d'id maximal devient archivable
+        self.reservations[3].date_debut, self.reservations[3].date_fin = datetime(2020, 4, 1), datetime(2020, 4, 3)
+        self.db.sauvegarder_reservation(self.reservations[3])
+        self.assertEqual(self.db.archiver_reservations(horizon_jours=365, maintenant=datetime(2024, 6, 1)), 3)
+
+        nouvelle = self._nouvelle_reservation(datetime(2020, 5, 1))
+        self.assertGreater(nouvelle.id, max(r.id for r in self.reservations))
+
+        ids = [r.id for r in self.db.charger_reservations_client(self.client.id)]
+        self.assertEqual(len(ids), 5)
+        self.assertEqual(len(set(ids)), 5)
+
+        # un second archivage ajoute la nouvelle réservation sans remplacer les anciennes
+        self.assertEqual(self.db.archiver_reservations(horizon_jours=365, maintenant=datetime(2024, 6, 1)), 1)
+        nb_archivees = self.db.conn.execute("SELECT COUNT(*) FROM archive.reservations").fetchone()[0]
+        self.assertEqual(nb_archivees, 4)
+        self.assertEqual(self.db.charger_reservation(self.reservations[0].id).prix_total, 100.0)
+
+    def test_sequence_alignee_sur_archive(self):
+        """Une archive contenant des ids plus grands que la base repousse la séquence des ids"""
+        self.db.conn.execute("INSERT INTO archive.reservations VALUES (100, ?, ?, 0, 86400, 10.0, 'terminée')",
+                             (self.client.id, self.vehicule.id))
+        self.db.conn.commit()
+        self.db.fermer()
+
+        self.db = Database(self.temp_db.name, chemin_archive=self.temp_archive.name)
+        self.assertGreater(self._nouvelle_reservation(datetime(2024, 7, 1)).id, 100)
+
+    def test_collision_archive_refusee(self):
+        """Un id déjà archivé avec un autre contenu fait échouer le lot au lieu d'écraser l'archive"""
+        self.db.conn.execute("INSERT INTO archive.reservations VALUES (?, ?, ?, 0, 86400, 10.0, 'terminée')",
+                             (self.reservations[0].id, self.client.id, self.vehicule.id))
+        self.db.conn.commit()
+
+        with self.assertRaises(sqlite3.IntegrityError):
+            self.db.archiver_reservations(horizon_jours=365, maintenant=datetime(2024, 6, 1))
+
+        prix = self.db.conn.execute("SELECT prix_total FROM archive.reservations WHERE id = ?",
+                                    (self.reservations[0].id,)).fetchone()[0]
+        self.assertEqual(prix, 10.0)
+        self.assertEqual(self.db.conn.execute("SELECT COUNT(*) FROM main.reservations").fetchone()[0], 4)
+
+    def test_reprise_apres_copie_partielle(self):
+        """Une réservation déjà copiée à l'identique (arrêt entre copie et suppression) est seulement retirée"""
+        self.db.conn.execute("INSERT INTO archive.reservations SELECT * FROM main.reservations WHERE id = ?",
+                             (self.reservations[0].id,))
+        self.db.conn.commit()
+
+        self.assertEqual(self.db.archiver_reservations(horizon_jours=365, maintenant=datetime(2024, 6, 1)), 2)
+        self.assertEqual(self.db.conn.execute("SELECT COUNT(*) FROM archive.reservations").fetchone()[0], 2)
+
+
+class TestAgregatsDatabase(unittest.TestCase):
+    """Vérifie les agrégats de chiffre d'affaires et du parc tenus à jour par triggers"""
+
+    def setUp(self):
+        self.temp_db = tempfile.NamedTemporaryFile(delete=False, suffix='.db')
+        self.temp_db.close()
+        self.temp_archive = tempfile.NamedTemporaryFile(delete=False, suffix='.db')
+        self.temp_archive.close()
+        self.db = Database(self.temp_db.name, chemin_archive=self.temp_archive.name)
+
+        self.voiture = Voiture(
+            id=None, marque="Toyota", modele="Corolla", annee=2020,
+            kilometrage=10000, prix_achat=20000, cout_entretien_annuel=700,
+            nb_places=5, puissance=120, carburant="Hybride", options=[]
+        )
+        self.moto = Moto(
+            id=None, marque="Yamaha", modele="MT-07", annee=2022,
+            kilometrage=5000, prix_achat=7000, cout_entretien_annuel=400,
+            cylindree=690, type_moto="Roadster"
+        )
+        self.db.sauvegarder_vehicules_bulk([self.voiture, self.moto])
+        self.client_id = self.db.sauvegarder_client(
+            Client(id=None, nom="Martin", prenom="Sophie", adresse="1 rue des Tests",
+                   telephone="01 98 76 54 32", email="sophie.martin@test.com"))
+
+        self.reservations = [
+            Reservation(id=None, client_id=self.client_id, vehicule_id=self.voiture.id,
+                        date_debut=datetime(2023, 1, 10), date_fin=datetime(2023, 1, 12), prix_total=100.0,
+                        statut="terminée"),
+            Reservation(id=None, client_id=self.client_id, vehicule_id=self.voiture.id,
+                        date_debut=datetime(2023, 1, 10, 15), date_fin=datetime(2023, 1, 11), prix_total=50.0),
+            Reservation(id=None, client_id=self.client_id, vehicule_id=self.moto.id,
+                        date_debut=datetime(2023, 2, 1), date_fin=datetime(2023, 2, 3), prix_total=80.0),
+            Reservation(id=None, client_id=self.client_id, vehicule_id=self.moto.id,
+                        date_debut=datetime(2023, 2, 5), date_fin=datetime(2023, 2, 6), prix_total=999.0,
+                        statut="annulée"),
+        ]
+        self.db.sauvegarder_reservations_bulk(self.reservations)
+
+    def tearDown(self):
+        self.db.fermer()
+        os.unlink(self.temp_db.name)
+        os.unlink(self.temp_archive.name)
+
+    def test_revenus_agreges(self):
+        """Chiffre d'affaires par type et par mois, par véhicule et par jour"""
+        self.assertEqual(self.db.charger_revenus_par_type_mois(), [
+            {"type": "Voiture", "mois": "2023-01", "revenus": 150.0, "nb_reservations": 2},
+            {"type": "Moto", "mois": "2023-02", "revenus": 80.0, "nb_reservations": 1},
+        ])
+        self.assertEqual(self.db.charger_revenus_vehicule(self.voiture.id),
+                         [(datetime(2023, 1, 10), 150.0, 2)])
+        self.assertEqual(self.db.calculer_bilan(), {"revenus": 230.0, "cout_entretien": 1100.0,
+                                                    "rentabilite": -870.0})
+
+    def test_agregats_suivent_les_ecritures(self):
+        """Annulation, suppression et modification de véhicule mettent à jour les agrégats"""
+        self.reservations[1].annuler()
+        self.db.sauvegarder_reservation(self.reservations[1])
+        self.db.supprimer_reservation(self.reservations[2].id)
+        self.assertEqual(self.db.charger_revenus_par_type_mois(), [
+            {"type": "Voiture", "mois": "2023-01", "revenus": 100.0, "nb_reservations": 1},
+        ])
+
+        self.moto.cout_entretien_annuel = 500
+        self.db.sauvegarder_vehicule(self.moto)
+        self.assertEqual(self.db.charger_statistiques_parc()["Moto"]["cout_entretien_total"], 500)
+        self.db.supprimer_reservation(self.reservations[3].id)
+        self.db.supprimer_vehicule(self.moto.id)
+        self.assertNotIn("Moto", self.db.charger_statistiques_parc())
+
+        # le recalcul complet donne les mêmes valeurs que les triggers
+        recalcul = self.db.conn.execute(
+            "SELECT TOTAL(prix_total) FROM reservations WHERE statut IN ('confirmée', 'terminée')").fetchone()[0]
+        self.assertEqual(self.db.calculer_bilan()["revenus"], recalcul)
+
+    def test_archivage_conserve_les_revenus(self):
+        """Les réservations archivées restent comptées dans le chiffre d'affaires"""
+        avant = self.db.calculer_bilan()
+        self.assertEqual(self.db.archiver_reservations(horizon_jours=30, maintenant=datetime(2024, 1, 1)), 2)
+        self.assertEqual(self.db.calculer_bilan(), avant)
+        self.assertEqual(self.db.conn.execute("SELECT COUNT(*) FROM archivage_en_cours").fetchone()[0], 0)
+
+    def test_calcul_initial_avec_archive(self):
+        """Le calcul initial des agrégats (migration 8) compte les réservations déjà archivées"""
+        avant = self.db.calculer_bilan()
+        revenus_par_mois = self.db.charger_revenus_par_type_mois()
+        self.assertEqual(self.db.archiver_reservations(horizon_jours=30, maintenant=datetime(2024, 1, 1)), 2)
+
+        # base dont les réservations ont été archivées avant la création des agrégats
+        objets = self.db.conn.execute("SELECT type, name FROM sqlite_master WHERE name LIKE 'stats_%' "
+                                      "OR name = 'archivage_en_cours' ORDER BY type = 'table'").fetchall()
+        with self.db.transaction():
+            for type_objet, nom in objets:
+                self.db.conn.execute(f"DROP {type_objet.upper()} {nom}")
+            MIGRATIONS[7].schema(self.db)
+
+        self.assertEqual(self.db.calculer_bilan(), avant)
+        self.assertEqual(self.db.charger_revenus_par_type_mois(), revenus_par_mois)
+
+    def test_changement_de_type_deplace_les_revenus(self):
+        """Le chiffre d'affaires d'un véhicule qui change de type passe sous son nouveau type, archives comprises"""
+        self.db.archiver_reservations(horizon_jours=30, maintenant=datetime(2024, 1, 1))
+        utilitaire = Utilitaire(id=self.voiture.id, marque="Toyota", modele="Proace", annee=2020,
+                                kilometrage=10000, prix_achat=20000, cout_entretien_annuel=700,
+                                volume=6, charge_utile=1000, hayon=False)
+        self.db.sauvegarder_vehicule(utilitaire)
+
+        self.assertEqual(self.db.charger_revenus_par_type_mois(), [
+            {"type": "Utilitaire", "mois": "2023-01", "revenus": 150.0, "nb_reservations": 2},
+            {"type": "Moto", "mois": "2023-02", "revenus": 80.0, "nb_reservations": 1},
+        ])
+        self.assertNotIn("Voiture", self.db.charger_statistiques_parc())
+
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+@unittest.skipUnless(numpy, "numpy non installé")
+class TestExportColonnes(unittest.TestCase):
+    """Vérifie l'export en colonnes numpy des réservations et du parc"""
+
+    def setUp(self):
+        self.temp_db = tempfile.NamedTemporaryFile(delete=False, suffix='.db')
+        self.temp_db.close()
+        self.temp_archive = tempfile.NamedTemporaryFile(delete=False, suffix='.db')
+        self.temp_archive.close()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db = Database(self.temp_db.name, chemin_archive=self.temp_archive.name)
+
+        self.voiture = Voiture(
+            id=None, marque="Toyota", modele="Corolla", annee=2020,
+            kilometrage=10000, prix_achat=20000, cout_entretien_annuel=700,
+            nb_places=5, puissance=120, carburant="Hybride", options=[]
+        )
+        self.moto = Moto(
+            id=None, marque="Yamaha", modele="MT-07", annee=2022,
+            kilometrage=5000, prix_achat=7000, cout_entretien_annuel=400,
+            cylindree=690, type_moto="Roadster"
+        )
+        self.db.sauvegarder_vehicules_bulk([self.voiture, self.moto])
+        self.client_id = self.db.sauvegarder_client(
+            Client(id=None, nom="Martin", prenom="Sophie", adresse="1 rue des Tests",
+                   telephone="01 98 76 54 32", email="sophie.martin@test.com"))
+
+        self.maintenant = datetime(2024, 6, 1)
+        self.reservations = [
+            Reservation(id=None, client_id=self.client_id, vehicule_id=self.voiture.id,
+                        date_debut=datetime(2022, 1, 10), date_fin=datetime(2022, 1, 12), prix_total=100.0,
+                        statut="terminée"),
+            Reservation(id=None, client_id=self.client_id, vehicule_id=self.voiture.id,
+                        date_debut=datetime(2024, 5, 1), date_fin=datetime(2024, 5, 10, 12), prix_total=450.0,
+                        statut="terminée"),
+            Reservation(id=None, client_id=self.client_id, vehicule_id=self.moto.id,
+                        date_debut=datetime(2023, 5, 20), date_fin=datetime(2023, 6, 10), prix_total=800.0),
+            Reservation(id=None, client_id=self.client_id, vehicule_id=self.moto.id,
+                        date_debut=datetime(2024, 2, 5), date_fin=datetime(2024, 2, 6), prix_total=99.0,
+                        statut="annulée"),
+        ]
+        self.db.sauvegarder_reservations_bulk(self.reservations)
+        self.db.archiver_reservations(maintenant=self.maintenant)
+
+    def tearDown(self):
+        self.db.fermer()
+        self.temp_dir.cleanup()
+        os.unlink(self.temp_db.name)
+        os.unlink(self.temp_archive.name)
+
+    def test_export_en_memoire(self):
+        """Les colonnes reprennent les réservations archivées comprises, triées par id"""
+        from utils.colonnes import STATUTS_RESERVATION, TYPES_VEHICULE
+
+        colonnes = self.db.exporter_colonnes(taille_lot=3)
+        reservations = colonnes["reservations"]
+        self.assertEqual(reservations["id"].tolist(), [r.id for r in self.reservations])
+        self.assertEqual(reservations["prix_total"].tolist(), [100.0, 450.0, 800.0, 99.0])
+        self.assertEqual(reservations["statut"].tolist(),
+                         [STATUTS_RESERVATION.index(r.statut) for r in self.reservations])
+        self.assertEqual(reservations["date_debut"][1], encoder_date(datetime(2024, 5, 1)))
+        self.assertEqual(colonnes["vehicules"]["type"].tolist(),
+                         [TYPES_VEHICULE.index("Voiture"), TYPES_VEHICULE.index("Moto")])
+
+    def test_export_fichiers_projetes(self):
+        """L'export sur disque se recharge en lecture seule par projection mémoire"""
+        from utils.colonnes import charger_colonnes
+
+        en_memoire = self.db.exporter_colonnes()
+        self.db.exporter_colonnes(self.temp_dir.name, taille_lot=2)
+        colonnes = charger_colonnes(self.temp_dir.name)
+        self.assertIsInstance(colonnes["reservations"], numpy.memmap)
+        self.assertFalse(colonnes["reservations"].flags.writeable)
+        for nom in ("reservations", "vehicules"):
+            self.assertTrue(numpy.array_equal(colonnes[nom], en_memoire[nom]))
+        del colonnes
+
+    def test_taux_utilisation_identique_au_parc(self):
+        """Le taux vectorisé donne les mêmes valeurs que Parc._calculer_taux_utilisation"""
+        from unittest import mock
+        from model.parc import Parc
+        from utils.colonnes import taux_utilisation
+
+        parc = Parc()
+        parc.vehicules = [self.voiture, self.moto]
+        with mock.patch('model.parc.datetime') as horloge:
+            horloge.now.return_value = self.maintenant
+            attendu = parc._calculer_taux_utilisation(self.reservations)
+
+        taux = taux_utilisation(self.db.exporter_colonnes(), maintenant=self.maintenant)
+        self.assertEqual(taux.keys(), attendu.keys())
+        for vehicule_id, valeur in attendu.items():
+            self.assertAlmostEqual(taux[vehicule_id], valeur)
+
+
+class TestPoolDatabase(unittest.TestCase):
+    """Vérifie le mode pool (WAL, une connexion par thread, un seul écrivain)"""
+
+    def setUp(self):
+        self.temp_db = tempfile.NamedTemporaryFile(delete=False, suffix='.db')
+        self.temp_db.close()
+        self.db = Database(self.temp_db.name, pool=True)
+
+        self.vehicule = Voiture(
+            id=None, marque="Toyota", modele="Corolla", annee=2021,
+            kilometrage=10000, prix_achat=20000, cout_entretien_annuel=700,
+            nb_places=5, puissance=120, carburant="Hybride", options=[]
+        )
+        self.client = Client(id=None, nom="Martin", prenom="Sophie", adresse="1 rue des Tests",
+                             telephone="01 98 76 54 32", email="sophie.martin@test.com")
+        self.db.sauvegarder_vehicule(self.vehicule)
+        self.db.sauvegarder_client(self.client)
+
+    def tearDown(self):
+        self.db.fermer()
+        for suffixe in ('', '-wal', '-shm'):
+            if os.path.exists(self.temp_db.name + suffixe):
+                os.unlink(self.temp_db.name + suffixe)
+
+    def test_mode_wal(self):
+        """Le journal WAL est activé en mode pool"""
+        mode = self.db.conn.execute("PRAGMA journal_mode").fetchone()[0]
+        self.assertEqual(mode.lower(), "wal")
+
+    def test_reservation_atomique_entre_processus(self):
+        """Des réservations concurrentes du même créneau depuis des connexions séparées : une seule passe"""
+        nb_postes = 6
+        depart = threading.Barrier(nb_postes)
+        resultats = []
+
+        def poste():
+            # une Database par poste : connexions et verrous indépendants, comme des processus séparés
+            db = Database(self.temp_db.name)
+            reservation = Reservation(id=None, client_id=self.client.id, vehicule_id=self.vehicule.id,
+                                      date_debut=datetime(2024, 7, 1), date_fin=datetime(2024, 7, 5),
+                                      prix_total=250.0)
+            depart.wait()
+            resultats.append(db.reserver_atomiquement(reservation))
+            db.fermer()
+
+        postes = [threading.Thread(target=poste) for _ in range(nb_postes)]
+        for thread in postes:
+            thread.start()
+        for thread in postes:
+            thread.join()
+
+        self.assertEqual(sorted(resultats), [False] * (nb_postes - 1) + [True])
+        self.assertEqual(len(self.db.charger_reservations_vehicule(self.vehicule.id)), 1)
+
+        # un créneau libre reste réservable
+        suivante = Reservation(id=None, client_id=self.client.id, vehicule_id=self.vehicule.id,
+                               date_debut=datetime(2024, 7, 6), date_fin=datetime(2024, 7, 8), prix_total=100.0)
+        self.assertTrue(self.db.reserver_atomiquement(suivante))
+        self.assertIsNotNone(suivante.id)
+
+    def test_cache_invalide_apres_validation(self):
+        """Un objet relu par un autre thread avant la validation d'une écriture n'est pas gardé en cache"""
+        lus = []
+
+        def lire():
+            lus.append(self.db.charger_vehicule(self.vehicule.id))
+
+        with self.db.transaction():
+            self.vehicule.modele = "Yaris"
+            self.db.sauvegarder_vehicule(self.vehicule)
+            # l'autre thread voit encore la ligne validée et la met en cache
+            lecteur = threading.Thread(target=lire)
+            lecteur.start()
+            lecteur.join()
+
+        lecteur = threading.Thread(target=lire)
+        lecteur.start()
+        lecteur.join()
+        self.assertEqual([vehicule.modele for vehicule in lus], ["Corolla", "Yaris"])
+
+    def test_une_connexion_par_thread(self):
+        """Chaque thread reçoit sa propre connexion"""
+        connexions = []
+        thread = threading.Thread(target=lambda: connexions.append(self.db.conn))
+        thread.start()
+        thread.join()
+        self.assertIsNot(connexions[0], self.db.conn)
+
+    def test_ecrivains_et_lecteurs_concurrents(self):
+        """Réservations et lectures en parallèle sans erreur 'database is locked'"""
+        erreurs = []
+        nb_threads, nb_par_thread = 4, 25
+
+        def reserver(numero):
+            try:
+                for i in range(nb_par_thread):
+                    debut = datetime(2024, 1, 1) + timedelta(days=numero * 100 + i * 2)
+                    with self.db.transaction():
+                        self.db.sauvegarder_reservation(Reservation(
+                            id=None, client_id=self.client.id, vehicule_id=self.vehicule.id,
+                            date_debut=debut, date_fin=debut + timedelta(days=1), prix_total=50.0
+                        ))
+            except Exception as e:
+                erreurs.append(e)
+
+        def lire():
+            try:
+                for _ in range(nb_par_thread):
+                    self.db.charger_reservations_vehicule(self.vehicule.id)
+                    self.db.charger_clients()
+            except Exception as e:
+                erreurs.append(e)
+
+        threads = [threading.Thread(target=reserver, args=(n,)) for n in range(nb_threads)]
+        threads += [threading.Thread(target=lire) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(erreurs, [])
+        self.assertEqual(len(self.db.charger_reservations_vehicule(self.vehicule.id)), nb_threads * nb_par_thread)
+
+    def test_appels_imbriques_pendant_un_parcours(self):
+        """Un curseur par appel : on peut appeler la DAL en parcourant un autre résultat"""
+        self.db.sauvegarder_vehicule(Voiture(
+            id=None, marque="Honda", modele="Civic", annee=2020,
+            kilometrage=20000, prix_achat=18000, cout_entretien_annuel=600,
+            nb_places=5, puissance=100, carburant="Essence", options=[]
+        ))
+
+        marques = []
+        for row in self.db.conn.execute("SELECT id FROM vehicules ORDER BY id"):
+            marques.append(self.db.charger_vehicule(row['id']).marque)
+
+        self.assertEqual(marques, ["Toyota", "Honda"])
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,262 @@
+# tests/test_migrations.py
+# Tests unitaires du moteur de migrations
+# Vérifie la gestion de PRAGMA user_version, l'atomicité et la reprise de données par lots
+
+import unittest
+import sys
+import os
+import sqlite3
+import tempfile
+from datetime import datetime
+from unittest import mock
+
+# Ajout du répertoire parent au path pour les imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.database import Database, decoder_date, encoder_date
+from utils.migrations import (MIGRATIONS, Migration, appliquer_migrations, lire_version,
+                              mettre_a_jour_par_lots)
+
+
+class TestMigrations(unittest.TestCase):
+
+    def setUp(self):
+        """Préparation d'une base de données temporaire"""
+        self.temp_db = tempfile.NamedTemporaryFile(delete=False, suffix='.db')
+        self.temp_db.close()
+        self.db = Database(self.temp_db.name)
+
+    def tearDown(self):
+        """Nettoyage après chaque test"""
+        self.db.fermer()
+        os.unlink(self.temp_db.name)
+
+    def test_base_neuve_a_la_derniere_version(self):
+        """Une base neuve est créée directement à la dernière version"""
+        self.assertEqual(lire_version(self.db.conn), MIGRATIONS[-1].version)
+
+    def test_base_a_jour_aucune_migration(self):
+        """Une base à jour ne rejoue aucune migration"""
+        self.assertEqual(appliquer_migrations(self.db), 0)
+
+        self.db.fermer()
+        self.db = Database(self.temp_db.name)
+        self.assertEqual(appliquer_migrations(self.db), 0)
+
+    def test_nouvelle_migration_appliquee_une_fois(self):
+        """Une migration ajoutée est appliquée puis la version est incrémentée"""
+        appels = []
+
+        def ajouter_colonne(db):
+            appels.append(1)
+            db.conn.execute("ALTER TABLE clients ADD COLUMN fidelite INTEGER")
+
+        migrations = MIGRATIONS + [Migration(MIGRATIONS[-1].version + 1, "test", ajouter_colonne)]
+
+        self.assertEqual(appliquer_migrations(self.db, migrations), 1)
+        self.assertEqual(appliquer_migrations(self.db, migrations), 0)
+        self.assertEqual(len(appels), 1)
+        self.assertEqual(lire_version(self.db.conn), migrations[-1].version)
+
+    def test_migration_en_echec_annulee(self):
+        """Une migration en erreur est annulée et la version reste inchangée"""
+        version_avant = lire_version(self.db.conn)
+
+        def migration_cassee(db):
+            db.conn.execute("CREATE TABLE temporaire (id INTEGER)")
+            raise ValueError("échec volontaire")
+
+        migrations = MIGRATIONS + [Migration(version_avant + 1, "cassée", migration_cassee)]
+
+        with self.assertRaises(ValueError):
+            appliquer_migrations(self.db, migrations)
+
+        self.assertEqual(lire_version(self.db.conn), version_avant)
+        tables = [row[0] for row in self.db.conn.execute("SELECT name FROM sqlite_master WHERE type='table'")]
+        self.assertNotIn("temporaire", tables)
+
+    def test_base_plus_recente_refusee(self):
+        """Une base créée par une version plus récente du programme est refusée"""
+        self.db.conn.execute(f"PRAGMA user_version = {MIGRATIONS[-1].version + 10}")
+        with self.assertRaises(RuntimeError):
+            appliquer_migrations(self.db)
+
+    def _noms_index(self):
+        cursor = self.db.conn.execute("SELECT name FROM sqlite_master WHERE type = 'index' AND name LIKE 'idx_%'")
+        return {row[0] for row in cursor.fetchall()}
+
+    def test_index_version_2_figes(self):
+        """La migration 2 crée les index de la version 2, pas ceux de la liste courante"""
+        for nom in self._noms_index():
+            self.db.conn.execute(f"DROP INDEX {nom}")
+
+        index_courants = dict(Database.INDEX_SECONDAIRES,
+                              idx_clients_nom="CREATE INDEX idx_clients_nom ON clients (nom)")
+        with mock.patch.object(Database, 'INDEX_SECONDAIRES', index_courants):
+            MIGRATIONS[1].schema(self.db)
+
+        self.assertEqual(len(self._noms_index()), 10)
+        self.assertNotIn("idx_clients_nom", self._noms_index())
+        self.assertNotIn("idx_reservations_cloturees", self._noms_index())
+
+    def test_synchronisation_index_erreurs(self):
+        """Seule une table ou une colonne absente est ignorée, et seulement pendant les migrations"""
+        absente = dict(Database.INDEX_SECONDAIRES, idx_clients_fidelite="CREATE INDEX idx_clients_fidelite "
+                                                                         "ON clients (fidelite)")
+        with mock.patch.object(Database, 'INDEX_SECONDAIRES', absente):
+            self.db._synchroniser_index(ignorer_absents=True)
+            with self.assertRaises(sqlite3.OperationalError):
+                self.db._synchroniser_index()
+
+        invalide = dict(Database.INDEX_SECONDAIRES, idx_clients_nom="CREATE INDEX idx_clients_nom "
+                                                                    "ON clients (nom COLLATE inconnue)")
+        with mock.patch.object(Database, 'INDEX_SECONDAIRES', invalide):
+            with self.assertRaises(sqlite3.OperationalError):
+                self.db._synchroniser_index(ignorer_absents=True)
+
+    def test_mise_a_jour_par_lots(self):
+        """La reprise de données est découpée en lots et idempotente"""
+        self.db.conn.execute("ALTER TABLE clients ADD COLUMN initiale TEXT")
+        self.db.conn.executemany(
+            "INSERT INTO clients (nom, prenom, adresse, telephone, email) VALUES (?, ?, ?, ?, ?)",
+            [(f"Nom{i}", "Jean", "rue", "0600000000", f"c{i}@test.com") for i in range(25)]
+        )
+        self.db.conn.commit()
+
+        nb_lots = mettre_a_jour_par_lots(self.db.conn, "clients", "initiale = substr(nom, 1, 1)",
+                                         "initiale IS NULL", taille_lot=10)
+        self.assertEqual(nb_lots, 3)
+
+        restants = self.db.conn.execute("SELECT COUNT(*) FROM clients WHERE initiale IS NULL").fetchone()[0]
+        self.assertEqual(restants, 0)
+        self.assertFalse(self.db.conn.in_transaction)
+
+    def _creer_base_v2(self, donnees_supplementaires=""):
+        """remplace la base de test par une base "ancienne" : tables d'origine, dates au format texte"""
+        self.db.fermer()
+        os.unlink(self.temp_db.name)
+
+        conn = sqlite3.connect(self.temp_db.name)
+        conn.executescript("""
+            CREATE TABLE vehicules (id INTEGER PRIMARY KEY, type TEXT NOT NULL, marque TEXT NOT NULL,
+                modele TEXT NOT NULL, annee INTEGER NOT NULL, kilometrage INTEGER NOT NULL,
+                prix_achat REAL NOT NULL, cout_entretien_annuel REAL NOT NULL, categorie TEXT NOT NULL,
+                attributs_specifiques TEXT NOT NULL);
+            CREATE TABLE clients (id INTEGER PRIMARY KEY, nom TEXT NOT NULL, prenom TEXT NOT NULL,
+                adresse TEXT NOT NULL, telephone TEXT NOT NULL, email TEXT NOT NULL);
+            CREATE TABLE reservations (id INTEGER PRIMARY KEY, client_id INTEGER NOT NULL,
+                vehicule_id INTEGER NOT NULL, date_debut TEXT NOT NULL, date_fin TEXT NOT NULL,
+                prix_total REAL NOT NULL, statut TEXT NOT NULL);
+            CREATE TABLE factures (id INTEGER PRIMARY KEY, reservation_id INTEGER NOT NULL,
+                date_emission TEXT NOT NULL, montant_ht REAL NOT NULL, taux_tva REAL NOT NULL,
+                montant_ttc REAL NOT NULL);
+            INSERT INTO reservations VALUES (7, 1, 3, '2024-03-01 10:00:00', '2024-03-05 18:30:00', 200.0, 'confirmée');
+            INSERT INTO factures VALUES (2, 7, '2024-03-06 09:00:00', 200.0, 0.2, 240.0);
+            INSERT INTO vehicules VALUES (3, 'Voiture', 'Peugeot', '308', 2020, 30000, 22000.0, 800.0, 'Standard',
+                '{"nb_places": 5, "puissance": 130, "carburant": "Diesel", "options": ["GPS", "Toit ouvrant"]}');
+            INSERT INTO clients VALUES (5, 'Lefèvre', 'Hélène', '1 rue des Tests', '01 23 45 67 89', 'h.lefevre@test.com');
+            INSERT INTO vehicules VALUES (4, 'Moto', 'Honda', 'CB500', 2021, 8000, 6000.0, 300.0, 'Standard',
+                '{"cylindree": 500, "type": "Roadster"}');
+            """ + donnees_supplementaires + """
+            PRAGMA user_version = 2;
+        """)
+        conn.commit()
+        conn.close()
+
+        self.db = Database(self.temp_db.name)
+
+    def test_conversion_dates_texte_en_entiers(self):
+        """Une base à dates texte (version 2) est convertie en dates entières"""
+        self._creer_base_v2()
+        self.assertEqual(lire_version(self.db.conn), MIGRATIONS[-1].version)
+
+        reservation = self.db.charger_reservation(7)
+        self.assertEqual(reservation.date_debut, datetime(2024, 3, 1, 10, 0, 0))
+        self.assertEqual(reservation.date_fin, datetime(2024, 3, 5, 18, 30, 0))
+        self.assertEqual(self.db.charger_facture(2).date_emission, datetime(2024, 3, 6, 9, 0, 0))
+
+        # stockage entier et filtres par période
+        type_stocke = self.db.conn.execute("SELECT typeof(date_debut) FROM reservations").fetchone()[0]
+        self.assertEqual(type_stocke, "integer")
+        self.assertEqual(len(self.db.charger_reservations_vehicule(3, datetime(2024, 3, 4), datetime(2024, 3, 10))), 1)
+        self.assertEqual(self.db.charger_reservations_vehicule(3, datetime(2024, 3, 6), datetime(2024, 3, 10)), [])
+
+        # les index ont été reconstruits sur la nouvelle table
+        index = {row[0] for row in self.db.conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        self.assertTrue(set(Database.INDEX_SECONDAIRES) <= index)
+
+    def test_date_illisible_arrete_la_migration(self):
+        """Une date texte illisible arrête la conversion au lieu de perdre la réservation"""
+        with self.assertRaises(RuntimeError):
+            self._creer_base_v2("INSERT INTO reservations VALUES "
+                                "(8, 5, 3, 'le 2 mars', '2024-03-05 18:30:00', 50.0, 'terminée');")
+
+        conn = sqlite3.connect(self.temp_db.name)
+        self.assertEqual(lire_version(conn), 2)
+        # une fois la date corrigée, la migration reprend et conserve les deux réservations
+        conn.execute("UPDATE reservations SET date_debut = '2024-03-02 00:00:00' WHERE id = 8")
+        conn.commit()
+        conn.close()
+
+        self.db = Database(self.temp_db.name)
+        self.assertEqual(lire_version(self.db.conn), MIGRATIONS[-1].version)
+        self.assertEqual(self.db.charger_reservation(8).date_debut, datetime(2024, 3, 2))
+        self.assertIsNotNone(self.db.charger_reservation(7))
+
+    def test_identifiants_autoincrement_copies_par_lots(self):
+        """Les réservations sont copiées par lots (étape de données) puis basculées vers AUTOINCREMENT"""
+        copie, bascule = MIGRATIONS[9], MIGRATIONS[10]
+        self.assertIsNone(copie.schema)
+        self.assertIsNotNone(copie.donnees)
+        self.assertIsNone(bascule.donnees)
+
+        self._creer_base_v2()
+        definition = self.db.conn.execute("SELECT sql FROM sqlite_master WHERE name = 'reservations'").fetchone()[0]
+        self.assertIn("AUTOINCREMENT", definition)
+        dependances = {row[0] for row in self.db.conn.execute(
+            "SELECT name FROM sqlite_master WHERE tbl_name = 'reservations' AND type IN ('index', 'trigger')")}
+        self.assertTrue({"idx_reservations_confirmees", "stats_reservations_insertion",
+                         "journal_reservations_suppression"} <= dependances)
+        self.assertEqual(self.db.charger_reservation(7).prix_total, 200.0)
+
+    def test_colonnes_attributs_et_options_reprises(self):
+        """Les attributs spécifiques d'une base existante deviennent des colonnes, les options sont reprises"""
+        self._creer_base_v2()
+
+        colonnes = {row[1] for row in self.db.conn.execute("PRAGMA table_xinfo(vehicules)")}
+        self.assertTrue({"puissance", "carburant", "cylindree", "type_moto"} <= colonnes)
+
+        options = self.db.conn.execute(
+            "SELECT option FROM vehicule_options WHERE vehicule_id = 3 ORDER BY option").fetchall()
+        self.assertEqual([row[0] for row in options], ["GPS", "Toit ouvrant"])
+
+        self.assertEqual([v.id for v in self.db.rechercher_vehicules({"options": "Toit ouvrant"})], [3])
+        self.assertEqual([v.id for v in self.db.rechercher_vehicules({"type_moto": "Roadster"})], [4])
+        self.assertEqual(self.db.charger_vehicule(3).options, ["GPS", "Toit ouvrant"])
+
+    def test_index_plein_texte_clients_existants(self):
+        """Les clients d'une base existante sont indexés pour la recherche plein texte"""
+        self._creer_base_v2()
+        if not self.db.recherche_plein_texte:
+            self.skipTest("sqlite sans FTS5")
+
+        self.assertEqual([c.id for c in self.db.rechercher_clients({"texte": "helene lef"})], [5])
+
+    def test_agregats_calcules_a_la_migration(self):
+        """Les agrégats sont calculés depuis les données existantes"""
+        self._creer_base_v2()
+
+        self.assertEqual(self.db.calculer_bilan()["revenus"], 200.0)
+        self.assertEqual(self.db.charger_revenus_par_type_mois(),
+                         [{"type": "Voiture", "mois": "2024-03", "revenus": 200.0, "nb_reservations": 1}])
+        self.assertEqual(self.db.charger_statistiques_parc()["Moto"]["nb_vehicules"], 1)
+
+    def test_encodage_dates(self):
+        """Aller-retour datetime -> entier -> datetime"""
+        date = datetime(2031, 12, 24, 23, 59, 59)
+        self.assertEqual(decoder_date(encoder_date(date)), date)
+        self.assertEqual(encoder_date(datetime(1970, 1, 2)), 86400)
+
+
+if __name__ == '__main__':
+    unittest.main()
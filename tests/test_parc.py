@@ -5,14 +5,22 @@
 import unittest
 import sys
 import os
+import tempfile
+from unittest import mock
 from datetime import datetime, timedelta
 
 # Ajout du répertoire parent au path pour les imports
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from model.parc import Parc
-from model.vehicule import Voiture
+from model.vehicule import Voiture, Moto
 from model.reservation import Reservation
+from model.client import Client
+from utils.database import Database
+from model.index_parc import IndexVehicules
+from model.disponibilite import IndexDisponibilite
+from controller.parc_controller import ParcController
+from controller.reservation_controller import ReservationController
 
 
 class TestParc(unittest.TestCase):
@@ -159,6 +167,60 @@ class TestParc(unittest.TestCase):
         resultat = self.parc.enregistrer_reservation(reservation)
         self.assertFalse(resultat)
 
+    def test_disponibilite_chevauchement_partiel(self):
+        """Une réservation qui chevauche une partie de la période rend le véhicule indisponible"""
+        self.parc.ajouter_vehicule(self.voiture1)
+        self.parc.reservations.append(Reservation(
+            id=1, client_id=101, vehicule_id=self.voiture1.id,
+            date_debut=datetime(2024, 6, 10), date_fin=datetime(2024, 6, 15)
+        ))
+
+        self.assertFalse(self.parc.vehicule_disponible(self.voiture1.id, datetime(2024, 6, 1), datetime(2024, 6, 10)))
+        self.assertFalse(self.parc.vehicule_disponible(self.voiture1.id, datetime(2024, 6, 12), datetime(2024, 6, 30)))
+        self.assertFalse(self.parc.vehicule_disponible(self.voiture1.id, datetime(2024, 6, 1), datetime(2024, 6, 30)))
+        self.assertTrue(self.parc.vehicule_disponible(self.voiture1.id, datetime(2024, 6, 16), datetime(2024, 6, 30)))
+        self.assertTrue(self.parc.vehicule_disponible(self.voiture2.id, datetime(2024, 6, 1), datetime(2024, 6, 30)))
+
+    def test_index_suit_annulations_et_modifications(self):
+        """Annulation, changement de dates et modification de la liste mettent l'index à jour"""
+        self.parc.ajouter_vehicule(self.voiture1)
+        longue = Reservation(id=1, client_id=101, vehicule_id=self.voiture1.id,
+                             date_debut=datetime(2024, 6, 1), date_fin=datetime(2024, 6, 30))
+        courte = Reservation(id=2, client_id=101, vehicule_id=self.voiture1.id,
+                             date_debut=datetime(2024, 7, 10), date_fin=datetime(2024, 7, 12))
+        self.assertTrue(self.parc.enregistrer_reservation(longue))
+        self.assertTrue(self.parc.enregistrer_reservation(courte))
+        self.assertFalse(self.parc.enregistrer_reservation(Reservation(
+            id=3, client_id=102, vehicule_id=self.voiture1.id,
+            date_debut=datetime(2024, 6, 29), date_fin=datetime(2024, 7, 2))))
+
+        longue.annuler()
+        self.assertTrue(self.parc.vehicule_disponible(self.voiture1.id, datetime(2024, 6, 10), datetime(2024, 6, 20)))
+
+        courte.date_debut, courte.date_fin = datetime(2024, 8, 1), datetime(2024, 8, 3)
+        self.parc.reindexer_reservation(courte)
+        self.assertTrue(self.parc.vehicule_disponible(self.voiture1.id, datetime(2024, 7, 10), datetime(2024, 7, 12)))
+        self.assertFalse(self.parc.vehicule_disponible(self.voiture1.id, datetime(2024, 8, 2), datetime(2024, 8, 2)))
+
+        self.parc.reservations.remove(courte)
+        self.assertTrue(self.parc.vehicule_disponible(self.voiture1.id, datetime(2024, 8, 2), datetime(2024, 8, 2)))
+        self.parc.reservations = [courte]
+        self.assertFalse(self.parc.vehicule_disponible(self.voiture1.id, datetime(2024, 8, 2), datetime(2024, 8, 2)))
+
+    def test_annulation_partagee_entre_parcs(self):
+        """Une annulation libère le véhicule dans tous les parcs qui indexent la réservation"""
+        autre_parc = Parc()
+        for parc in (self.parc, autre_parc):
+            parc.ajouter_vehicule(self.voiture1)
+        reservation = Reservation(id=1, client_id=101, vehicule_id=self.voiture1.id,
+                                  date_debut=self.demain, date_fin=self.dans_5_jours, statut="confirmée")
+        for parc in (self.parc, autre_parc):
+            parc.reservations.append(reservation)
+
+        reservation.annuler()
+        for parc in (self.parc, autre_parc):
+            self.assertTrue(parc.vehicule_disponible(self.voiture1.id, self.demain, self.dans_5_jours))
+
     def test_trouver_vehicule_par_id(self):
         """Test de recherche d'un véhicule par ID"""
         self.parc.ajouter_vehicule(self.voiture1)
@@ -169,6 +231,334 @@ class TestParc(unittest.TestCase):
         vehicule_inexistant = self.parc._trouver_vehicule_par_id(999)
         self.assertIsNone(vehicule_inexistant)
 
+    def test_index_vehicules_par_id_et_type(self):
+        """L'index par id et par type suit ajouts, retraits, remplacements et réaffectations"""
+        moto = Moto(id=3, marque="Yamaha", modele="MT-07", annee=2022, kilometrage=5000,
+                    prix_achat=7000, cout_entretien_annuel=400, cylindree=690, type_moto="Roadster")
+        for vehicule in (self.voiture1, self.voiture2, moto):
+            self.parc.ajouter_vehicule(vehicule)
+        self.assertIs(self.parc.obtenir_vehicule(3), moto)
+        self.assertEqual(self.parc.verifier_disponibilite("Moto", {}, self.demain, self.dans_5_jours), [moto])
+
+        self.assertTrue(self.parc.retirer_vehicule(self.voiture1.id))
+        self.assertIsNone(self.parc.obtenir_vehicule(self.voiture1.id))
+        self.assertEqual(self.parc.verifier_disponibilite("Voiture", {}, self.demain, self.dans_5_jours),
+                         [self.voiture2])
+
+        nouvelle_308 = Voiture(id=2, marque="Peugeot", modele="308", annee=2019, kilometrage=30000,
+                               prix_achat=18000, cout_entretien_annuel=800, nb_places=5, puissance=130,
+                               carburant="Diesel", options=[])
+        self.assertTrue(self.parc.remplacer_vehicule(nouvelle_308))
+        self.assertIs(self.parc.obtenir_vehicule(2), nouvelle_308)
+        self.assertTrue(self.parc.ajouter_vehicule(self.voiture2))  # l'ancien objet n'est plus dans le parc
+
+        self.parc.vehicules = [self.voiture1]
+        self.assertIs(self.parc.obtenir_vehicule(1), self.voiture1)
+        self.assertIsNone(self.parc.obtenir_vehicule(3))
+        self.assertEqual(self.parc.verifier_disponibilite("Moto", {}, self.demain, self.dans_5_jours), [])
+
+    def test_index_criteres(self):
+        """Les critères min/max, exacts et d'options passent par les index secondaires du parc"""
+        self.voiture1.options = ["GPS"]
+        self.voiture2.options = ["GPS", "Climatisation"]
+        clio_diesel = Voiture(id=3, marque="Renault", modele="Clio", annee=2021, kilometrage=1000,
+                              prix_achat=16000, cout_entretien_annuel=600, nb_places=5, puissance=110,
+                              carburant="Diesel", options=[])
+        for vehicule in (self.voiture1, self.voiture2, clio_diesel):
+            self.parc.ajouter_vehicule(vehicule)
+
+        def rechercher(criteres):
+            return self.parc.verifier_disponibilite("Voiture", criteres, self.demain, self.dans_5_jours)
+
+        self.assertEqual(rechercher({"puissance": {"min": 100}}), [self.voiture2, clio_diesel])
+        self.assertEqual(rechercher({"puissance": {"min": 90, "max": 110}, "carburant": "Diesel"}), [clio_diesel])
+        self.assertEqual(rechercher({"options": "GPS", "marque": "Renault"}), [self.voiture1])
+        self.assertEqual(rechercher({"volume": {"min": 9}}), [])
+        self.assertEqual(rechercher({"options": ["GPS", "Climatisation"]}), [self.voiture2])  # toutes les options
+        self.assertEqual(rechercher("puissance>100 carburant=Diesel,Essence"), [self.voiture2, clio_diesel])
+
+        # index tenus à jour par les ajouts, retraits et modifications sur place
+        clio_diesel.puissance = 80
+        self.parc.reindexer_vehicule(clio_diesel)
+        self.assertEqual(rechercher({"puissance": {"min": 100}}), [self.voiture2])
+        self.parc.retirer_vehicule(self.voiture2.id)
+        self.assertEqual(rechercher({"options": "GPS"}), [self.voiture1])
+        self.parc.ajouter_vehicule(self.voiture2)
+        self.assertEqual(rechercher({"carburant": "Diesel"}), [clio_diesel, self.voiture2])
+
+
+
+class TestSynchronisationParc(unittest.TestCase):
+    """Vérifie la synchronisation du parc par le journal des modifications"""
+
+    def setUp(self):
+        self.temp_db = tempfile.NamedTemporaryFile(delete=False, suffix='.db')
+        self.temp_db.close()
+        # deux connexions au même fichier, comme deux processus
+        self.db = Database(self.temp_db.name)
+        self.autre_db = Database(self.temp_db.name)
+
+        self.voiture = Voiture(
+            id=None, marque="Renault", modele="Clio", annee=2020,
+            kilometrage=15000, prix_achat=15000, cout_entretien_annuel=600,
+            nb_places=5, puissance=90, carburant="Essence", options=[]
+        )
+        self.db.sauvegarder_vehicule(self.voiture)
+
+        self.parc = Parc()
+        self.parc.seq_journal = self.db.dernier_seq_journal()
+        for vehicule in self.db.charger_tous_vehicules():
+            self.parc.ajouter_vehicule(vehicule)
+
+    def tearDown(self):
+        self.db.fermer()
+        self.autre_db.fermer()
+        os.unlink(self.temp_db.name)
+
+    def test_synchronisation_des_ecritures_externes(self):
+        """Ajout, modification et suppression faits ailleurs sont appliqués au parc"""
+        nouvelle = Voiture(
+            id=None, marque="Peugeot", modele="308", annee=2019,
+            kilometrage=25000, prix_achat=18000, cout_entretien_annuel=800,
+            nb_places=5, puissance=130, carburant="Diesel", options=[]
+        )
+        self.autre_db.sauvegarder_vehicule(nouvelle)
+        nouvelle.kilometrage = 26000
+        self.autre_db.sauvegarder_vehicule(nouvelle)
+        client_id = self.autre_db.sauvegarder_client(
+            Client(id=None, nom="Martin", prenom="Sophie", adresse="1 rue des Tests",
+                   telephone="01 98 76 54 32", email="sophie.martin@test.com"))
+        reservation = Reservation(id=None, client_id=client_id, vehicule_id=nouvelle.id,
+                                  date_debut=datetime(2024, 6, 1), date_fin=datetime(2024, 6, 5), prix_total=200.0)
+        self.autre_db.sauvegarder_reservation(reservation)
+
+        # deux écritures du même véhicule, une réservation : deux objets relus
+        self.assertEqual(self.parc.synchroniser(self.db), 2)
+        self.assertEqual([v.id for v in self.parc.vehicules], [self.voiture.id, nouvelle.id])
+        self.assertEqual(self.parc.obtenir_vehicule(nouvelle.id).kilometrage, 26000)
+        self.assertEqual([r.id for r in self.parc.reservations], [reservation.id])
+
+        self.autre_db.supprimer_reservation(reservation.id)
+        self.autre_db.supprimer_vehicule(nouvelle.id)
+        # seuls les objets touchés sont réindexés : aucune reconstruction des index du parc
+        with mock.patch.object(IndexVehicules, 'reconstruire') as reconstruire_vehicules, \
+                mock.patch.object(IndexDisponibilite, 'reconstruire') as reconstruire_reservations:
+            self.assertEqual(self.parc.synchroniser(self.db), 2)
+        reconstruire_vehicules.assert_not_called()
+        reconstruire_reservations.assert_not_called()
+        self.assertEqual([v.id for v in self.parc.vehicules], [self.voiture.id])
+        self.assertEqual(self.parc.reservations, [])
+
+        # rien de nouveau : aucune relecture
+        self.assertEqual(self.parc.synchroniser(self.db), 0)
+        self.assertEqual(self.parc.seq_journal, self.db.dernier_seq_journal())
+
+    def test_fusion_par_position(self):
+        """Les objets modifiés sont retrouvés par la table id -> position, sans parcourir la liste"""
+        for kilometrage in (20000, 30000, 40000):
+            vehicule = Voiture(
+                id=None, marque="Peugeot", modele="308", annee=2019,
+                kilometrage=kilometrage, prix_achat=18000, cout_entretien_annuel=800,
+                nb_places=5, puissance=130, carburant="Diesel", options=[]
+            )
+            self.db.sauvegarder_vehicule(vehicule)
+        self.assertEqual(self.parc.synchroniser(self.db), 3)
+        ids = [v.id for v in self.parc.vehicules]
+        self.assertEqual([self.parc.vehicules.position(i) for i in ids], [0, 1, 2, 3])
+
+        modifie = self.autre_db.charger_vehicule(ids[2])
+        modifie.kilometrage = 31000
+        self.autre_db.sauvegarder_vehicule(modifie)
+        # un remplacement garde la table : pas de nouveau parcours de la liste
+        table = self.parc.vehicules._positions
+        self.assertEqual(self.parc.synchroniser(self.db), 1)
+        self.assertIs(self.parc.vehicules._positions, table)
+        self.assertEqual(self.parc.obtenir_vehicule(ids[2]).kilometrage, 31000)
+        self.assertEqual([v.id for v in self.parc.vehicules], ids)
+
+        # un retrait au milieu décale les positions suivantes
+        self.autre_db.supprimer_vehicule(ids[1])
+        self.assertEqual(self.parc.synchroniser(self.db), 1)
+        self.assertEqual([self.parc.vehicules.position(i) for i in ids], [0, None, 1, 2])
+        self.parc.vehicules.pop()
+        self.assertIsNone(self.parc.vehicules.position(ids[3]))
+        self.assertEqual(self.parc.vehicules.position(ids[2]), 1)
+
+    def test_modification_dates_reindexe_la_reservation_du_parc(self):
+        """Le changement de dates réindexe l'objet du parc, même s'il n'est pas celui relu en base"""
+        parc_controller = ParcController(self.db)
+        reservation_controller = ReservationController(self.db, parc_controller)
+        client_id = self.db.sauvegarder_client(
+            Client(id=None, nom="Martin", prenom="Sophie", adresse="1 rue des Tests",
+                   telephone="01 98 76 54 32", email="sophie.martin@test.com"))
+        debut, fin = datetime(2030, 6, 1), datetime(2030, 6, 5)
+        reservation = reservation_controller.creer_reservation(client_id, self.voiture.id, debut, fin)['reservation']
+        parc = parc_controller.parc
+        self.assertIs(parc.obtenir_reservation(reservation.id), reservation)
+
+        # la base relit un autre objet que celui du parc
+        self.db.cache.vider()
+        nouveau_debut, nouvelle_fin = datetime(2030, 7, 1), datetime(2030, 7, 5)
+        modifiee = reservation_controller.modifier_dates_reservation(reservation.id, nouveau_debut, nouvelle_fin)
+        self.assertIsNot(modifiee, reservation)
+        self.assertEqual(reservation.date_debut, nouveau_debut)
+        self.assertTrue(parc.vehicule_disponible(self.voiture.id, debut, fin))
+        self.assertFalse(parc.vehicule_disponible(self.voiture.id, nouveau_debut, nouvelle_fin))
+
+        # une période prise par une autre réservation confirmée est refusée
+        autre = Reservation(id=None, client_id=client_id, vehicule_id=self.voiture.id,
+                            date_debut=datetime(2030, 8, 1), date_fin=datetime(2030, 8, 5), prix_total=200.0)
+        self.assertTrue(self.autre_db.reserver_atomiquement(autre))
+        self.assertIsNone(reservation_controller.modifier_dates_reservation(
+            reservation.id, datetime(2030, 8, 3), datetime(2030, 8, 10)))
+        self.assertEqual(self.db.charger_reservation(reservation.id).date_debut, nouveau_debut)
+
+    def test_disponibilite_du_controleur_par_le_parc(self):
+        """Le contrôleur charge les réservations confirmées et répond par les index du parc"""
+        client_id = self.db.sauvegarder_client(
+            Client(id=None, nom="Martin", prenom="Sophie", adresse="1 rue des Tests",
+                   telephone="01 98 76 54 32", email="sophie.martin@test.com"))
+        juin = Reservation(id=None, client_id=client_id, vehicule_id=self.voiture.id,
+                           date_debut=datetime(2030, 6, 1), date_fin=datetime(2030, 6, 5), prix_total=200.0)
+        annulee = Reservation(id=None, client_id=client_id, vehicule_id=self.voiture.id,
+                              date_debut=datetime(2030, 9, 1), date_fin=datetime(2030, 9, 5), prix_total=200.0)
+        self.db.sauvegarder_reservation(juin)
+        self.db.sauvegarder_reservation(annulee)
+        annulee.annuler()
+        self.db.sauvegarder_reservation(annulee)
+
+        parc_controller = ParcController(self.db)
+        self.assertEqual([r.id for r in parc_controller.parc.reservations], [juin.id])
+        with mock.patch.object(Database, 'charger_vehicules_disponibles') as requete_base, \
+                mock.patch.object(Database, 'vehicule_disponible') as verification_base:
+            self.assertEqual(parc_controller.verifier_disponibilite(
+                "Voiture", {}, datetime(2030, 6, 3), datetime(2030, 6, 10)), [])
+            self.assertEqual([v.id for v in parc_controller.verifier_disponibilite(
+                "Voiture", {}, datetime(2030, 9, 1), datetime(2030, 9, 5))], [self.voiture.id])
+            # la réservation dont on change les dates ne se bloque pas elle-même
+            self.assertTrue(parc_controller.verifier_disponibilite_vehicule(
+                self.voiture.id, datetime(2030, 6, 3), datetime(2030, 6, 10), juin.id))
+        requete_base.assert_not_called()
+        verification_base.assert_not_called()
+
+        # écritures d'un autre processus : rattrapées par le journal avant de répondre
+        juillet = Reservation(id=None, client_id=client_id, vehicule_id=self.voiture.id,
+                              date_debut=datetime(2030, 7, 1), date_fin=datetime(2030, 7, 5), prix_total=200.0)
+        self.assertTrue(self.autre_db.reserver_atomiquement(juillet))
+        self.assertFalse(parc_controller.verifier_disponibilite_vehicule(
+            self.voiture.id, datetime(2030, 7, 3), datetime(2030, 7, 4)))
+        self.assertFalse(parc_controller.verifier_disponibilite_vehicule(
+            self.voiture.id, datetime(2030, 6, 3), datetime(2030, 7, 4), juin.id))
+        juin_ailleurs = self.autre_db.charger_reservation(juin.id)
+        juin_ailleurs.annuler()
+        self.autre_db.sauvegarder_reservation(juin_ailleurs)
+        self.assertTrue(parc_controller.verifier_disponibilite_vehicule(
+            self.voiture.id, datetime(2030, 6, 1), datetime(2030, 6, 5)))
+
+    def test_journal_purge_et_cache(self):
+        """La purge ne réutilise pas les numéros de modification, la lecture invalide le cache"""
+        dernier = self.db.dernier_seq_journal()
+        self.assertEqual(self.db.purger_journal(dernier), dernier)
+        self.assertEqual(self.db.lire_journal(), [])
+
+        self.assertEqual(self.db.charger_vehicule(self.voiture.id).kilometrage, 15000)
+        modifiee = self.autre_db.charger_vehicule(self.voiture.id)
+        modifiee.kilometrage = 16000
+        self.autre_db.sauvegarder_vehicule(modifiee)
+        self.assertEqual(self.db.lire_journal(dernier),
+                         [(dernier + 1, "vehicules", self.voiture.id, "modification")])
+        # la lecture du journal retire du cache l'objet modifié par l'autre connexion
+        self.assertEqual(self.db.charger_vehicule(self.voiture.id).kilometrage, 16000)
+
+
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+@unittest.skipUnless(numpy, "numpy non installé")
+class TestCalendrierOccupation(unittest.TestCase):
+    """Vérifie le calendrier d'occupation numpy de la flotte"""
+
+    def setUp(self):
+        """Parc de trois voitures et une moto, calendrier de 60 jours à partir du 1er mars 2024"""
+        self.parc = Parc()
+        self.voitures = [Voiture(id=i, marque="Renault", modele="Clio", annee=2020, kilometrage=15000,
+                                 prix_achat=15000, cout_entretien_annuel=600, nb_places=5, puissance=90,
+                                 carburant="Essence", options=[]) for i in (1, 2, 3)]
+        self.moto = Moto(id=4, marque="Yamaha", modele="MT-07", annee=2022, kilometrage=5000,
+                         prix_achat=7000, cout_entretien_annuel=400, cylindree=690, type_moto="Roadster")
+        for vehicule in self.voitures + [self.moto]:
+            self.parc.ajouter_vehicule(vehicule)
+        # réservation présente avant l'activation du calendrier
+        self.parc.enregistrer_reservation(Reservation(
+            id=1, client_id=1, vehicule_id=1, date_debut=datetime(2024, 3, 6, 10), date_fin=datetime(2024, 3, 9, 18),
+            statut="confirmée"))
+        self.calendrier = self.parc.activer_calendrier(origine=datetime(2024, 3, 1), nb_jours=60)
+
+    def test_disponibles_par_type(self):
+        """Une tranche de jours par recherche, bornes incluses, quel que soit le découpage en octets"""
+        self.parc.enregistrer_reservation(Reservation(
+            id=2, client_id=1, vehicule_id=2, date_debut=datetime(2024, 3, 16), date_fin=datetime(2024, 3, 17),
+            statut="confirmée"))
+
+        def libres(debut, fin, type_vehicule="Voiture"):
+            return self.calendrier.disponibles(type_vehicule, debut, fin).tolist()
+
+        self.assertEqual(libres(datetime(2024, 3, 1), datetime(2024, 3, 5)), [1, 2, 3])
+        self.assertEqual(libres(datetime(2024, 3, 9), datetime(2024, 3, 9)), [2, 3])
+        self.assertEqual(libres(datetime(2024, 3, 1), datetime(2024, 4, 29)), [3])
+        self.assertEqual(libres(datetime(2024, 3, 10), datetime(2024, 3, 15)), [1, 2, 3])
+        self.assertEqual(libres(datetime(2024, 3, 17), datetime(2024, 3, 30)), [1, 3])
+        self.assertEqual(libres(datetime(2024, 3, 1), datetime(2024, 4, 29), "Moto"), [4])
+        with self.assertRaises(ValueError):
+            libres(datetime(2024, 4, 20), datetime(2024, 5, 10))
+
+    def test_mises_a_jour_incrementales(self):
+        """Annulation, retrait de véhicule et déplacement de l'horizon mettent la matrice à jour"""
+        chevauchante = Reservation(id=2, client_id=1, vehicule_id=3, date_debut=datetime(2024, 3, 6),
+                                   date_fin=datetime(2024, 3, 8), statut="confirmée")
+        suivante = Reservation(id=3, client_id=1, vehicule_id=3, date_debut=datetime(2024, 3, 8),
+                               date_fin=datetime(2024, 3, 12), statut="confirmée")
+        self.parc.reservations.extend([chevauchante, suivante])
+        chevauchante.annuler()
+        # les jours de la réservation restante restent occupés
+        self.assertEqual(self.calendrier.occupes([3], datetime(2024, 3, 6), datetime(2024, 3, 7)).tolist(), [False])
+        self.assertEqual(self.calendrier.occupes([3], datetime(2024, 3, 8), datetime(2024, 3, 8)).tolist(), [True])
+
+        self.parc.retirer_vehicule(2)
+        self.assertEqual(self.calendrier.disponibles("Voiture", datetime(2024, 3, 1), datetime(2024, 3, 2)).tolist(),
+                         [1, 3])
+
+        self.calendrier.avancer(datetime(2024, 3, 9))
+        self.assertEqual(self.calendrier.occupes([1, 3], datetime(2024, 3, 9), datetime(2024, 3, 9)).tolist(),
+                         [True, True])
+        self.assertEqual(self.calendrier.taux_occupation("Voiture")[:5].tolist(), [1.0, 0.5, 0.5, 0.5, 0.0])
+
+    def test_verifier_disponibilite_identique(self):
+        """Avec ou sans calendrier, verifier_disponibilite renvoie les mêmes véhicules (à l'heure près)"""
+        import random
+        aleatoire = random.Random(4)
+        sans_calendrier = Parc()
+        for vehicule in self.voitures:
+            sans_calendrier.ajouter_vehicule(vehicule)
+        sans_calendrier.reservations.extend(self.parc.reservations)
+        for i in range(40):
+            debut = datetime(2024, 3, 1) + timedelta(hours=aleatoire.randrange(50 * 24))
+            reservation = Reservation(id=10 + i, client_id=1, vehicule_id=aleatoire.choice((1, 2, 3)),
+                                      date_debut=debut, date_fin=debut + timedelta(hours=aleatoire.randrange(1, 72)),
+                                      statut="confirmée")
+            if self.parc.enregistrer_reservation(reservation):
+                sans_calendrier.reservations.append(reservation)
+
+        for _ in range(200):
+            debut = datetime(2024, 3, 1) + timedelta(hours=aleatoire.randrange(55 * 24))
+            fin = debut + timedelta(hours=aleatoire.randrange(0, 96))
+            self.assertEqual(self.parc.verifier_disponibilite("Voiture", {}, debut, fin),
+                             sans_calendrier.verifier_disponibilite("Voiture", {}, debut, fin))
+
 
 if __name__ == '__main__':
-    unittest.main()
\ No newline at end of file
+    unittest.main()
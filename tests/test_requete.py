@@ -0,0 +1,90 @@
+# tests/test_requete.py
+# Tests unitaires des requêtes de recherche de véhicules
+# Vérifie la compilation des dict et des textes, et l'équivalence entre le prédicat et la clause sql
+
+import unittest
+import sys
+import os
+import tempfile
+
+# Ajout du répertoire parent au path pour les imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from model.requete import Condition, compiler_requete
+from model.vehicule import Voiture, Utilitaire, Moto
+from utils.database import Database
+
+
+class TestRequete(unittest.TestCase):
+
+    def setUp(self):
+        """Un véhicule de chaque type"""
+        self.voiture = Voiture(id=None, marque="Tesla", modele="Model 3", annee=2022, kilometrage=10000,
+                               prix_achat=45000, cout_entretien_annuel=500, nb_places=5, puissance=150,
+                               carburant="Électrique", options=["GPS", "Toit ouvrant"])
+        self.utilitaire = Utilitaire(id=None, marque="Renault", modele="Master", annee=2018, kilometrage=40000,
+                                     prix_achat=25000, cout_entretien_annuel=1500, volume=12,
+                                     charge_utile=1200, hayon=True)
+        self.moto = Moto(id=None, marque="Yamaha", modele="MT-07", annee=2022, kilometrage=5000,
+                         prix_achat=7000, cout_entretien_annuel=400, cylindree=690, type_moto="Roadster")
+        self.vehicules = [self.voiture, self.utilitaire, self.moto]
+
+    def test_compilation_dict_et_texte(self):
+        """Un dict de critères et le texte équivalent donnent les mêmes conditions"""
+        texte = compiler_requete('puissance>=100 carburant=Diesel,Hybride options~GPS annee_min=2020')
+        criteres = compiler_requete({"puissance": {"min": 100}, "carburant": ["Diesel", "Hybride"],
+                                     "options": "GPS", "annee_min": 2020})
+        self.assertEqual(texte.conditions, criteres.conditions)
+        self.assertEqual(compiler_requete('modele="Model 3" hayon=oui').conditions,
+                         (Condition("modele", "=", "Model 3"), Condition("hayon", "=", True)))
+        self.assertIs(compiler_requete(texte), texte)
+        self.assertFalse(compiler_requete(None))
+        with self.assertRaises(ValueError):
+            compiler_requete("puissance 100")
+
+    def test_predicat(self):
+        """Le prédicat compilé filtre les objets, un attribut absent ne correspond jamais"""
+        def filtrer(source):
+            return compiler_requete(source).filtrer(self.vehicules)
+
+        self.assertEqual(filtrer("annee>=2022"), [self.voiture, self.moto])
+        self.assertEqual(filtrer("type=Moto type_moto=Roadster"), [self.moto])
+        self.assertEqual(filtrer({"options": ["GPS", "Toit ouvrant"]}), [self.voiture])
+        self.assertEqual(filtrer("hayon=true volume<12"), [])
+        self.assertEqual(filtrer("marque!=Tesla"), [self.utilitaire, self.moto])
+
+    def test_liste_options(self):
+        """Une liste d'options dans le texte exige toutes les options, comme la forme dict"""
+        self.assertEqual(compiler_requete("options=GPS,Radar").conditions,
+                         compiler_requete({"options": ["GPS", "Radar"]}).conditions)
+        self.assertEqual(compiler_requete("options~GPS,'Toit ouvrant'").filtrer(self.vehicules), [self.voiture])
+        self.assertEqual(compiler_requete("options=GPS,Radar").filtrer(self.vehicules), [])
+        with self.assertRaises(ValueError):
+            compiler_requete("options>=GPS")
+
+    def test_equivalence_sql(self):
+        """La clause sql de la requête sélectionne les mêmes véhicules que le prédicat"""
+        fichier = tempfile.NamedTemporaryFile(delete=False, suffix='.db')
+        fichier.close()
+        db = Database(fichier.name)
+        try:
+            for vehicule in self.vehicules:
+                db.sauvegarder_vehicule(vehicule)
+
+            for source in ("annee>=2022", "type=Moto type_moto=Roadster", "options~GPS puissance>100",
+                           "hayon=true volume<=12", "marque=Tesla,Yamaha prix_max=10000",
+                           {"options": ["GPS", "Radar"]}, "marque!=Tesla", "options=GPS,Radar",
+                           "options=GPS,'Toit ouvrant'"):
+                requete = compiler_requete(source)
+                self.assertEqual([v.id for v in db.rechercher_vehicules(source)],
+                                 [v.id for v in requete.filtrer(self.vehicules)], source)
+
+            with self.assertRaises(ValueError):
+                db.rechercher_vehicules("couleur=rouge")
+        finally:
+            db.fermer()
+            os.unlink(fichier.name)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+# tests/test_sites.py
+# Tests unitaires de la répartition des données par site
+# Vérifie le routage vers un fichier par site et la fusion des rapports du siège
+
+import unittest
+import sys
+import os
+import tempfile
+from datetime import datetime
+
+# Ajout du répertoire parent au path pour les imports
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.sites import DatabaseMultiSite, normaliser_site
+from model.vehicule import Voiture, Moto
+from model.client import Client
+from model.reservation import Reservation
+
+
+class TestDatabaseMultiSite(unittest.TestCase):
+
+    def setUp(self):
+        """Deux agences, chacune avec un véhicule, un client et une réservation"""
+        self.dossier = tempfile.TemporaryDirectory()
+        self.db = DatabaseMultiSite(self.dossier.name, sites=["Brest", "Saint Malo"])
+
+        for site, vehicule, prix in (
+            ("Brest", Voiture(id=None, marque="Renault", modele="Clio", annee=2020, kilometrage=15000,
+                              prix_achat=15000, cout_entretien_annuel=600, nb_places=5, puissance=90,
+                              carburant="Essence", options=[]), 300.0),
+            ("Saint Malo", Moto(id=None, marque="Yamaha", modele="MT-07", annee=2022, kilometrage=5000,
+                                prix_achat=7000, cout_entretien_annuel=400, cylindree=690,
+                                type_moto="Roadster"), 200.0),
+        ):
+            base = self.db.base(site)
+            base.sauvegarder_vehicule(vehicule)
+            client_id = base.sauvegarder_client(
+                Client(id=None, nom="Martin", prenom="Sophie", adresse="1 rue des Tests",
+                       telephone="01 98 76 54 32", email="sophie.martin@test.com"))
+            base.sauvegarder_reservation(Reservation(
+                id=None, client_id=client_id, vehicule_id=vehicule.id,
+                date_debut=datetime(2024, 3, 1), date_fin=datetime(2024, 3, 4), prix_total=prix))
+
+    def tearDown(self):
+        self.db.fermer()
+        self.dossier.cleanup()
+
+    def test_un_fichier_par_site(self):
+        """Chaque site a son fichier, retrouvé à la réouverture du dossier"""
+        self.assertEqual(normaliser_site(" Saint Malo "), "Saint_Malo")
+        fichiers = [fichier for fichier in os.listdir(self.dossier.name) if fichier.endswith('.db')]
+        self.assertEqual(sorted(fichiers), ["Brest.db", "Saint_Malo.db"])
+        self.assertEqual(len(self.db.base("Brest").charger_tous_vehicules()), 1)
+        with self.assertRaises(ValueError):
+            self.db.base("  ")
+
+        self.db.fermer()
+        self.db = DatabaseMultiSite(self.dossier.name)
+        self.assertEqual(self.db.sites, ["Brest", "Saint_Malo"])
+
+    def test_rapports_consolides(self):
+        """Les rapports du siège fusionnent les résultats de tous les sites"""
+        bilan = self.db.calculer_bilan()
+        self.assertEqual(bilan["revenus"], 500.0)
+        self.assertEqual(bilan["cout_entretien"], 1000.0)
+        self.assertEqual(bilan["par_site"]["Saint_Malo"]["revenus"], 200.0)
+
+        self.assertEqual(self.db.charger_revenus_par_type_mois(), [
+            {"type": "Moto", "mois": "2024-03", "revenus": 200.0, "nb_reservations": 1},
+            {"type": "Voiture", "mois": "2024-03", "revenus": 300.0, "nb_reservations": 1},
+        ])
+        self.assertEqual(self.db.charger_statistiques_parc()["Voiture"]["nb_vehicules"], 1)
+
+        resultats = self.db.rechercher_vehicules({"annee": {"min": 2021}})
+        self.assertEqual([(site, vehicule.marque) for site, vehicule in resultats], [("Saint_Malo", "Yamaha")])
+        self.assertEqual([site for site, _ in self.db.rechercher_clients({"nom": "Martin"})],
+                         ["Brest", "Saint_Malo"])
+
+    def test_repartition_sur_une_selection(self):
+        """repartir n'interroge que les sites demandés"""
+        self.assertEqual(self.db.repartir('dernier_seq_journal', sites=["Brest"]).keys(), {"Brest"})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,156 @@
+# utils/cache.py
+# ce fichier implémente le cache d'objets de la couche d'accès aux données (utils/database.py)
+#
+# structure:
+# - carte d'identité : table -> (id -> objet déjà construit), tant qu'il est référencé ailleurs
+#   (références faibles) ; deux chargements du même enregistrement renvoient le même objet
+# - cache LRU optionnel et borné : garde les derniers objets chargés même s'ils ne sont plus
+#   référencés (références fortes), les moins récemment utilisés sont évincés
+# - les deux structures sont rangées par table : invalider toute une table ne parcourt que
+#   ses propres entrées, pas celles des autres tables
+# - compteurs de succès / échecs pour mesurer l'efficacité du cache
+# - génération incrémentée à chaque invalidation : un objet lu en base pendant une invalidation
+#   (écriture d'un autre thread en mode pool) n'est pas enregistré, il pourrait être périmé
+#
+# interactions:
+# - Database.charger_vehicule / charger_client / charger_reservation consultent le cache,
+#   les chargements en masse (charger_*, rechercher_*) y reprennent les objets déjà chargés
+#   et y enregistrent les autres (les parcours iter_* construisent des objets neufs)
+# - les méthodes sauvegarder_* et supprimer_* invalident les entrées concernées,
+#   (et, en mode pool, les invalident de nouveau une fois la transaction validée),
+#   une transaction annulée vide le cache
+# - les écritures faites par un autre processus ne sont pas vues : vider() force la relecture
+
+import threading
+import weakref
+from collections import OrderedDict, defaultdict
+
+
+class CacheObjets:
+    """
+    carte d'identité et cache LRU des objets chargés par une Database
+
+    Attributes:
+        taille_max (int): nombre d'objets gardés par le cache LRU (0 = carte d'identité seule)
+        succes (int): nombre de lectures servies par le cache
+        echecs (int): nombre de lectures qui ont dû interroger la base
+        generation (int): nombre d'invalidations (à lire avant la requête, voir enregistrer)
+    """
+
+    def __init__(self, taille_max=0):
+        """
+        initialise un cache vide
+
+        Args:
+            taille_max (int): taille du cache LRU (0 pour le désactiver)
+        """
+        self.taille_max = taille_max
+        self.succes = 0
+        self.echecs = 0
+        self.generation = 0
+        self._identites = defaultdict(weakref.WeakValueDictionary)
+        self._lru = OrderedDict()
+        # ids présents dans le LRU, par table
+        self._lru_par_table = defaultdict(set)
+        # en mode pool, le cache est partagé par les threads
+        self._verrou = threading.Lock()
+
+    def obtenir(self, table, objet_id):
+        """
+        cherche un objet déjà chargé
+
+        Args:
+            table (str): table d'origine de l'objet
+            objet_id (int): id de l'objet
+
+        Returns:
+            object: l'objet en cache, ou None (l'échec est alors comptabilisé)
+        """
+        cle = (table, objet_id)
+        with self._verrou:
+            identites = self._identites.get(table)
+            objet = identites.get(objet_id) if identites is not None else None
+            if objet is not None:
+                if cle in self._lru:
+                    self._lru.move_to_end(cle)
+                self.succes += 1
+            else:
+                self.echecs += 1
+            return objet
+
+    def enregistrer(self, table, objet_id, objet, generation=None):
+        """
+        enregistre un objet qui vient d'être construit depuis la base
+
+        Args:
+            generation (int, optional): valeur de self.generation lue avant la requête ; si une
+                invalidation a eu lieu depuis, la ligne lue a pu être modifiée entre-temps et
+                l'objet n'est pas enregistré
+
+        Returns:
+            object: l'objet (pour pouvoir écrire "return cache.enregistrer(...)")
+        """
+        cle = (table, objet_id)
+        with self._verrou:
+            if generation is not None and generation != self.generation:
+                return objet
+            self._identites[table][objet_id] = objet
+            if self.taille_max > 0:
+                self._lru[cle] = objet
+                self._lru.move_to_end(cle)
+                self._lru_par_table[table].add(objet_id)
+                while len(self._lru) > self.taille_max:
+                    (table_evincee, id_evince), _ = self._lru.popitem(last=False)
+                    self._lru_par_table[table_evincee].discard(id_evince)
+        return objet
+
+    def invalider(self, table, objet_id):
+        """
+        retire un objet du cache (après son écriture ou sa suppression)
+        """
+        with self._verrou:
+            self.generation += 1
+            identites = self._identites.get(table)
+            if identites is not None:
+                identites.pop(objet_id, None)
+            if self._lru.pop((table, objet_id), None) is not None:
+                self._lru_par_table[table].discard(objet_id)
+
+    def invalider_table(self, table):
+        """
+        retire du cache tous les objets d'une table (coût proportionnel aux seules entrées LRU
+        de cette table)
+        """
+        with self._verrou:
+            self.generation += 1
+            self._identites.pop(table, None)
+            for objet_id in self._lru_par_table.pop(table, ()):
+                del self._lru[(table, objet_id)]
+
+    def vider(self):
+        """
+        vide le cache (les compteurs sont conservés)
+        """
+        with self._verrou:
+            self.generation += 1
+            self._identites.clear()
+            self._lru.clear()
+            self._lru_par_table.clear()
+
+    def statistiques(self):
+        """
+        returns:
+            dict: succès, échecs, taux de succès et nombre d'objets en cache
+        """
+        with self._verrou:
+            lectures = self.succes + self.echecs
+            return {
+                "succes": self.succes,
+                "echecs": self.echecs,
+                "taux_succes": self.succes / lectures if lectures else 0.0,
+                "objets": sum(len(identites) for identites in self._identites.values()),
+                "lru": len(self._lru),
+            }
+
+    def __len__(self):
+        return sum(len(identites) for identites in self._identites.values())
@@ -0,0 +1,197 @@
+# utils/colonnes.py
+# ce fichier implémente l'export en colonnes (tableaux structurés numpy) de l'historique
+# des réservations et du parc, pour les analyses sur de gros volumes
+#
+# structure:
+# - exporter_colonnes lit les tables par paquets (fetchmany) et remplit des tableaux structurés :
+#   entiers (ids, dates en secondes, codes de type et de statut) et flottants (prix)
+# - avec un dossier, les tableaux sont écrits directement dans des fichiers .npy (mémoire constante)
+#   et se rechargent sans copie avec charger_colonnes (np.load(mmap_mode='r'))
+# - taux_utilisation : équivalent vectorisé de Parc._calculer_taux_utilisation
+#
+# interactions:
+# - appelé par Database.exporter_colonnes
+# - numpy est optionnel : il n'est importé qu'à l'utilisation (ImportError explicite sinon)
+
+import os
+from datetime import datetime
+
+from utils.database import encoder_date
+
+# codes entiers des colonnes texte (indice dans le tuple)
+TYPES_VEHICULE = ('Voiture', 'Utilitaire', 'Moto')
+STATUTS_RESERVATION = ('confirmée', 'annulée', 'terminée')
+
+
+def _numpy():
+    """
+    importe numpy à la demande
+
+    Raises:
+        ImportError: si numpy n'est pas installé
+    """
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError("l'export en colonnes nécessite numpy (pip install numpy)")
+    return numpy
+
+
+def _code_sql(colonne, valeurs):
+    """expression sql CASE traduisant une colonne texte en code entier (-1 si inconnue)"""
+    cas = ' '.join(f"WHEN '{valeur}' THEN {code}" for code, valeur in enumerate(valeurs))
+    return f"CASE {colonne} {cas} ELSE -1 END"
+
+
+def _tables(db):
+    """
+    description des tableaux exportés
+
+    Returns:
+        dict: nom -> (source sql, colonnes sql, dtype numpy)
+    """
+    np = _numpy()
+    return {
+        # réservations archivées comprises (voir Database.chemin_archive)
+        "reservations": (
+            db._reservations_rapport,
+            f"id, client_id, vehicule_id, date_debut, date_fin, prix_total, "
+            f"{_code_sql('statut', STATUTS_RESERVATION)}",
+            np.dtype([('id', 'i8'), ('client_id', 'i8'), ('vehicule_id', 'i8'),
+                      ('date_debut', 'i8'), ('date_fin', 'i8'), ('prix_total', 'f8'), ('statut', 'i1')]),
+        ),
+        "vehicules": (
+            "vehicules",
+            f"id, {_code_sql('type', TYPES_VEHICULE)}, annee, kilometrage, prix_achat, cout_entretien_annuel",
+            np.dtype([('id', 'i8'), ('type', 'i1'), ('annee', 'i4'), ('kilometrage', 'i8'),
+                      ('prix_achat', 'f8'), ('cout_entretien_annuel', 'f8')]),
+        ),
+    }
+
+
+def exporter_colonnes(db, dossier=None, taille_lot=100000):
+    """
+    exporte réservations et véhicules en tableaux structurés numpy, triés par id
+
+    la lecture se fait dans une seule transaction de lecture (comptage et lignes cohérents)
+    et par paquets de taille_lot lignes ; avec un dossier, chaque paquet est écrit directement
+    dans le fichier .npy projeté en mémoire, sans jamais construire la liste complète.
+
+    Args:
+        db (Database): base à exporter
+        dossier (str, optional): dossier où écrire reservations.npy et vehicules.npy
+        taille_lot (int): nombre de lignes lues à la fois
+
+    Returns:
+        dict: "reservations" et "vehicules" -> tableau structuré (en mémoire, ou projeté en
+            lecture seule depuis le fichier si un dossier est donné)
+
+    Raises:
+        ImportError: si numpy n'est pas installé
+    """
+    np = _numpy()
+    if dossier:
+        os.makedirs(dossier, exist_ok=True)
+
+    conn = db.conn
+    # transaction de lecture : les écritures concurrentes n'apparaissent pas entre comptage et lecture
+    transaction_propre = not conn.in_transaction
+    if transaction_propre:
+        conn.execute('BEGIN')
+
+    tableaux = {}
+    try:
+        for nom, (source, colonnes, dtype) in _tables(db).items():
+            nb_lignes = conn.execute(f'SELECT COUNT(*) FROM {source}').fetchone()[0]
+
+            chemin = os.path.join(dossier, f"{nom}.npy") if dossier else None
+            if chemin and nb_lignes:
+                tableau = np.lib.format.open_memmap(chemin, mode='w+', dtype=dtype, shape=(nb_lignes,))
+            else:
+                tableau = np.empty(nb_lignes, dtype=dtype)
+
+            # lignes sous forme de tuples (et non de sqlite3.Row) pour l'affectation numpy
+            cursor = conn.cursor()
+            cursor.row_factory = None
+            cursor.execute(f'SELECT {colonnes} FROM {source} ORDER BY id')
+            position = 0
+            while True:
+                rows = cursor.fetchmany(taille_lot)
+                if not rows:
+                    break
+                tableau[position:position + len(rows)] = rows
+                position += len(rows)
+            cursor.close()
+
+            if chemin:
+                if nb_lignes:
+                    tableau.flush()
+                    del tableau
+                else:
+                    np.save(chemin, tableau)
+                tableaux[nom] = np.load(chemin, mmap_mode='r')
+            else:
+                tableaux[nom] = tableau
+    finally:
+        if transaction_propre:
+            conn.rollback()
+
+    return tableaux
+
+
+def charger_colonnes(dossier):
+    """
+    recharge un export sans copie : les tableaux sont projetés en mémoire en lecture seule,
+    seules les pages effectivement lues sont chargées
+
+    Args:
+        dossier (str): dossier passé à exporter_colonnes
+
+    Returns:
+        dict: "reservations" et "vehicules" -> tableau structuré projeté en mémoire
+    """
+    np = _numpy()
+    return {nom: np.load(os.path.join(dossier, f"{nom}.npy"), mmap_mode='r')
+            for nom in ("reservations", "vehicules")}
+
+
+def taux_utilisation(colonnes, maintenant=None, jours_total=365):
+    """
+    taux d'utilisation de chaque véhicule sur les jours_total derniers jours, calculé sur
+    les colonnes (même règle que Parc._calculer_taux_utilisation : réservations confirmées
+    ou terminées, jours entamés comptés, taux plafonné à 1)
+
+    Args:
+        colonnes (dict): résultat de exporter_colonnes ou charger_colonnes
+        maintenant (datetime, optional): fin de la période d'analyse (maintenant par défaut)
+        jours_total (int): durée de la période d'analyse en jours
+
+    Returns:
+        dict: {vehicule_id: taux_utilisation}
+    """
+    np = _numpy()
+    reservations = colonnes["reservations"]
+    ids_parc = np.sort(colonnes["vehicules"]["id"])
+    if len(ids_parc) == 0:
+        return {}
+
+    fin_analyse = encoder_date(maintenant or datetime.now())
+    debut_analyse = fin_analyse - jours_total * 86400
+
+    comptees = np.isin(reservations["statut"], [STATUTS_RESERVATION.index("confirmée"),
+                                                STATUTS_RESERVATION.index("terminée")])
+    debut = np.maximum(reservations["date_debut"][comptees], debut_analyse)
+    fin = np.minimum(reservations["date_fin"][comptees], fin_analyse)
+    vehicule_ids = reservations["vehicule_id"][comptees]
+
+    valides = fin >= debut
+    jours = (fin[valides] - debut[valides]) // 86400 + 1
+    vehicule_ids = vehicule_ids[valides]
+
+    # position de chaque véhicule dans le parc (les véhicules retirés du parc sont ignorés)
+    positions = np.searchsorted(ids_parc, vehicule_ids)
+    dans_parc = ids_parc[np.minimum(positions, len(ids_parc) - 1)] == vehicule_ids
+    jours_reserves = np.bincount(positions[dans_parc], weights=jours[dans_parc], minlength=len(ids_parc))
+
+    taux = np.minimum(jours_reserves / jours_total, 1.0)
+    return dict(zip(ids_parc.tolist(), taux.tolist()))
@@ -129,16 +129,111 @@
 # particularités techniques:
 # - utilise SQLite comme moteur de base de données embarqué
 # - emploie le pattern Row Factory pour récupérer les résultats sous forme de dictionnaires
-# - sérialise les attributs spécifiques en JSON pour gérer le polymorphisme
+# - sérialise les attributs spécifiques en JSON pour gérer le polymorphisme, exposés en colonnes
+#   générées indexées (puissance, carburant, ...) et table annexe vehicule_options pour la recherche
 # - maintient les références d'intégrité via contraintes FOREIGN KEY
+# - gère un ensemble d'index secondaires (INDEX_SECONDAIRES) créés et mis à jour par migration
+# - versionne le schéma via PRAGMA user_version (moteur de migrations dans utils/migrations.py)
+# - mode pool optionnel (Database(chemin, pool=True)) : journal WAL, une connexion par thread,
+#   un curseur par appel et un seul écrivain à la fois
 # - convertit automatiquement les dates entre formats Python et SQLite
+#   (stockées en secondes entières depuis 1970, voir encoder_date / decoder_date)
+# - carte d'identité et cache LRU optionnel (Database(chemin, taille_cache=n), utils/cache.py) :
+#   charger_vehicule / charger_client / charger_reservation renvoient le même objet tant
+#   qu'il n'a pas été écrit ou supprimé
+# - variantes iter_* des chargements de listes : lecture par paquets (fetchmany) et pagination
+#   par clé (apres_id, limite) pour parcourir de très grosses tables à mémoire constante
+# - critères de recherche des véhicules compilés par model/requete.py (dict ou texte du type
+#   "puissance>=100 options~GPS"), la même requête filtrant aussi les objets du Parc
+# - recherche des clients par index plein texte FTS5 (clients_fts, tenu à jour par triggers),
+#   par préfixe et insensible aux accents ; repli sur LIKE si sqlite n'a pas FTS5
+# - archivage optionnel des réservations clôturées dans un second fichier attaché
+#   (Database(chemin, chemin_archive=...), archiver_reservations) ; les consultations lisent
+#   les deux fichiers (UNION ALL), la prise de réservation seulement la table courante
+# - agrégats matérialisés (tables stats_*, tenues à jour par triggers) pour le bilan et les
+#   statistiques du parc : calculer_bilan, charger_statistiques_parc, charger_revenus_*
+# - projections pour les écrans de liste (projeter_vehicules, projeter_clients) : tuples nommés
+#   limités aux colonnes affichées, sans objet métier ni json décodé ni historique
+# - journal des modifications (journal_modifications, tenu à jour par triggers) : lire_journal
+#   renvoie les écritures postérieures à un seq, pour la synchronisation incrémentale de Parc
+# - export en colonnes numpy (exporter_colonnes, utils/colonnes.py) des réservations et du parc
+#   pour les analyses vectorisées, rechargeable sans copie par projection mémoire
 # - implémente des vérifications de sécurité avant suppressions (dépendances)
 # - fournit une méthode de génération de données de test pour le développement
 # - centralise les transactions et gestion des erreurs SQLite
 
 import sqlite3
+import re
 import json
-from datetime import datetime
+import threading
+from collections import namedtuple
+from contextlib import contextmanager
+from functools import lru_cache, wraps
+from datetime import datetime, timedelta
+from itertools import islice
+
+from utils.cache import CacheObjets
+from utils.migrations import appliquer_migrations
+
+
+# origine des dates stockées en entier (secondes depuis cette date, datetime naïfs)
+_EPOCH = datetime(1970, 1, 1)
+
+
+def encoder_date(date):
+    """
+    convertit un datetime en nombre entier de secondes depuis le 1er janvier 1970
+    (format de stockage des dates : comparaisons et tris entiers côté sqlite)
+
+    args:
+        date (datetime): date à encoder
+
+    returns:
+        int: secondes depuis _EPOCH (les microsecondes sont ignorées)
+    """
+    delta = date - _EPOCH
+    return delta.days * 86400 + delta.seconds
+
+
+def decoder_date(secondes):
+    """
+    reconstruit un datetime depuis sa forme entière (bien plus rapide que strptime)
+
+    args:
+        secondes (int): valeur stockée en base
+
+    returns:
+        datetime: date correspondante
+    """
+    return _EPOCH + timedelta(seconds=secondes)
+
+
+@lru_cache(maxsize=None)
+def _type_projection(nom, colonnes):
+    """
+    type des lignes d'une projection : tuple nommé (__slots__ vide, pas de __dict__ par ligne),
+    créé une seule fois par jeu de colonnes
+
+    args:
+        nom (str): nom du type
+        colonnes (tuple): noms des champs
+
+    returns:
+        type: classe namedtuple
+    """
+    return namedtuple(nom, colonnes)
+
+
+def _ecriture(methode):
+    """
+    décorateur des méthodes d'écriture : les sérialise derrière le verrou d'écriture
+    de la base (un seul écrivain à la fois, quel que soit le thread)
+    """
+    @wraps(methode)
+    def envelopper(self, *args, **kwargs):
+        with self._verrou_ecriture:
+            return methode(self, *args, **kwargs)
+    return envelopper
 
 
 class Database:
@@ -146,28 +241,240 @@ class Database:
     classe gérant la connexion et les opérations sur la base de données sqlite
     """
 
-    def __init__(self, db_path):
+    # index secondaires gérés par la classe (nom -> définition sql)
+    # _synchroniser_index aligne la base sur cette liste : les index manquants sont créés,
+    # ceux dont la définition a changé sont reconstruits et les index "idx_" qui ne figurent
+    # plus dans la liste sont supprimés. toute modification ici doit s'accompagner d'une
+    # migration (utils/migrations.py) qui rappelle _synchroniser_index
+    INDEX_SECONDAIRES = {
+        # recherche des réservations d'un véhicule sur une période
+        "idx_reservations_vehicule_periode":
+            "CREATE INDEX idx_reservations_vehicule_periode ON reservations (vehicule_id, date_debut, date_fin)",
+        # index partiel : seules les réservations confirmées bloquent un véhicule
+        "idx_reservations_confirmees":
+            "CREATE INDEX idx_reservations_confirmees ON reservations (vehicule_id, date_debut, date_fin) "
+            "WHERE statut = 'confirmée'",
+        # historique d'un client
+        "idx_reservations_client":
+            "CREATE INDEX idx_reservations_client ON reservations (client_id)",
+        # requêtes par plage de dates tous véhicules confondus
+        "idx_reservations_periode":
+            "CREATE INDEX idx_reservations_periode ON reservations (date_debut, date_fin)",
+        # réservations clôturées, candidates à l'archivage (archiver_reservations)
+        "idx_reservations_cloturees":
+            "CREATE INDEX idx_reservations_cloturees ON reservations (date_fin) "
+            "WHERE statut IN ('terminée', 'annulée')",
+        # facture d'une réservation
+        "idx_factures_reservation":
+            "CREATE INDEX idx_factures_reservation ON factures (reservation_id)",
+        # critères de rechercher_vehicules
+        "idx_vehicules_type":
+            "CREATE INDEX idx_vehicules_type ON vehicules (type)",
+        "idx_vehicules_marque":
+            "CREATE INDEX idx_vehicules_marque ON vehicules (marque, modele)",
+        "idx_vehicules_categorie":
+            "CREATE INDEX idx_vehicules_categorie ON vehicules (categorie)",
+        "idx_vehicules_annee":
+            "CREATE INDEX idx_vehicules_annee ON vehicules (annee)",
+        "idx_vehicules_prix":
+            "CREATE INDEX idx_vehicules_prix ON vehicules (prix_achat)",
+        # attributs spécifiques (colonnes générées, NULL pour les autres types de véhicules)
+        "idx_vehicules_puissance":
+            "CREATE INDEX idx_vehicules_puissance ON vehicules (puissance)",
+        "idx_vehicules_carburant":
+            "CREATE INDEX idx_vehicules_carburant ON vehicules (carburant)",
+        "idx_vehicules_nb_places":
+            "CREATE INDEX idx_vehicules_nb_places ON vehicules (nb_places)",
+        "idx_vehicules_volume":
+            "CREATE INDEX idx_vehicules_volume ON vehicules (volume)",
+        "idx_vehicules_charge_utile":
+            "CREATE INDEX idx_vehicules_charge_utile ON vehicules (charge_utile)",
+        "idx_vehicules_cylindree":
+            "CREATE INDEX idx_vehicules_cylindree ON vehicules (cylindree)",
+        "idx_vehicules_type_moto":
+            "CREATE INDEX idx_vehicules_type_moto ON vehicules (type_moto)",
+        # options d'un véhicule (la clé primaire (option, vehicule_id) sert la recherche par option)
+        "idx_vehicule_options_vehicule":
+            "CREATE INDEX idx_vehicule_options_vehicule ON vehicule_options (vehicule_id)",
+    }
+
+    # objets mis en cache dont le contenu dépend d'une autre table : table écrite ->
+    # (table dépendante, attribut de l'objet écrit qui désigne l'objet dépendant)
+    # (un client chargé porte son historique de réservations)
+    _DEPENDANCES_CACHE = {
+        'reservations': (('clients', 'client_id'),),
+    }
+
+    # table des réservations archivées (fichier séparé, attaché sous le nom "archive")
+    # mêmes colonnes que reservations, sans clés étrangères (les tables référencées sont dans la base principale)
+    _DEFINITION_ARCHIVE_RESERVATIONS = """
+    CREATE TABLE IF NOT EXISTS archive.reservations (
+        id INTEGER PRIMARY KEY,
+        client_id INTEGER NOT NULL,
+        vehicule_id INTEGER NOT NULL,
+        date_debut INTEGER NOT NULL,
+        date_fin INTEGER NOT NULL,
+        prix_total REAL NOT NULL,
+        statut TEXT NOT NULL
+    )
+    """
+    _INDEX_ARCHIVE = (
+        "CREATE INDEX IF NOT EXISTS archive.idx_reservations_client ON reservations (client_id)",
+        "CREATE INDEX IF NOT EXISTS archive.idx_reservations_vehicule_periode "
+        "ON reservations (vehicule_id, date_debut, date_fin)",
+        "CREATE INDEX IF NOT EXISTS archive.idx_reservations_periode ON reservations (date_debut, date_fin)",
+    )
+
+    def __init__(self, db_path, pool=False, delai_attente=30.0, taille_cache=0, chemin_archive=None):
         """
         initialise la connexion à la base de données
 
         args:
             db_path: chemin vers le fichier sqlite
+            pool (bool): mode multi-thread (journal WAL, une connexion par thread,
+                un seul écrivain à la fois), pour faire tourner en parallèle les threads
+                de réservation et de reporting
+            delai_attente (float): secondes d'attente si la base est verrouillée
+                par un autre processus
+            taille_cache (int): nombre de véhicules, clients et réservations gardés en
+                mémoire par le cache LRU (0 = carte d'identité seule, voir utils/cache.py)
+            chemin_archive (str, optional): fichier sqlite des réservations archivées
+                (voir archiver_reservations), attaché à chaque connexion
+        """
+        self.db_path = db_path
+        self.pool = pool
+        self.delai_attente = delai_attente
+        self.chemin_archive = chemin_archive
+
+        # source des requêtes de consultation (historiques, exports, contrôles avant suppression) :
+        # réservations courantes et archivées. la réservation et la disponibilité n'interrogent
+        # que la table courante, dont les réservations clôturées anciennes ont été retirées
+        if chemin_archive:
+            self._reservations_rapport = ('(SELECT * FROM main.reservations '
+                                          'UNION ALL SELECT * FROM archive.reservations) AS reservations')
+        else:
+            self._reservations_rapport = 'reservations'
+
+        # état propre à chaque thread (connexion, curseur partagé, profondeur de transaction)
+        self._local = threading.local()
+        # toutes les connexions ouvertes, pour pouvoir les fermer
+        self._connexions = []
+        self._verrou_connexions = threading.Lock()
+        # un seul écrivain à la fois dans ce processus (les lectures restent parallèles en WAL)
+        self._verrou_ecriture = threading.RLock()
+
+        # carte d'identité et cache LRU des objets chargés par cette session
+        self.cache = CacheObjets(taille_cache)
+
+        # connexion à la base de données (celle du thread qui crée l'objet)
+        self._conn_principale = self._ouvrir_connexion()
+        self._local.conn = self._conn_principale
+
+        if self.pool:
+            # WAL : les lecteurs ne bloquent pas l'écrivain et inversement
+            self._conn_principale.execute('PRAGMA journal_mode = WAL')
+
+        # mise à jour du schéma (simple lecture de PRAGMA user_version si la base est à jour)
+        appliquer_migrations(self)
+
+        if chemin_archive:
+            self._aligner_sequence_archive()
+
+        # index plein texte des clients (absent si sqlite a été compilé sans FTS5)
+        cursor = self.conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'clients_fts'")
+        self.recherche_plein_texte = cursor.fetchone() is not None
+
+    def _ouvrir_connexion(self):
         """
-        # connexion à la base de données
-        self.conn = sqlite3.connect(db_path)
+        ouvre une nouvelle connexion sqlite configurée pour la classe
+
+        returns:
+            sqlite3.Connection: connexion ouverte
+        """
+        # en mode pool, chaque connexion n'est utilisée que par son thread ; check_same_thread
+        # est désactivé uniquement pour que fermer() puisse toutes les fermer
+        conn = sqlite3.connect(self.db_path, timeout=self.delai_attente, check_same_thread=not self.pool)
         # configuration pour avoir les résultats sous forme de dictionnaire
-        self.conn.row_factory = sqlite3.Row
-        # création d'un curseur pour exécuter les requêtes
-        self.cursor = self.conn.cursor()
-        # création des tables si elles n'existent pas
-        self._creer_tables()
+        conn.row_factory = sqlite3.Row
+        if self.pool:
+            # en WAL, NORMAL reste sûr et évite un fsync par transaction
+            conn.execute('PRAGMA synchronous = NORMAL')
+        if self.chemin_archive:
+            conn.execute('ATTACH DATABASE ? AS archive', (self.chemin_archive,))
+            conn.execute(self._DEFINITION_ARCHIVE_RESERVATIONS)
+            for sql in self._INDEX_ARCHIVE:
+                conn.execute(sql)
+            conn.commit()
+
+        with self._verrou_connexions:
+            self._connexions.append(conn)
+        return conn
+
+    def _aligner_sequence_archive(self):
+        """
+        place la séquence des ids de réservation au-delà du plus grand id archivé : un nouvel
+        id ne doit jamais désigner une réservation de l'archive (archive venant d'une autre base,
+        ou remplie avant que les ids ne soient AUTOINCREMENT)
+        """
+        max_archive = self.conn.execute('SELECT MAX(id) FROM archive.reservations').fetchone()[0]
+        if max_archive is None:
+            return
+        row = self.conn.execute("SELECT seq FROM main.sqlite_sequence WHERE name = 'reservations'").fetchone()
+        if row is not None and row['seq'] >= max_archive:
+            return
+        with self.transaction():
+            if row is None:
+                self.conn.execute("INSERT INTO main.sqlite_sequence (name, seq) VALUES ('reservations', ?)",
+                                  (max_archive,))
+            else:
+                self.conn.execute("UPDATE main.sqlite_sequence SET seq = ? WHERE name = 'reservations'",
+                                  (max_archive,))
+
+    @property
+    def conn(self):
+        """
+        connexion à utiliser par le thread courant
+        (la connexion unique hors mode pool, une connexion par thread en mode pool)
+        """
+        if not self.pool:
+            return self._conn_principale
+
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._ouvrir_connexion()
+            self._local.conn = conn
+        return conn
+
+    @property
+    def cursor(self):
+        """
+        curseur partagé du thread courant, conservé pour les requêtes directes (scripts, tests).
+        les méthodes de la classe créent leur propre curseur à chaque appel, ce qui permet
+        les appels imbriqués (ex: charger_client -> charger_reservations_client)
+        """
+        conn = self.conn
+        cursor = getattr(self._local, 'cursor', None)
+        if cursor is None or cursor.connection is not conn:
+            cursor = conn.cursor()
+            self._local.cursor = cursor
+        return cursor
+
+    @property
+    def _profondeur_transaction(self):
+        """profondeur des blocs "with db.transaction()" du thread courant (0 = aucun)"""
+        return getattr(self._local, 'profondeur_transaction', 0)
+
+    @_profondeur_transaction.setter
+    def _profondeur_transaction(self, valeur):
+        self._local.profondeur_transaction = valeur
 
     def _creer_tables(self):
         """
         crée les tables nécessaires si elles n'existent pas
+        (appelé par la première migration, voir utils/migrations.py)
         """
         # table des véhicules
-        self.cursor.execute('''
+        self.conn.execute('''
         CREATE TABLE IF NOT EXISTS vehicules (
             id INTEGER PRIMARY KEY,
             type TEXT NOT NULL,
@@ -183,7 +490,7 @@ class Database:
         ''')
 
         # table des clients
-        self.cursor.execute('''
+        self.conn.execute('''
         CREATE TABLE IF NOT EXISTS clients (
             id INTEGER PRIMARY KEY,
             nom TEXT NOT NULL,
@@ -195,7 +502,7 @@ class Database:
         ''')
 
         # table des réservations
-        self.cursor.execute('''
+        self.conn.execute('''
         CREATE TABLE IF NOT EXISTS reservations (
             id INTEGER PRIMARY KEY,
             client_id INTEGER NOT NULL,
@@ -210,7 +517,7 @@ class Database:
         ''')
 
         # table des factures
-        self.cursor.execute('''
+        self.conn.execute('''
         CREATE TABLE IF NOT EXISTS factures (
             id INTEGER PRIMARY KEY,
             reservation_id INTEGER NOT NULL,
@@ -222,18 +529,312 @@ class Database:
         )
         ''')
 
-        # validation des changements
-        self.conn.commit()
+    def _synchroniser_index(self, ignorer_absents=False):
+        """
+        aligne les index "idx_" de la base sur INDEX_SECONDAIRES
+        (création des manquants, reconstruction des modifiés, suppression des obsolètes)
+
+        args:
+            ignorer_absents (bool): true pendant les migrations, pour laisser de côté un index
+                dont la table ou la colonne n'est créée que par une migration ultérieure
+
+        raises:
+            sqlite3.OperationalError: si un index ne peut pas être créé (hors table ou colonne
+                absente avec ignorer_absents)
+        """
+        cursor = self.conn.execute("SELECT name, sql FROM sqlite_master WHERE type = 'index' AND substr(name, 1, 4) = 'idx_'")
+        existants = {row['name']: self._normaliser_sql(row['sql']) for row in cursor.fetchall()}
+
+        for nom, sql in existants.items():
+            # index obsolète ou dont la définition a changé
+            if sql != self._normaliser_sql(self.INDEX_SECONDAIRES.get(nom)):
+                self.conn.execute(f'DROP INDEX IF EXISTS {nom}')
+
+        for nom, sql in self.INDEX_SECONDAIRES.items():
+            # index manquant ou supprimé juste au-dessus
+            if existants.get(nom) != self._normaliser_sql(sql):
+                try:
+                    self.conn.execute(sql)
+                except sqlite3.OperationalError as e:
+                    # colonne ou table créée par une migration ultérieure, qui resynchronise les index
+                    if not (ignorer_absents and str(e).startswith(('no such table:', 'no such column:'))):
+                        raise
+
+    @staticmethod
+    def _normaliser_sql(sql):
+        """
+        normalise une définition sql pour la comparer (espaces et casse)
+        """
+        if sql is None:
+            return None
+        return ' '.join(sql.split()).lower()
+
+    @contextmanager
+    def transaction(self):
+        """
+        unité de travail : les écritures faites dans le bloc sont validées en une seule fois
+        à la sortie du bloc, et annulées si une exception s'en échappe.
+
+        les méthodes sauvegarder_* et supprimer_* rejoignent la transaction ouverte au lieu
+        de valider chacune de leur côté. un bloc imbriqué crée un point de sauvegarde
+        (SAVEPOINT) : son échec n'annule que ses propres écritures.
+
+        exemple:
+            with db.transaction():
+                db.sauvegarder_client(client)
+                db.sauvegarder_reservation(reservation)
+        """
+        if self._profondeur_transaction == 0:
+            # le verrou d'écriture est tenu pendant tout le bloc (un seul écrivain à la fois)
+            with self._verrou_ecriture:
+                conn = self.conn
+                if not conn.in_transaction:
+                    conn.execute('BEGIN IMMEDIATE')
+                self._profondeur_transaction += 1
+                try:
+                    yield self
+                except BaseException:
+                    conn.rollback()
+                    # des objets chargés pendant le bloc peuvent refléter des écritures annulées
+                    self._local.invalidations = set()
+                    self.cache.vider()
+                    raise
+                else:
+                    conn.commit()
+                    self._invalider_apres_validation()
+                finally:
+                    self._profondeur_transaction -= 1
+        else:
+            point = f'transaction_{self._profondeur_transaction}'
+            self.conn.execute(f'SAVEPOINT {point}')
+            self._profondeur_transaction += 1
+            try:
+                yield self
+            except BaseException:
+                self.conn.execute(f'ROLLBACK TO {point}')
+                self.conn.execute(f'RELEASE {point}')
+                self.cache.vider()
+                raise
+            else:
+                self.conn.execute(f'RELEASE {point}')
+            finally:
+                self._profondeur_transaction -= 1
+
+    def _valider(self):
+        """
+        valide les changements, sauf si une transaction englobante est ouverte
+        (elle sera validée à la fin de son bloc)
+        """
+        if self._profondeur_transaction == 0:
+            self.conn.commit()
+            self._invalider_apres_validation()
+
+    def _invalider(self, table, objet_id=None, objet=None, anciens_dependants=()):
+        """
+        retire du cache l'objet écrit ou supprimé (objet_id None : objet inséré, pas encore
+        en cache), et les objets qui en dépendent : seulement ceux que désigne l'objet écrit
+        (ex: le client d'une réservation) s'il est fourni, toute la table dépendante sinon
+
+        en mode pool, les autres threads lisent l'ancienne ligne jusqu'à la validation et
+        peuvent la remettre en cache entre-temps : l'invalidation est refaite après le commit
+        (voir _invalider_apres_validation)
+
+        args:
+            table (str): table écrite
+            objet_id (int, optional): id de l'objet écrit ou supprimé
+            objet (optional): objet écrit
+            anciens_dependants (iterable): ids dépendants avant l'écriture (ex: ancien client
+                d'une réservation réattribuée ou supprimée)
+        """
+        cles = [(table, objet_id)] if objet_id is not None else []
+        for table_dependante, attribut in self._DEPENDANCES_CACHE.get(table, ()):
+            dependants = set(anciens_dependants)
+            if objet is not None:
+                dependants.add(getattr(objet, attribut))
+            # aucun objet dépendant connu : None retire toute la table dépendante
+            cles.extend((table_dependante, dependant_id) for dependant_id in dependants or (None,))
+
+        for cle in cles:
+            self._retirer_du_cache(*cle)
+
+        if self.pool and self.conn.in_transaction:
+            invalidations = getattr(self._local, 'invalidations', None)
+            if invalidations is None:
+                invalidations = self._local.invalidations = set()
+            invalidations.update(cles)
+
+    def _retirer_du_cache(self, table, objet_id):
+        """retire un objet du cache (objet_id None : tous les objets de la table)"""
+        if objet_id is None:
+            self.cache.invalider_table(table)
+        else:
+            self.cache.invalider(table, objet_id)
+
+    def _invalider_apres_validation(self):
+        """
+        refait les invalidations de la transaction qui vient d'être validée (mode pool)
+        """
+        invalidations = getattr(self._local, 'invalidations', None)
+        if invalidations:
+            self._local.invalidations = set()
+            for table, objet_id in invalidations:
+                self._retirer_du_cache(table, objet_id)
+
+    def _hydrater_par_cache(self, table, construire, generation):
+        """
+        fonction row -> objet des chargements en masse passant par la carte d'identité :
+        l'objet déjà chargé est réutilisé, sinon l'objet construit est mis en cache
+
+        args:
+            table (str): table d'origine des lignes
+            construire (callable): fonction row -> objet (ex: _reservation_depuis_row)
+            generation (int): self.cache.generation lue avant la requête
+
+        returns:
+            callable: fonction row -> objet
+        """
+        def hydrater(row):
+            objet = self.cache.obtenir(table, row['id'])
+            if objet is None:
+                objet = construire(row)
+                if objet is not None:
+                    self.cache.enregistrer(table, row['id'], objet, generation)
+            return objet
+        return hydrater
 
     def fermer(self):
         """
-        ferme la connexion à la base de données
+        ferme les connexions à la base de données (celles de tous les threads en mode pool)
+        """
+        with self._verrou_connexions:
+            for conn in self._connexions:
+                conn.close()
+            self._connexions = []
+
+    def _sauvegarder_en_masse(self, table, objets, requete_insert, requete_update, parametres, taille_lot,
+                              apres_lot=None):
         """
-        if self.conn:
-            self.conn.close()
+        écrit des objets par lots avec executemany, dans une seule transaction
+        (rejoint la transaction de l'appelant si elle existe)
+
+        les objets sans id sont insérés, les autres sont mis à jour. les ids générés sont
+        réaffectés aux objets : dans une transaction, sqlite attribue des rowid consécutifs
+        (max + 1) et aucun autre écrivain ne peut s'intercaler, donc les n lignes d'un lot
+        reçoivent les ids MAX(id) - n + 1 .. MAX(id) lus juste après l'insertion.
+
+        args:
+            table (str): table cible
+            objets (iterable): objets à écrire (consommés lot par lot, un générateur suffit)
+            requete_insert (str): requête INSERT
+            requete_update (str): requête UPDATE (id en dernier paramètre)
+            parametres (callable): fonction objet -> tuple de colonnes
+            taille_lot (int): nombre d'objets par lot
+            apres_lot (callable, optional): fonction(lot) appelée une fois les ids affectés
+                (écriture des tables annexes)
+
+        returns:
+            list: ids de tous les objets écrits, dans l'ordre d'entrée
+        """
+        ids = []
+        iterateur = iter(objets)
+
+        with self.transaction():
+            while True:
+                lot = list(islice(iterateur, taille_lot))
+                if not lot:
+                    break
+
+                nouveaux = [objet for objet in lot if objet.id is None]
+                existants = [objet for objet in lot if objet.id is not None]
+
+                if existants:
+                    self.conn.executemany(requete_update,
+                                          [parametres(objet) + (objet.id,) for objet in existants])
+                    for objet in existants:
+                        self._invalider(table, objet.id)
+
+                if nouveaux:
+                    self.conn.executemany(requete_insert, [parametres(objet) for objet in nouveaux])
+                    cursor = self.conn.execute(f'SELECT MAX(id) FROM {table}')
+                    premier_id = cursor.fetchone()[0] - len(nouveaux) + 1
+                    for decalage, objet in enumerate(nouveaux):
+                        objet.id = premier_id + decalage
+                        self._invalider(table, objet=objet)
+
+                if apres_lot is not None:
+                    apres_lot(lot)
+
+                ids.extend(objet.id for objet in lot)
+
+        return ids
+
+    def _iterer(self, requete, parametres, hydrater, taille_lot, apres_id, limite, traiter_lot=None):
+        """
+        parcourt le résultat d'une requête par paquets (fetchmany) en construisant les objets
+        au fur et à mesure : la mémoire utilisée ne dépend que de taille_lot, pas de la taille
+        de la table.
+
+        la pagination se fait par clé (keyset) : les lignes sont triées par id, apres_id reprend
+        juste après le dernier id de la page précédente (recherche dans la clé primaire, sans
+        OFFSET qui relirait toutes les lignes sautées).
+
+        les objets sont construits à chaque parcours, sans passer par le cache : un export de
+        tout l'historique évincerait du cache LRU les objets utiles aux chargements charger_*.
+
+        args:
+            requete (str): "SELECT * FROM table WHERE ..." sans ORDER BY
+            parametres (list): paramètres liés de la requête
+            hydrater (callable): fonction row -> objet (les None sont ignorés)
+            taille_lot (int): nombre de lignes lues par fetchmany
+            apres_id (int, optional): ne renvoie que les lignes d'id strictement supérieur
+            limite (int, optional): nombre maximal de lignes
+            traiter_lot (callable, optional): fonction(objets) appelée sur chaque paquet
+                avant de le renvoyer (ex: historique des clients)
+
+        yields:
+            objets construits, par id croissant
+        """
+        parametres = list(parametres)
+        if apres_id is not None:
+            requete += ' AND id > ?'
+            parametres.append(apres_id)
+        requete += ' ORDER BY id'
+        if limite is not None:
+            requete += ' LIMIT ?'
+            parametres.append(limite)
+
+        cursor = self.conn.execute(requete, parametres)
+        try:
+            while True:
+                rows = cursor.fetchmany(taille_lot)
+                if not rows:
+                    break
+                objets = [objet for objet in map(hydrater, rows) if objet is not None]
+                if traiter_lot is not None and objets:
+                    traiter_lot(objets)
+                yield from objets
+        finally:
+            # parcours abandonné en cours de route : on libère l'instruction sqlite
+            cursor.close()
 
     # méthodes pour les véhicules
 
+    # requêtes d'écriture partagées par la sauvegarde unitaire et la sauvegarde en masse
+    _INSERT_VEHICULE = """
+    INSERT INTO vehicules
+    (type, marque, modele, annee, kilometrage, prix_achat, 
+    cout_entretien_annuel, categorie, attributs_specifiques)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """
+    _UPDATE_VEHICULE = """
+    UPDATE vehicules
+    SET type = ?, marque = ?, modele = ?, annee = ?, kilometrage = ?, 
+        prix_achat = ?, cout_entretien_annuel = ?, categorie = ?, 
+        attributs_specifiques = ?
+    WHERE id = ?
+    """
+
+    @_ecriture
     def sauvegarder_vehicule(self, vehicule):
         """
         sauvegarde un véhicule dans la base de données
@@ -244,6 +845,39 @@ class Database:
         returns:
             int: id du véhicule sauvegardé
         """
+        parametres = self._parametres_vehicule(vehicule)
+
+        # vérification si le véhicule existe déjà
+        if vehicule.id is None:
+            # création d'un nouveau véhicule
+            cursor = self.conn.execute(self._INSERT_VEHICULE, parametres)
+
+            # récupération de l'id généré
+            vehicule.id = cursor.lastrowid
+        else:
+            # mise à jour d'un véhicule existant
+            self.conn.execute(self._UPDATE_VEHICULE, parametres + (vehicule.id,))
+
+        # table annexe des options (dans la même transaction que le véhicule)
+        self._ecrire_options([vehicule])
+
+        self._invalider('vehicules', vehicule.id)
+
+        # validation des changements (différée si une transaction est ouverte)
+        self._valider()
+
+        return vehicule.id
+
+    def _parametres_vehicule(self, vehicule):
+        """
+        prépare les colonnes d'un véhicule dans l'ordre de _INSERT_VEHICULE
+
+        args:
+            vehicule: objet de type vehicule
+
+        returns:
+            tuple: valeurs à lier à la requête
+        """
         # extraction du type de véhicule
         type_vehicule = vehicule.__class__.__name__
 
@@ -272,53 +906,46 @@ class Database:
         # conversion en json pour stockage
         attributs_json = json.dumps(attributs_specifiques)
 
-        # vérification si le véhicule existe déjà
-        if vehicule.id is None:
-            # création d'un nouveau véhicule
-            self.cursor.execute("""
-            INSERT INTO vehicules
-            (type, marque, modele, annee, kilometrage, prix_achat, 
-            cout_entretien_annuel, categorie, attributs_specifiques)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                type_vehicule,
-                vehicule.marque,
-                vehicule.modele,
-                vehicule.annee,
-                vehicule.kilometrage,
-                vehicule.prix_achat,
-                vehicule.cout_entretien_annuel,
-                vehicule.categorie,
-                attributs_json
-            ))
+        return (
+            type_vehicule,
+            vehicule.marque,
+            vehicule.modele,
+            vehicule.annee,
+            vehicule.kilometrage,
+            vehicule.prix_achat,
+            vehicule.cout_entretien_annuel,
+            vehicule.categorie,
+            attributs_json
+        )
 
-            # récupération de l'id généré
-            vehicule.id = self.cursor.lastrowid
-        else:
-            # mise à jour d'un véhicule existant
-            self.cursor.execute("""
-            UPDATE vehicules
-            SET type = ?, marque = ?, modele = ?, annee = ?, kilometrage = ?, 
-                prix_achat = ?, cout_entretien_annuel = ?, categorie = ?, 
-                attributs_specifiques = ?
-            WHERE id = ?
-            """, (
-                type_vehicule,
-                vehicule.marque,
-                vehicule.modele,
-                vehicule.annee,
-                vehicule.kilometrage,
-                vehicule.prix_achat,
-                vehicule.cout_entretien_annuel,
-                vehicule.categorie,
-                attributs_json,
-                vehicule.id
-            ))
-
-        # validation des changements
-        self.conn.commit()
+    def sauvegarder_vehicules_bulk(self, vehicules, taille_lot=1000):
+        """
+        sauvegarde un grand nombre de véhicules par lots (executemany) dans une seule transaction
 
-        return vehicule.id
+        args:
+            vehicules (iterable): véhicules à sauvegarder (liste ou générateur)
+            taille_lot (int): nombre de lignes envoyées par executemany
+
+        returns:
+            list: ids des véhicules sauvegardés (également affectés aux objets)
+        """
+        return self._sauvegarder_en_masse('vehicules', vehicules, self._INSERT_VEHICULE,
+                                          self._UPDATE_VEHICULE, self._parametres_vehicule, taille_lot,
+                                          apres_lot=self._ecrire_options)
+
+    def _ecrire_options(self, vehicules):
+        """
+        réécrit les lignes de la table vehicule_options des véhicules donnés
+        (table annexe utilisée par rechercher_vehicules pour filtrer sur une option)
+
+        args:
+            vehicules (list): véhicules déjà sauvegardés (id affecté)
+        """
+        self.conn.executemany('DELETE FROM vehicule_options WHERE vehicule_id = ?',
+                              [(vehicule.id,) for vehicule in vehicules])
+        self.conn.executemany('INSERT OR IGNORE INTO vehicule_options (vehicule_id, option) VALUES (?, ?)',
+                              [(vehicule.id, option) for vehicule in vehicules
+                               for option in getattr(vehicule, 'options', None) or []])
 
     def charger_vehicule(self, vehicule_id):
         """
@@ -330,85 +957,144 @@ class Database:
         returns:
             vehicule: objet véhicule correspondant, ou none si non trouvé
         """
+        # objet déjà chargé par cette session
+        vehicule = self.cache.obtenir('vehicules', vehicule_id)
+        if vehicule is not None:
+            return vehicule
+
         # récupération des données depuis la base
-        self.cursor.execute('SELECT * FROM vehicules WHERE id = ?', (vehicule_id,))
-        row = self.cursor.fetchone()
+        generation = self.cache.generation
+        cursor = self.conn.execute('SELECT * FROM vehicules WHERE id = ?', (vehicule_id,))
+        row = cursor.fetchone()
 
         if row is None:
             return None
 
-        # conversion du dictionnaire row en dictionnaire standard
-        vehicule_data = dict(row)
+        return self.cache.enregistrer('vehicules', vehicule_id, self._vehicule_depuis_row(row), generation)
 
-        # désérialisation des attributs spécifiques
-        attributs_specifiques = json.loads(vehicule_data['attributs_specifiques'])
+    def _vehicule_depuis_row(self, row):
+        """
+        construit l'objet véhicule à partir d'une ligne de la table vehicules
+        (utilisé par les chargements unitaires et par les chargements en masse)
+        les attributs spécifiques sont lus dans les colonnes générées, sans décoder le json
 
+        args:
+            row (sqlite3.Row): ligne complète de la table vehicules
+
+        returns:
+            vehicule: objet véhicule correspondant, ou none si type inconnu
+        """
         # import des classes nécessaires
         from model.vehicule import Voiture, Utilitaire, Moto
 
         # création de l'objet selon son type
-        if vehicule_data['type'] == 'Voiture':
+        if row['type'] == 'Voiture':
             return Voiture(
-                id=vehicule_data['id'],
-                marque=vehicule_data['marque'],
-                modele=vehicule_data['modele'],
-                annee=vehicule_data['annee'],
-                kilometrage=vehicule_data['kilometrage'],
-                prix_achat=vehicule_data['prix_achat'],
-                cout_entretien_annuel=vehicule_data['cout_entretien_annuel'],
-                nb_places=attributs_specifiques['nb_places'],
-                puissance=attributs_specifiques['puissance'],
-                carburant=attributs_specifiques['carburant'],
-                options=attributs_specifiques['options']
+                id=row['id'],
+                marque=row['marque'],
+                modele=row['modele'],
+                annee=row['annee'],
+                kilometrage=row['kilometrage'],
+                prix_achat=row['prix_achat'],
+                cout_entretien_annuel=row['cout_entretien_annuel'],
+                nb_places=row['nb_places'],
+                puissance=row['puissance'],
+                carburant=row['carburant'],
+                # seule la liste d'options reste à décoder (et seulement si elle n'est pas vide)
+                options=json.loads(row['options']) if row['options'] not in (None, '[]') else []
             )
-        elif vehicule_data['type'] == 'Utilitaire':
+        elif row['type'] == 'Utilitaire':
             return Utilitaire(
-                id=vehicule_data['id'],
-                marque=vehicule_data['marque'],
-                modele=vehicule_data['modele'],
-                annee=vehicule_data['annee'],
-                kilometrage=vehicule_data['kilometrage'],
-                prix_achat=vehicule_data['prix_achat'],
-                cout_entretien_annuel=vehicule_data['cout_entretien_annuel'],
-                volume=attributs_specifiques['volume'],
-                charge_utile=attributs_specifiques['charge_utile'],
-                hayon=attributs_specifiques['hayon']
+                id=row['id'],
+                marque=row['marque'],
+                modele=row['modele'],
+                annee=row['annee'],
+                kilometrage=row['kilometrage'],
+                prix_achat=row['prix_achat'],
+                cout_entretien_annuel=row['cout_entretien_annuel'],
+                volume=row['volume'],
+                charge_utile=row['charge_utile'],
+                hayon=bool(row['hayon'])
             )
-        elif vehicule_data['type'] == 'Moto':
+        elif row['type'] == 'Moto':
             return Moto(
-                id=vehicule_data['id'],
-                marque=vehicule_data['marque'],
-                modele=vehicule_data['modele'],
-                annee=vehicule_data['annee'],
-                kilometrage=vehicule_data['kilometrage'],
-                prix_achat=vehicule_data['prix_achat'],
-                cout_entretien_annuel=vehicule_data['cout_entretien_annuel'],
-                cylindree=attributs_specifiques['cylindree'],
-                type_moto=attributs_specifiques['type']
+                id=row['id'],
+                marque=row['marque'],
+                modele=row['modele'],
+                annee=row['annee'],
+                kilometrage=row['kilometrage'],
+                prix_achat=row['prix_achat'],
+                cout_entretien_annuel=row['cout_entretien_annuel'],
+                cylindree=row['cylindree'],
+                type_moto=row['type_moto']
             )
         else:
             # type non reconnu
             return None
 
-    def charger_tous_vehicules(self):
+    def _vehicules_depuis_rows(self, rows, generation):
         """
-        charge tous les véhicules depuis la base de données
+        hydrate une liste de véhicules depuis un résultat de requête complet
+        (les types non reconnus sont ignorés), en passant par la carte d'identité
+
+        args:
+            rows (list): lignes complètes de la table vehicules
+            generation (int): self.cache.generation lue avant la requête
 
         returns:
             list: liste des objets véhicule
         """
-        # récupération de tous les véhicules
-        self.cursor.execute('SELECT id FROM vehicules')
-        rows = self.cursor.fetchall()
-
+        hydrater = self._hydrater_par_cache('vehicules', self._vehicule_depuis_row, generation)
         vehicules = []
         for row in rows:
-            vehicule = self.charger_vehicule(row['id'])
+            vehicule = hydrater(row)
             if vehicule:
                 vehicules.append(vehicule)
-
         return vehicules
 
+    def charger_vehicules(self, vehicule_ids):
+        """
+        charge plusieurs véhicules par leurs ids (une requête par lot de 500 ids)
+
+        args:
+            vehicule_ids (iterable): ids des véhicules
+
+        returns:
+            list: véhicules trouvés (les ids absents de la base sont ignorés)
+        """
+        generation = self.cache.generation
+        return self._vehicules_depuis_rows(
+            self._selectionner_par_ids('SELECT * FROM vehicules WHERE id IN ({})', vehicule_ids), generation)
+
+    def charger_tous_vehicules(self):
+        """
+        charge tous les véhicules depuis la base de données
+        (une seule requête, les objets sont construits directement depuis le résultat)
+
+        returns:
+            list: liste des objets véhicule
+        """
+        # récupération de tous les véhicules en une requête
+        generation = self.cache.generation
+        cursor = self.conn.execute('SELECT * FROM vehicules')
+        return self._vehicules_depuis_rows(cursor.fetchall(), generation)
+
+    def iter_vehicules(self, taille_lot=500, apres_id=None, limite=None):
+        """
+        parcourt les véhicules sans les charger tous en mémoire (voir _iterer)
+
+        args:
+            taille_lot (int): nombre de lignes lues à la fois
+            apres_id (int, optional): reprise après cet id (page suivante)
+            limite (int, optional): nombre maximal de véhicules (taille de page)
+
+        yields:
+            vehicule: véhicules par id croissant
+        """
+        return self._iterer('SELECT * FROM vehicules WHERE 1=1', [], self._vehicule_depuis_row,
+                            taille_lot, apres_id, limite)
+
+    @_ecriture
     def supprimer_vehicule(self, vehicule_id):
         """
         supprime un véhicule de la base de données
@@ -421,66 +1107,253 @@ class Database:
         """
         try:
             # vérifier si le véhicule a des réservations
-            self.cursor.execute('SELECT COUNT(*) FROM reservations WHERE vehicule_id = ?', (vehicule_id,))
-            count = self.cursor.fetchone()[0]
+            cursor = self.conn.execute(f'SELECT COUNT(*) FROM {self._reservations_rapport} WHERE vehicule_id = ?',
+                                       (vehicule_id,))
+            count = cursor.fetchone()[0]
             if count > 0:
                 print(f"impossible de supprimer un véhicule avec {count} réservations")
                 return False
 
-            # suppression du véhicule
-            self.cursor.execute('DELETE FROM vehicules WHERE id = ?', (vehicule_id,))
-            self.conn.commit()
-            return self.cursor.rowcount > 0
+            # suppression du véhicule et de ses options
+            self.conn.execute('DELETE FROM vehicule_options WHERE vehicule_id = ?', (vehicule_id,))
+            cursor = self.conn.execute('DELETE FROM vehicules WHERE id = ?', (vehicule_id,))
+            self._invalider('vehicules', vehicule_id)
+            self._valider()
+            return cursor.rowcount > 0
         except sqlite3.Error as e:
             print(f"erreur lors de la suppression du véhicule: {e}")
             return False
 
+    # critères de rechercher_vehicules portant directement sur une colonne de la table vehicules
+    # (les attributs spécifiques sont des colonnes générées, NULL pour les autres types de véhicules)
+    _COLONNES_RECHERCHE = (
+        'type', 'marque', 'modele', 'categorie', 'annee', 'kilometrage', 'prix_achat',
+        'cout_entretien_annuel', 'nb_places', 'puissance', 'carburant',
+        'volume', 'charge_utile', 'hayon', 'cylindree', 'type_moto',
+    )
+
     def rechercher_vehicules(self, criteres=None):
         """
-        recherche des véhicules selon certains critères
+        recherche des véhicules selon certains critères, entièrement filtrés en sql
+
+        les critères sont compilés par model/requete.py, comme ceux de Parc.verifier_disponibilite ;
+        un texte ("puissance>=100 carburant=Diesel options~GPS") ou une Requete sont acceptés
+        à la place du dict :
+        - valeur simple : égalité (ex: {"carburant": "Diesel"})
+        - dict min/max : intervalle (ex: {"puissance": {"min": 100, "max": 200}})
+        - "options" : option(s) que le véhicule doit posséder (ex: {"options": "GPS"})
+        - liste sur une autre colonne : valeur parmi la liste (ex: {"carburant": ["Diesel", "Hybride"]})
+        "type" désigne le type de véhicule (Voiture, Utilitaire, Moto), le type de moto
+        est "type_moto". les raccourcis annee_min, annee_max et prix_max restent acceptés.
 
         args:
             criteres (dict, optional): critères de recherche
 
         returns:
             list: liste des véhicules correspondant aux critères
+
+        raises:
+            ValueError: si un critère est inconnu ou si le texte de la requête est mal formé
         """
         if criteres is None:
             return self.charger_tous_vehicules()
 
         # construction de la requête sql avec les critères
-        query = 'SELECT id FROM vehicules WHERE 1=1'
-        params = []
+        clause, params = self._clause_criteres(criteres)
 
-        # ajout des critères à la requête
-        for cle, valeur in criteres.items():
-            if cle in ['marque', 'modele', 'categorie', 'type']:
-                query += f" AND {cle} = ?"
-                params.append(valeur)
-            elif cle == 'annee_min':
-                query += " AND annee >= ?"
-                params.append(valeur)
-            elif cle == 'annee_max':
-                query += " AND annee <= ?"
-                params.append(valeur)
-            elif cle == 'prix_max':
-                query += " AND prix_achat <= ?"
-                params.append(valeur)
+        # exécution de la requête et construction directe des objets
+        generation = self.cache.generation
+        cursor = self.conn.execute('SELECT * FROM vehicules WHERE 1=1' + clause, params)
+        return self._vehicules_depuis_rows(cursor.fetchall(), generation)
 
-        # exécution de la requête
-        self.cursor.execute(query, params)
+    def _clause_criteres(self, criteres):
+        """
+        traduit des critères de recherche (voir rechercher_vehicules) en conditions sql
+        sur la table vehicules
 
-        # chargement de chaque véhicule trouvé
-        vehicules = []
-        for row in self.cursor.fetchall():
-            vehicule = self.charger_vehicule(row['id'])
-            if vehicule:
-                vehicules.append(vehicule)
+        args:
+            criteres: dict de critères, texte de requête ou Requete (voir model/requete.py)
 
-        return vehicules
+        returns:
+            tuple: (conditions " AND ..." à ajouter après un WHERE, paramètres)
+
+        raises:
+            ValueError: si un critère ne porte sur aucune colonne de recherche
+        """
+        from model.requete import compiler_requete
+        return compiler_requete(criteres).clause_sql(self._COLONNES_RECHERCHE)
+
+    # condition "véhicule libre sur la période", paramètres (fin, début) encodés ; comme dans le
+    # modèle (Reservation.est_en_conflit_avec), seules les réservations confirmées bloquent un véhicule, et
+    # le prédicat reprend celui de l'index partiel idx_reservations_confirmees pour qu'il serve
+    _VEHICULE_LIBRE = ('NOT EXISTS (SELECT 1 FROM reservations WHERE reservations.vehicule_id = vehicules.id '
+                       'AND reservations.date_debut <= ? AND reservations.date_fin >= ? '
+                       "AND reservations.statut = 'confirmée')")
+
+    def charger_vehicules_disponibles(self, type_vehicule, criteres, date_debut, date_fin):
+        """
+        charge les véhicules d'un type correspondant aux critères et libres sur une période,
+        en une seule requête sur tout l'historique des réservations (rien n'est chargé en mémoire
+        hormis les véhicules renvoyés)
+
+        un véhicule est indisponible si une de ses réservations confirmées chevauche la
+        période (bornes incluses) ; la recherche de chevauchement utilise l'index partiel
+        idx_reservations_confirmees
+
+        args:
+            type_vehicule (str): 'Voiture', 'Utilitaire' ou 'Moto' (none pour tous les types)
+            criteres (dict): critères de recherche (voir rechercher_vehicules)
+            date_debut (datetime): date de début de la période
+            date_fin (datetime): date de fin de la période
+
+        returns:
+            list: liste des véhicules disponibles
+        """
+        clause, params = self._clause_criteres(criteres)
+        if type_vehicule:
+            clause += " AND type = ?"
+            params.append(type_vehicule)
+
+        query = 'SELECT * FROM vehicules WHERE ' + self._VEHICULE_LIBRE + clause
+        params = [encoder_date(date_fin), encoder_date(date_debut)] + params
+
+        generation = self.cache.generation
+        cursor = self.conn.execute(query, params)
+        return self._vehicules_depuis_rows(cursor.fetchall(), generation)
+
+    def vehicule_disponible(self, vehicule_id, date_debut, date_fin, reservation_id_a_exclure=None):
+        """
+        vérifie en base qu'aucune réservation confirmée du véhicule ne chevauche la période
+        (index partiel idx_reservations_confirmees)
+
+        args:
+            vehicule_id (int): id du véhicule
+            date_debut (datetime): date de début de la période
+            date_fin (datetime): date de fin de la période
+            reservation_id_a_exclure (int, optional): réservation ignorée (modification de ses dates)
+
+        returns:
+            bool: true si le véhicule est libre sur la période
+        """
+        query = ('SELECT 1 FROM reservations WHERE vehicule_id = ? AND date_debut <= ? AND date_fin >= ? '
+                 "AND statut = 'confirmée'")
+        params = [vehicule_id, encoder_date(date_fin), encoder_date(date_debut)]
+        if reservation_id_a_exclure is not None:
+            query += ' AND id != ?'
+            params.append(reservation_id_a_exclure)
+
+        cursor = self.conn.execute(query + ' LIMIT 1', params)
+        return cursor.fetchone() is None
+
+    # projections pour les écrans de liste : seules les colonnes affichées sont lues, renvoyées
+    # en tuples nommés (aucun objet métier construit, aucun json décodé, aucun historique chargé)
+
+    _COLONNES_PROJECTION_VEHICULE = ('id',) + _COLONNES_RECHERCHE
+    _COLONNES_PROJECTION_CLIENT = ('id', 'nom', 'prenom', 'adresse', 'telephone', 'email')
+
+    def _projeter(self, nom, colonnes, query, params):
+        """
+        exécute une requête de projection et construit ses lignes directement depuis les tuples sqlite
+
+        args:
+            nom (str): nom du type de ligne
+            colonnes (tuple): champs, dans l'ordre des colonnes du SELECT
+            query (str): requête sql
+            params (list): paramètres de la requête
+
+        returns:
+            list: tuples nommés
+        """
+        type_ligne = _type_projection(nom, colonnes)
+        cursor = self.conn.cursor()
+        cursor.row_factory = None
+        cursor.execute(query, params)
+        return list(map(type_ligne._make, cursor))
+
+    @staticmethod
+    def _verifier_colonnes(colonnes, autorisees):
+        """
+        refuse les colonnes inconnues (leurs noms sont insérés tels quels dans la requête)
+
+        raises:
+            ValueError: si une colonne n'est pas autorisée
+        """
+        inconnues = [colonne for colonne in colonnes if colonne not in autorisees]
+        if inconnues:
+            raise ValueError(f"colonnes de projection inconnues: {', '.join(inconnues)}")
+
+    def projeter_vehicules(self, colonnes, criteres=None, date_debut=None, date_fin=None,
+                           disponibles_seulement=False):
+        """
+        lit quelques colonnes des véhicules correspondant aux critères, sans construire les objets
+
+        la pseudo-colonne "disponible" (1 si libre sur la période, 0 sinon) est calculée en sql
+        avec la même condition que charger_vehicules_disponibles
+
+        args:
+            colonnes (iterable): id, colonnes de recherche (voir _COLONNES_RECHERCHE) ou "disponible"
+            criteres (dict, optional): critères de recherche (voir rechercher_vehicules)
+            date_debut (datetime, optional): début de la période ("disponible", disponibles_seulement)
+            date_fin (datetime, optional): fin de la période
+            disponibles_seulement (bool): ne garder que les véhicules libres sur la période
+
+        returns:
+            list: tuples nommés ProjectionVehicule par id croissant
+
+        raises:
+            ValueError: si une colonne est inconnue ou si la disponibilité est demandée sans période
+        """
+        colonnes = tuple(colonnes)
+        self._verifier_colonnes(colonnes, self._COLONNES_PROJECTION_VEHICULE + ('disponible',))
+
+        avec_periode = 'disponible' in colonnes or disponibles_seulement
+        if avec_periode and (date_debut is None or date_fin is None):
+            raise ValueError("la disponibilité d'un véhicule demande une période (date_debut, date_fin)")
+        periode = [encoder_date(date_fin), encoder_date(date_debut)] if avec_periode else []
+
+        select = ', '.join(self._VEHICULE_LIBRE if colonne == 'disponible' else colonne for colonne in colonnes)
+        params = list(periode) if 'disponible' in colonnes else []
+        query = f'SELECT {select} FROM vehicules WHERE 1=1'
+        if disponibles_seulement:
+            query += ' AND ' + self._VEHICULE_LIBRE
+            params.extend(periode)
+
+        clause, params_criteres = self._clause_criteres(criteres)
+        return self._projeter('ProjectionVehicule', colonnes, query + clause + ' ORDER BY id',
+                              params + params_criteres)
+
+    def projeter_clients(self, colonnes=('id', 'nom', 'prenom')):
+        """
+        lit quelques colonnes de tous les clients (ex: liste de sélection par nom),
+        sans objet client ni historique de réservations
+
+        args:
+            colonnes (iterable): colonnes de la table clients
+
+        returns:
+            list: tuples nommés ProjectionClient par id croissant
+
+        raises:
+            ValueError: si une colonne est inconnue
+        """
+        colonnes = tuple(colonnes)
+        self._verifier_colonnes(colonnes, self._COLONNES_PROJECTION_CLIENT)
+        return self._projeter('ProjectionClient', colonnes,
+                              f"SELECT {', '.join(colonnes)} FROM clients ORDER BY id", [])
 
     # méthodes pour les clients
 
+    _INSERT_CLIENT = """
+    INSERT INTO clients (nom, prenom, adresse, telephone, email)
+    VALUES (?, ?, ?, ?, ?)
+    """
+    _UPDATE_CLIENT = """
+    UPDATE clients
+    SET nom = ?, prenom = ?, adresse = ?, telephone = ?, email = ?
+    WHERE id = ?
+    """
+
+    @_ecriture
     def sauvegarder_client(self, client):
         """
         sauvegarde un client dans la base de données
@@ -491,54 +1364,61 @@ class Database:
         returns:
             int: id du client sauvegardé
         """
+        parametres = self._parametres_client(client)
+
         if client.id is None:
             # création d'un nouveau client
-            self.cursor.execute("""
-            INSERT INTO clients (nom, prenom, adresse, telephone, email)
-            VALUES (?, ?, ?, ?, ?)
-            """, (
-                client.nom,
-                client.prenom,
-                client.adresse,
-                client.telephone,
-                client.email
-            ))
+            cursor = self.conn.execute(self._INSERT_CLIENT, parametres)
 
             # récupération de l'id généré
-            client.id = self.cursor.lastrowid
+            client.id = cursor.lastrowid
         else:
             # mise à jour d'un client existant
-            self.cursor.execute("""
-            UPDATE clients
-            SET nom = ?, prenom = ?, adresse = ?, telephone = ?, email = ?
-            WHERE id = ?
-            """, (
-                client.nom,
-                client.prenom,
-                client.adresse,
-                client.telephone,
-                client.email,
-                client.id
-            ))
-
-        # validation des changements
-        self.conn.commit()
+            self.conn.execute(self._UPDATE_CLIENT, parametres + (client.id,))
+
+        self._invalider('clients', client.id)
+
+        # validation des changements (différée si une transaction est ouverte)
+        self._valider()
 
         return client.id
 
-    def lister_clients(self):
-        """Récupère tous les clients"""
-        try:
-            self.cursor.execute('SELECT id FROM clients')
-            rows = self.cursor.fetchall()
+    def _parametres_client(self, client):
+        """
+        prépare les colonnes d'un client dans l'ordre de _INSERT_CLIENT
+        """
+        return (
+            client.nom,
+            client.prenom,
+            client.adresse,
+            client.telephone,
+            client.email
+        )
+
+    def sauvegarder_clients_bulk(self, clients, taille_lot=1000):
+        """
+        sauvegarde un grand nombre de clients par lots (executemany) dans une seule transaction
+
+        args:
+            clients (iterable): clients à sauvegarder (liste ou générateur)
+            taille_lot (int): nombre de lignes envoyées par executemany
 
-            clients = []
-            for row in rows:
-                client = self.charger_client(row['id'])
-                if client:
-                    clients.append(client)
+        returns:
+            list: ids des clients sauvegardés (également affectés aux objets)
+        """
+        return self._sauvegarder_en_masse('clients', clients, self._INSERT_CLIENT,
+                                          self._UPDATE_CLIENT, self._parametres_client, taille_lot)
 
-            return clients
+    def lister_clients(self, avec_historique=True):
+        """
+        Récupère tous les clients
+
+        args:
+            avec_historique (bool): false pour ne pas charger les réservations
+                (ex: sélection d'un client par son nom)
+        """
+        try:
+            return self.charger_clients(avec_historique=avec_historique)
         except Exception as e:
             print(f"Erreur lister_clients: {e}")
             return []
@@ -553,18 +1433,42 @@ class Database:
         returns:
             client: objet client correspondant, ou none si non trouvé
         """
+        # objet déjà chargé par cette session
+        client = self.cache.obtenir('clients', client_id)
+        if client is not None:
+            return client
+
         # récupération des données depuis la base
-        self.cursor.execute('SELECT * FROM clients WHERE id = ?', (client_id,))
-        row = self.cursor.fetchone()
+        generation = self.cache.generation
+        cursor = self.conn.execute('SELECT * FROM clients WHERE id = ?', (client_id,))
+        row = cursor.fetchone()
 
         if row is None:
             return None
 
+        client = self._client_depuis_row(row)
+
+        # chargement des réservations du client
+        client.historique_reservations = self.charger_reservations_client(client_id)
+
+        return self.cache.enregistrer('clients', client_id, client, generation)
+
+    def _client_depuis_row(self, row):
+        """
+        construit l'objet client à partir d'une ligne de la table clients
+        (l'historique de réservations est laissé vide)
+
+        args:
+            row (sqlite3.Row): ligne complète de la table clients
+
+        returns:
+            client: objet client correspondant
+        """
         # import de la classe client
         from model.client import Client
 
         # création de l'objet client
-        client = Client(
+        return Client(
             id=row['id'],
             nom=row['nom'],
             prenom=row['prenom'],
@@ -573,30 +1477,148 @@ class Database:
             email=row['email']
         )
 
-        # chargement des réservations du client
-        client.historique_reservations = self.charger_reservations_client(client_id)
+    def charger_clients(self, client_ids=None, avec_historique=True):
+        """
+        charge plusieurs clients et leurs réservations en deux requêtes au total
+        (les réservations sont regroupées en mémoire par client)
+
+        args:
+            client_ids (iterable, optional): ids des clients à charger (tous si none)
+            avec_historique (bool): false pour laisser historique_reservations vide
+
+        returns:
+            list: liste des objets client
+        """
+        generation = self.cache.generation
+        if client_ids is None:
+            cursor = self.conn.execute('SELECT * FROM clients')
+            rows = cursor.fetchall()
+        else:
+            rows = self._selectionner_par_ids('SELECT * FROM clients WHERE id IN ({})', client_ids)
 
-        return client
+        return self._clients_depuis_rows(rows, avec_historique, generation, tous=client_ids is None)
 
-    def charger_tous_clients(self):
+    def _clients_depuis_rows(self, rows, avec_historique, generation, tous=False):
         """
-        charge tous les clients depuis la base de données
+        hydrate une liste de clients avec leur historique en passant par la carte d'identité :
+        un client déjà en cache est réutilisé (son historique est à jour, une écriture de
+        réservation l'aurait retiré du cache), les autres sont construits et mis en cache une
+        fois leur historique rempli. sans historique, les clients sont construits sans passer
+        par le cache (un client en cache porte toujours son historique).
+
+        args:
+            rows (list): lignes complètes de la table clients
+            avec_historique (bool): false pour laisser historique_reservations vide
+            generation (int): self.cache.generation lue avant la requête
+            tous (bool): true si les lignes sont celles de tous les clients
 
         returns:
             list: liste des objets client
         """
-        # récupération de tous les clients
-        self.cursor.execute('SELECT id FROM clients')
-        rows = self.cursor.fetchall()
+        if not avec_historique:
+            return [self._client_depuis_row(row) for row in rows]
 
         clients = []
+        construits = []
         for row in rows:
-            client = self.charger_client(row['id'])
-            if client:
-                clients.append(client)
+            client = self.cache.obtenir('clients', row['id'])
+            if client is None:
+                client = self._client_depuis_row(row)
+                construits.append(client)
+            clients.append(client)
+
+        if construits:
+            self._remplir_historiques(construits, tous=tous and len(construits) == len(clients),
+                                      generation=generation)
+            for client in construits:
+                self.cache.enregistrer('clients', client.id, client, generation)
 
         return clients
 
+    def _remplir_historiques(self, clients, tous=False, generation=None):
+        """
+        remplit historique_reservations pour une liste de clients en une passe
+
+        args:
+            clients (list): clients dont on veut l'historique
+            tous (bool): true si la liste contient tous les clients (pas de filtre IN)
+            generation (int, optional): self.cache.generation lue avant la requête des clients,
+                pour passer par la carte d'identité (none : objets neufs, cas des parcours iter_*)
+        """
+        if tous:
+            cursor = self.conn.execute(f'SELECT * FROM {self._reservations_rapport} ORDER BY client_id, id')
+            rows = cursor.fetchall()
+        else:
+            rows = self._selectionner_par_ids(
+                f'SELECT * FROM {self._reservations_rapport} WHERE client_id IN ({{}}) ORDER BY client_id, id',
+                [client.id for client in clients]
+            )
+
+        if generation is None:
+            hydrater = self._reservation_depuis_row
+        else:
+            hydrater = self._hydrater_par_cache('reservations', self._reservation_depuis_row, generation)
+
+        # regroupement des réservations par client
+        reservations_par_client = {}
+        for row in rows:
+            reservations_par_client.setdefault(row['client_id'], []).append(hydrater(row))
+
+        for client in clients:
+            client.historique_reservations = reservations_par_client.get(client.id, [])
+
+    def _selectionner_par_ids(self, requete, ids, taille_lot=500):
+        """
+        exécute une requête de la forme "... IN ({})" par lots d'ids
+        (sqlite limite le nombre de paramètres par requête)
+
+        args:
+            requete (str): requête sql avec un emplacement {} pour les paramètres
+            ids (iterable): ids à injecter
+            taille_lot (int): nombre maximal d'ids par requête
+
+        returns:
+            list: toutes les lignes obtenues
+        """
+        ids = list(ids)
+        rows = []
+        for i in range(0, len(ids), taille_lot):
+            lot = ids[i:i + taille_lot]
+            cursor = self.conn.execute(requete.format(', '.join('?' * len(lot))), lot)
+            rows.extend(cursor.fetchall())
+        return rows
+
+    def charger_tous_clients(self, avec_historique=True):
+        """
+        charge tous les clients depuis la base de données
+
+        args:
+            avec_historique (bool): false pour ne pas charger les réservations
+
+        returns:
+            list: liste des objets client
+        """
+        return self.charger_clients(avec_historique=avec_historique)
+
+    def iter_clients(self, avec_historique=True, taille_lot=500, apres_id=None, limite=None):
+        """
+        parcourt les clients sans les charger tous en mémoire (voir _iterer)
+        l'historique est chargé par paquet de clients, en une requête par paquet
+
+        args:
+            avec_historique (bool): false pour laisser historique_reservations vide
+            taille_lot (int): nombre de lignes lues à la fois
+            apres_id (int, optional): reprise après cet id (page suivante)
+            limite (int, optional): nombre maximal de clients (taille de page)
+
+        yields:
+            client: clients par id croissant
+        """
+        return self._iterer('SELECT * FROM clients WHERE 1=1', [], self._client_depuis_row,
+                            taille_lot, apres_id, limite,
+                            traiter_lot=self._remplir_historiques if avec_historique else None)
+
+    @_ecriture
     def supprimer_client(self, client_id):
         """
         supprime un client de la base de données
@@ -609,54 +1631,112 @@ class Database:
         """
         try:
             # vérifier si le client a des réservations
-            self.cursor.execute('SELECT COUNT(*) FROM reservations WHERE client_id = ?', (client_id,))
-            count = self.cursor.fetchone()[0]
+            cursor = self.conn.execute(f'SELECT COUNT(*) FROM {self._reservations_rapport} WHERE client_id = ?',
+                                       (client_id,))
+            count = cursor.fetchone()[0]
             if count > 0:
                 print(f"impossible de supprimer un client avec {count} réservations")
                 return False
 
             # suppression du client
-            self.cursor.execute('DELETE FROM clients WHERE id = ?', (client_id,))
-            self.conn.commit()
-            return self.cursor.rowcount > 0
+            cursor = self.conn.execute('DELETE FROM clients WHERE id = ?', (client_id,))
+            self._invalider('clients', client_id)
+            self._valider()
+            return cursor.rowcount > 0
         except sqlite3.Error as e:
             print(f"erreur lors de la suppression du client: {e}")
             return False
 
-    def rechercher_clients(self, criteres=None):
+    # colonnes de l'index plein texte clients_fts
+    _COLONNES_RECHERCHE_CLIENTS = ('nom', 'prenom', 'email', 'telephone')
+
+    def rechercher_clients(self, criteres=None, limite=None):
         """
         recherche des clients selon certains critères
 
+        avec l'index plein texte (FTS5), chaque mot saisi est cherché comme début de mot,
+        sans tenir compte des accents ni de la casse ("dup" trouve Dupont, "helene" trouve
+        Hélène) et les résultats sont classés par pertinence. sans FTS5, les critères sont
+        des filtres LIKE '%valeur%'.
+
         args:
-            criteres (dict, optional): critères de recherche
+            criteres (dict, optional): critères de recherche (nom, prenom, email, telephone,
+                ou "texte" pour chercher dans toutes ces colonnes)
+            limite (int, optional): nombre maximal de clients renvoyés
 
         returns:
             list: liste des clients correspondant aux critères
         """
-        # construction de la requête sql
-        query = 'SELECT id FROM clients WHERE 1=1'
-        params = []
-
-        if criteres:
-            for cle, valeur in criteres.items():
-                if cle in ['nom', 'prenom', 'email', 'telephone']:
-                    query += f" AND {cle} LIKE ?"
-                    params.append(f"%{valeur}%")
+        if self.recherche_plein_texte:
+            query, params = self._requete_clients_plein_texte(criteres or {})
+        else:
+            # construction de la requête sql
+            query = 'SELECT * FROM clients WHERE 1=1'
+            params = []
+
+            if criteres:
+                for cle, valeur in criteres.items():
+                    if cle in self._COLONNES_RECHERCHE_CLIENTS:
+                        query += f" AND {cle} LIKE ?"
+                        params.append(f"%{valeur}%")
+                    elif cle == 'texte':
+                        query += " AND (" + " OR ".join(f"{colonne} LIKE ?" for colonne in self._COLONNES_RECHERCHE_CLIENTS) + ")"
+                        params.extend([f"%{valeur}%"] * len(self._COLONNES_RECHERCHE_CLIENTS))
+
+        if limite is not None:
+            query += ' LIMIT ?'
+            params.append(limite)
 
         # exécution de la requête
-        self.cursor.execute(query, params)
+        generation = self.cache.generation
+        cursor = self.conn.execute(query, params)
+        rows = cursor.fetchall()
 
-        # chargement de chaque client trouvé
-        clients = []
-        for row in self.cursor.fetchall():
-            client = self.charger_client(row['id'])
-            if client:
-                clients.append(client)
+        # clients trouvés (carte d'identité), historiques chargés en une passe
+        return self._clients_depuis_rows(rows, True, generation)
 
-        return clients
+    def _requete_clients_plein_texte(self, criteres):
+        """
+        traduit les critères de rechercher_clients en requête MATCH sur clients_fts
+
+        chaque mot devient un préfixe entre guillemets ("dup"*), ce qui neutralise la syntaxe
+        fts5 éventuellement présente dans la saisie ; un critère de colonne devient un filtre
+        de colonne (nom : ("dup"*)). les mots sont découpés comme le fait le tokenizer
+        (ponctuation, @ et espaces séparent les mots).
+
+        returns:
+            tuple: (requête sql, paramètres)
+        """
+        expressions = []
+        for cle, valeur in criteres.items():
+            if cle != 'texte' and cle not in self._COLONNES_RECHERCHE_CLIENTS:
+                continue
+            mots = ' '.join(f'"{mot}"*' for mot in re.findall(r'\w+', str(valeur)))
+            if not mots:
+                continue
+            expressions.append(f'({mots})' if cle == 'texte' else f'{cle} : ({mots})')
+
+        if not expressions:
+            return 'SELECT * FROM clients ORDER BY id', []
+
+        # rank : score bm25 de fts5 (les meilleurs résultats en premier)
+        query = ('SELECT clients.* FROM clients_fts JOIN clients ON clients.id = clients_fts.rowid '
+                 'WHERE clients_fts MATCH ? ORDER BY rank')
+        return query, [' AND '.join(expressions)]
 
     # méthodes pour les réservations
 
+    _INSERT_RESERVATION = """
+    INSERT INTO reservations (client_id, vehicule_id, date_debut, date_fin, prix_total, statut)
+    VALUES (?, ?, ?, ?, ?, ?)
+    """
+    _UPDATE_RESERVATION = """
+    UPDATE reservations
+    SET client_id = ?, vehicule_id = ?, date_debut = ?, date_fin = ?, prix_total = ?, statut = ?
+    WHERE id = ?
+    """
+
+    @_ecriture
     def sauvegarder_reservation(self, reservation):
         """
         sauvegarde une réservation dans la base de données
@@ -667,47 +1747,83 @@ class Database:
         returns:
             int: id de la réservation sauvegardée
         """
-        # formatage des dates pour sqlite
-        date_debut_str = reservation.date_debut.strftime('%Y-%m-%d %H:%M:%S')
-        date_fin_str = reservation.date_fin.strftime('%Y-%m-%d %H:%M:%S')
+        parametres = self._parametres_reservation(reservation)
 
+        anciens_clients = ()
         if reservation.id is None:
             # création d'une nouvelle réservation
-            self.cursor.execute("""
-            INSERT INTO reservations (client_id, vehicule_id, date_debut, date_fin, prix_total, statut)
-            VALUES (?, ?, ?, ?, ?, ?)
-            """, (
-                reservation.client_id,
-                reservation.vehicule_id,
-                date_debut_str,
-                date_fin_str,
-                reservation.prix_total,
-                reservation.statut
-            ))
+            cursor = self.conn.execute(self._INSERT_RESERVATION, parametres)
 
             # récupération de l'id généré
-            reservation.id = self.cursor.lastrowid
+            reservation.id = cursor.lastrowid
         else:
-            # mise à jour d'une réservation existante
-            self.cursor.execute("""
-            UPDATE reservations
-            SET client_id = ?, vehicule_id = ?, date_debut = ?, date_fin = ?, prix_total = ?, statut = ?
-            WHERE id = ?
-            """, (
-                reservation.client_id,
-                reservation.vehicule_id,
-                date_debut_str,
-                date_fin_str,
-                reservation.prix_total,
-                reservation.statut,
-                reservation.id
-            ))
-
-        # validation des changements
-        self.conn.commit()
+            # mise à jour d'une réservation existante (le client d'avant perd peut-être la réservation)
+            row = self.conn.execute('SELECT client_id FROM reservations WHERE id = ?', (reservation.id,)).fetchone()
+            if row is not None and row['client_id'] != reservation.client_id:
+                anciens_clients = (row['client_id'],)
+            self.conn.execute(self._UPDATE_RESERVATION, parametres + (reservation.id,))
+
+        # seul l'historique du client de la réservation est à relire
+        self._invalider('reservations', reservation.id, reservation, anciens_clients)
+
+        # validation des changements (différée si une transaction est ouverte)
+        self._valider()
 
         return reservation.id
 
+    def _parametres_reservation(self, reservation):
+        """
+        prépare les colonnes d'une réservation dans l'ordre de _INSERT_RESERVATION
+        """
+        # dates stockées en secondes entières
+        return (
+            reservation.client_id,
+            reservation.vehicule_id,
+            encoder_date(reservation.date_debut),
+            encoder_date(reservation.date_fin),
+            reservation.prix_total,
+            reservation.statut
+        )
+
+    def sauvegarder_reservations_bulk(self, reservations, taille_lot=1000):
+        """
+        sauvegarde un grand nombre de réservations par lots (executemany) dans une seule transaction
+        (ex: import du flux partenaire de la nuit)
+
+        args:
+            reservations (iterable): réservations à sauvegarder (liste ou générateur)
+            taille_lot (int): nombre de lignes envoyées par executemany
+
+        returns:
+            list: ids des réservations sauvegardées (également affectés aux objets)
+        """
+        return self._sauvegarder_en_masse('reservations', reservations, self._INSERT_RESERVATION,
+                                          self._UPDATE_RESERVATION, self._parametres_reservation, taille_lot)
+
+    @_ecriture
+    def reserver_atomiquement(self, reservation):
+        """
+        enregistre une réservation seulement si son véhicule est libre sur la période,
+        la vérification et l'écriture se faisant dans la même transaction BEGIN IMMEDIATE :
+        le verrou d'écriture est pris avant la vérification, donc un autre processus (ou thread)
+        qui réserve le même fichier attend la fin de cette transaction et voit la réservation.
+        plusieurs processus de réservation peuvent ainsi travailler sur la même base sans
+        double réservation.
+
+        args:
+            reservation: objet de type reservation (id none pour une création)
+
+        returns:
+            bool: true si la réservation est enregistrée (id affecté),
+                false si elle chevauche une réservation confirmée (rien n'est écrit)
+        """
+        with self.transaction():
+            if not self.vehicule_disponible(reservation.vehicule_id, reservation.date_debut,
+                                            reservation.date_fin, reservation.id):
+                return False
+            self.sauvegarder_reservation(reservation)
+        return True
+
     def charger_reservation(self, reservation_id):
         """
         charge une réservation depuis la base de données
@@ -718,33 +1834,46 @@ class Database:
         returns:
             reservation: objet réservation correspondant, ou none si non trouvé
         """
+        # objet déjà chargé par cette session
+        reservation = self.cache.obtenir('reservations', reservation_id)
+        if reservation is not None:
+            return reservation
+
         # récupération des données depuis la base
-        self.cursor.execute('SELECT * FROM reservations WHERE id = ?', (reservation_id,))
-        row = self.cursor.fetchone()
+        generation = self.cache.generation
+        cursor = self.conn.execute(f'SELECT * FROM {self._reservations_rapport} WHERE id = ?', (reservation_id,))
+        row = cursor.fetchone()
 
         if row is None:
             return None
 
+        return self.cache.enregistrer('reservations', reservation_id, self._reservation_depuis_row(row),
+                                      generation)
+
+    def _reservation_depuis_row(self, row):
+        """
+        construit l'objet réservation à partir d'une ligne de la table reservations
+
+        args:
+            row (sqlite3.Row): ligne complète de la table reservations
+
+        returns:
+            reservation: objet réservation correspondant
+        """
         # import de la classe reservation
         from model.reservation import Reservation
 
-        # conversion des dates de string à datetime
-        date_debut = datetime.strptime(row['date_debut'], '%Y-%m-%d %H:%M:%S')
-        date_fin = datetime.strptime(row['date_fin'], '%Y-%m-%d %H:%M:%S')
-
-        # création de l'objet réservation
-        reservation = Reservation(
+        # création de l'objet réservation (dates entières -> datetime)
+        return Reservation(
             id=row['id'],
             client_id=row['client_id'],
             vehicule_id=row['vehicule_id'],
-            date_debut=date_debut,
-            date_fin=date_fin,
+            date_debut=decoder_date(row['date_debut']),
+            date_fin=decoder_date(row['date_fin']),
             prix_total=row['prix_total'],
             statut=row['statut']
         )
 
-        return reservation
-
     def charger_reservations_client(self, client_id):
         """
         charge toutes les réservations d'un client
@@ -755,18 +1884,12 @@ class Database:
         returns:
             list: liste des réservations du client
         """
-        # récupération des ids de réservation
-        self.cursor.execute('SELECT id FROM reservations WHERE client_id = ?', (client_id,))
-        rows = self.cursor.fetchall()
+        # récupération des réservations complètes en une requête
+        generation = self.cache.generation
+        cursor = self.conn.execute(f'SELECT * FROM {self._reservations_rapport} WHERE client_id = ?', (client_id,))
+        rows = cursor.fetchall()
 
-        # chargement de chaque réservation
-        reservations = []
-        for row in rows:
-            reservation = self.charger_reservation(row['id'])
-            if reservation:
-                reservations.append(reservation)
-
-        return reservations
+        return list(map(self._hydrater_par_cache('reservations', self._reservation_depuis_row, generation), rows))
 
     def charger_reservations_vehicule(self, vehicule_id, date_debut=None, date_fin=None):
         """
@@ -780,31 +1903,96 @@ class Database:
         returns:
             list: liste des réservations du véhicule
         """
+        query, params = self._requete_reservations_vehicule(vehicule_id, date_debut, date_fin)
+
+        # exécution de la requête
+        generation = self.cache.generation
+        cursor = self.conn.execute(query, params)
+        rows = cursor.fetchall()
+
+        return list(map(self._hydrater_par_cache('reservations', self._reservation_depuis_row, generation), rows))
+
+    def _requete_reservations_vehicule(self, vehicule_id, date_debut=None, date_fin=None):
+        """
+        construit la requête des réservations d'un véhicule sur une période
+
+        returns:
+            tuple: (requête sql, paramètres)
+        """
         # construction de la requête sql
-        query = 'SELECT id FROM reservations WHERE vehicule_id = ?'
+        query = 'SELECT * FROM reservations WHERE vehicule_id = ?'
         params = [vehicule_id]
 
+        # comparaisons entières sur les dates encodées
         if date_debut:
             query += ' AND date_fin >= ?'
-            params.append(date_debut.strftime('%Y-%m-%d %H:%M:%S'))
+            params.append(encoder_date(date_debut))
 
         if date_fin:
             query += ' AND date_debut <= ?'
-            params.append(date_fin.strftime('%Y-%m-%d %H:%M:%S'))
+            params.append(encoder_date(date_fin))
 
-        # exécution de la requête
-        self.cursor.execute(query, params)
-        rows = self.cursor.fetchall()
+        return query, params
 
-        # chargement de chaque réservation
-        reservations = []
-        for row in rows:
-            reservation = self.charger_reservation(row['id'])
-            if reservation:
-                reservations.append(reservation)
+    def iter_reservations_vehicule(self, vehicule_id, date_debut=None, date_fin=None,
+                                   taille_lot=500, apres_id=None, limite=None):
+        """
+        parcourt les réservations d'un véhicule sans les charger toutes en mémoire
+        (mêmes filtres que charger_reservations_vehicule, voir _iterer)
+
+        yields:
+            reservation: réservations par id croissant
+        """
+        query, params = self._requete_reservations_vehicule(vehicule_id, date_debut, date_fin)
+        return self._iterer(query, params, self._reservation_depuis_row, taille_lot, apres_id, limite)
+
+    def charger_reservations(self, reservation_ids):
+        """
+        charge plusieurs réservations par leurs ids, archivées comprises
+
+        args:
+            reservation_ids (iterable): ids des réservations
+
+        returns:
+            list: réservations trouvées (les ids absents de la base sont ignorés)
+        """
+        generation = self.cache.generation
+        rows = self._selectionner_par_ids(f'SELECT * FROM {self._reservations_rapport} WHERE id IN ({{}})',
+                                          reservation_ids)
+        return list(map(self._hydrater_par_cache('reservations', self._reservation_depuis_row, generation), rows))
+
+    def charger_reservations_confirmees(self):
+        """
+        charge les réservations confirmées, seules à bloquer un véhicule (index partiel
+        idx_reservations_confirmees) : celles que le parc indexe pour répondre aux vérifications
+        de disponibilité
+
+        returns:
+            list: réservations confirmées par id croissant
+        """
+        generation = self.cache.generation
+        cursor = self.conn.execute("SELECT * FROM reservations WHERE statut = 'confirmée' ORDER BY id")
+        rows = cursor.fetchall()
+
+        return list(map(self._hydrater_par_cache('reservations', self._reservation_depuis_row, generation), rows))
 
-        return reservations
+    def iter_reservations(self, taille_lot=500, apres_id=None, limite=None):
+        """
+        parcourt toutes les réservations sans les charger en mémoire, archivées comprises
+        (ex: export comptable de tout l'historique)
+
+        args:
+            taille_lot (int): nombre de lignes lues à la fois
+            apres_id (int, optional): reprise après cet id (page suivante)
+            limite (int, optional): nombre maximal de réservations (taille de page)
+
+        yields:
+            reservation: réservations par id croissant
+        """
+        return self._iterer(f'SELECT * FROM {self._reservations_rapport} WHERE 1=1', [],
+                            self._reservation_depuis_row, taille_lot, apres_id, limite)
 
+    @_ecriture
     def supprimer_reservation(self, reservation_id):
         """
         supprime une réservation de la base de données
@@ -817,22 +2005,95 @@ class Database:
         """
         try:
             # vérifier si la réservation a une facture
-            self.cursor.execute('SELECT COUNT(*) FROM factures WHERE reservation_id = ?', (reservation_id,))
-            count = self.cursor.fetchone()[0]
+            cursor = self.conn.execute('SELECT COUNT(*) FROM factures WHERE reservation_id = ?', (reservation_id,))
+            count = cursor.fetchone()[0]
             if count > 0:
                 print(f"impossible de supprimer une réservation avec {count} factures")
                 return False
 
-            # suppression de la réservation
-            self.cursor.execute('DELETE FROM reservations WHERE id = ?', (reservation_id,))
-            self.conn.commit()
-            return self.cursor.rowcount > 0
+            # suppression de la réservation (seul l'historique de son client est à relire)
+            clients = [row['client_id'] for row in self.conn.execute(
+                'SELECT client_id FROM reservations WHERE id = ?', (reservation_id,))]
+            cursor = self.conn.execute('DELETE FROM reservations WHERE id = ?', (reservation_id,))
+            self._invalider('reservations', reservation_id, anciens_dependants=clients)
+            self._valider()
+            return cursor.rowcount > 0
         except sqlite3.Error as e:
             print(f"erreur lors de la suppression de la réservation: {e}")
             return False
 
+    def archiver_reservations(self, horizon_jours=365, taille_lot=1000, maintenant=None):
+        """
+        déplace vers le fichier d'archive les réservations terminées ou annulées dont la fin
+        date de plus de horizon_jours. la table courante reste petite : les vérifications
+        de disponibilité et la prise de réservation ne parcourent plus des années d'historique,
+        les consultations (historique client, exports) lisent les deux fichiers.
+
+        le déplacement se fait par lots, chacun dans sa propre transaction (copie puis
+        suppression), pour ne bloquer les autres écrivains que le temps d'un lot. en mode
+        pool (WAL), une transaction n'est pas atomique entre les deux fichiers : après un arrêt
+        brutal, une réservation peut se trouver dans les deux, et l'archivage suivant la retire
+        de la table courante sans la recopier. une ligne archivée n'est jamais remplacée : un
+        id déjà archivé avec un contenu différent lève une erreur (les ids ne sont pas réattribués,
+        voir les migrations 10 et 11 et _aligner_sequence_archive).
+
+        args:
+            horizon_jours (int): âge minimal (depuis la date de fin) des réservations archivées
+            taille_lot (int): nombre de réservations déplacées par transaction
+            maintenant (datetime, optional): date de référence (maintenant par défaut)
+
+        returns:
+            int: nombre de réservations archivées
+
+        raises:
+            sqlite3.IntegrityError: si un id à archiver désigne déjà une autre réservation archivée
+                (le lot est annulé, rien n'est perdu)
+        """
+        if not self.chemin_archive:
+            print("archivage impossible: aucun fichier d'archive configuré (chemin_archive)")
+            return 0
+
+        limite = encoder_date((maintenant or datetime.now()) - timedelta(days=horizon_jours))
+        nb_archivees = 0
+
+        while True:
+            with self.transaction():
+                # servi par l'index partiel idx_reservations_cloturees
+                cursor = self.conn.execute(
+                    "SELECT id FROM main.reservations WHERE statut IN ('terminée', 'annulée') "
+                    "AND date_fin < ? LIMIT ?", (limite, taille_lot))
+                ids = [row['id'] for row in cursor.fetchall()]
+                if not ids:
+                    break
+
+                marqueurs = ', '.join('?' * len(ids))
+                # EXCEPT : les lignes déjà copiées à l'identique (reprise après arrêt) sont sautées
+                self.conn.execute(f'INSERT INTO archive.reservations '
+                                  f'SELECT * FROM main.reservations WHERE id IN ({marqueurs}) '
+                                  f'EXCEPT SELECT * FROM archive.reservations WHERE id IN ({marqueurs})',
+                                  ids + ids)
+                # marquage : le trigger de suppression conserve leur chiffre d'affaires dans les agrégats
+                self.conn.executemany('INSERT INTO archivage_en_cours (id) VALUES (?)', [(i,) for i in ids])
+                self.conn.execute(f'DELETE FROM main.reservations WHERE id IN ({marqueurs})', ids)
+                self.conn.execute('DELETE FROM archivage_en_cours')
+
+            nb_archivees += len(ids)
+
+        return nb_archivees
+
     # méthodes pour les factures
 
+    _INSERT_FACTURE = """
+    INSERT INTO factures (reservation_id, date_emission, montant_ht, taux_tva, montant_ttc)
+    VALUES (?, ?, ?, ?, ?)
+    """
+    _UPDATE_FACTURE = """
+    UPDATE factures
+    SET reservation_id = ?, date_emission = ?, montant_ht = ?, taux_tva = ?, montant_ttc = ?
+    WHERE id = ?
+    """
+
+    @_ecriture
     def sauvegarder_facture(self, facture):
         """
         sauvegarde une facture dans la base de données
@@ -843,44 +2104,50 @@ class Database:
         returns:
             int: id de la facture sauvegardée
         """
-        # formatage de la date pour sqlite
-        date_emission_str = facture.date_emission.strftime('%Y-%m-%d %H:%M:%S')
+        parametres = self._parametres_facture(facture)
 
         if facture.id is None:
             # création d'une nouvelle facture
-            self.cursor.execute("""
-            INSERT INTO factures (reservation_id, date_emission, montant_ht, taux_tva, montant_ttc)
-            VALUES (?, ?, ?, ?, ?)
-            """, (
-                facture.reservation_id,
-                date_emission_str,
-                facture.montant_ht,
-                facture.taux_tva,
-                facture.montant_ttc
-            ))
+            cursor = self.conn.execute(self._INSERT_FACTURE, parametres)
 
             # récupération de l'id généré
-            facture.id = self.cursor.lastrowid
+            facture.id = cursor.lastrowid
         else:
             # mise à jour d'une facture existante
-            self.cursor.execute("""
-            UPDATE factures
-            SET reservation_id = ?, date_emission = ?, montant_ht = ?, taux_tva = ?, montant_ttc = ?
-            WHERE id = ?
-            """, (
-                facture.reservation_id,
-                date_emission_str,
-                facture.montant_ht,
-                facture.taux_tva,
-                facture.montant_ttc,
-                facture.id
-            ))
-
-        # validation des changements
-        self.conn.commit()
+            self.conn.execute(self._UPDATE_FACTURE, parametres + (facture.id,))
+
+        # validation des changements (différée si une transaction est ouverte)
+        self._valider()
 
         return facture.id
 
+    def _parametres_facture(self, facture):
+        """
+        prépare les colonnes d'une facture dans l'ordre de _INSERT_FACTURE
+        """
+        # date stockée en secondes entières
+        return (
+            facture.reservation_id,
+            encoder_date(facture.date_emission),
+            facture.montant_ht,
+            facture.taux_tva,
+            facture.montant_ttc
+        )
+
+    def sauvegarder_factures_bulk(self, factures, taille_lot=1000):
+        """
+        sauvegarde un grand nombre de factures par lots (executemany) dans une seule transaction
+
+        args:
+            factures (iterable): factures à sauvegarder (liste ou générateur)
+            taille_lot (int): nombre de lignes envoyées par executemany
+
+        returns:
+            list: ids des factures sauvegardées (également affectés aux objets)
+        """
+        return self._sauvegarder_en_masse('factures', factures, self._INSERT_FACTURE,
+                                          self._UPDATE_FACTURE, self._parametres_facture, taille_lot)
+
     def charger_facture(self, facture_id):
         """
         charge une facture depuis la base de données
@@ -892,28 +2159,39 @@ class Database:
             facture: objet facture correspondant, ou none si non trouvé
         """
         # récupération des données depuis la base
-        self.cursor.execute('SELECT * FROM factures WHERE id = ?', (facture_id,))
-        row = self.cursor.fetchone()
+        cursor = self.conn.execute('SELECT * FROM factures WHERE id = ?', (facture_id,))
+        row = cursor.fetchone()
 
         if row is None:
             return None
 
+        return self._facture_depuis_row(row)
+
+    def _facture_depuis_row(self, row):
+        """
+        construit l'objet facture à partir d'une ligne de la table factures
+
+        args:
+            row (sqlite3.Row): ligne complète de la table factures
+
+        returns:
+            facture: objet facture correspondant
+        """
         # import de la classe facture
         from model.facture import Facture
 
-        # conversion de la date de string à datetime
-        date_emission = datetime.strptime(row['date_emission'], '%Y-%m-%d %H:%M:%S')
-
-        # création de l'objet facture
+        # création de l'objet facture (le ttc est recalculé par le constructeur)
         facture = Facture(
             id=row['id'],
             reservation_id=row['reservation_id'],
-            date_emission=date_emission,
+            date_emission=decoder_date(row['date_emission']),
             montant_ht=row['montant_ht'],
-            taux_tva=row['taux_tva'],
-            montant_ttc=row['montant_ttc']
+            taux_tva=row['taux_tva']
         )
 
+        # on garde le montant ttc tel qu'il a été enregistré
+        facture.montant_ttc = row['montant_ttc']
+
         return facture
 
     def charger_facture_par_reservation(self, reservation_id):
@@ -926,14 +2204,14 @@ class Database:
         returns:
             facture: objet facture correspondant, ou none si non trouvé
         """
-        # récupération de l'id de facture
-        self.cursor.execute('SELECT id FROM factures WHERE reservation_id = ?', (reservation_id,))
-        row = self.cursor.fetchone()
+        # récupération de la facture complète
+        cursor = self.conn.execute('SELECT * FROM factures WHERE reservation_id = ?', (reservation_id,))
+        row = cursor.fetchone()
 
         if row is None:
             return None
 
-        return self.charger_facture(row['id'])
+        return self._facture_depuis_row(row)
 
     def charger_toutes_factures(self):
         """
@@ -942,18 +2220,28 @@ class Database:
         returns:
             list: liste des objets facture
         """
-        # récupération de toutes les factures
-        self.cursor.execute('SELECT id FROM factures')
-        rows = self.cursor.fetchall()
+        # récupération de toutes les factures en une requête
+        cursor = self.conn.execute('SELECT * FROM factures')
+        rows = cursor.fetchall()
 
-        factures = []
-        for row in rows:
-            facture = self.charger_facture(row['id'])
-            if facture:
-                factures.append(facture)
+        return [self._facture_depuis_row(row) for row in rows]
+
+    def iter_factures(self, taille_lot=500, apres_id=None, limite=None):
+        """
+        parcourt les factures sans les charger toutes en mémoire (voir _iterer)
+
+        args:
+            taille_lot (int): nombre de lignes lues à la fois
+            apres_id (int, optional): reprise après cet id (page suivante)
+            limite (int, optional): nombre maximal de factures (taille de page)
 
-        return factures
+        yields:
+            facture: factures par id croissant
+        """
+        return self._iterer('SELECT * FROM factures WHERE 1=1', [], self._facture_depuis_row,
+                            taille_lot, apres_id, limite)
 
+    @_ecriture
     def supprimer_facture(self, facture_id):
         """
         supprime une facture de la base de données
@@ -965,13 +2253,165 @@ class Database:
             bool: true si suppression réussie, false sinon
         """
         try:
-            self.cursor.execute('DELETE FROM factures WHERE id = ?', (facture_id,))
-            self.conn.commit()
-            return self.cursor.rowcount > 0
+            cursor = self.conn.execute('DELETE FROM factures WHERE id = ?', (facture_id,))
+            self._valider()
+            return cursor.rowcount > 0
         except sqlite3.Error as e:
             print(f"erreur lors de la suppression de la facture: {e}")
             return False
 
+    # agrégats (tables stats_*, tenues à jour par les triggers de la migration 8)
+
+    def charger_revenus_par_type_mois(self, mois_debut=None, mois_fin=None):
+        """
+        chiffre d'affaires par type de véhicule et par mois de début de location
+
+        args:
+            mois_debut (str, optional): premier mois inclus ('AAAA-MM')
+            mois_fin (str, optional): dernier mois inclus ('AAAA-MM')
+
+        returns:
+            list: dicts {"type", "mois", "revenus", "nb_reservations"} triés par mois puis type
+        """
+        query = 'SELECT type, mois, revenus, nb_reservations FROM stats_revenus_type_mois WHERE 1=1'
+        params = []
+        if mois_debut:
+            query += ' AND mois >= ?'
+            params.append(mois_debut)
+        if mois_fin:
+            query += ' AND mois <= ?'
+            params.append(mois_fin)
+
+        cursor = self.conn.execute(query + ' ORDER BY mois, type', params)
+        return [dict(row) for row in cursor.fetchall()]
+
+    def charger_revenus_vehicule(self, vehicule_id, date_debut=None, date_fin=None):
+        """
+        chiffre d'affaires d'un véhicule jour par jour (jour de début de location)
+
+        args:
+            vehicule_id (int): id du véhicule
+            date_debut (datetime, optional): premier jour inclus
+            date_fin (datetime, optional): dernier jour inclus
+
+        returns:
+            list: tuples (datetime du jour, revenus, nb_reservations) par jour croissant
+        """
+        query = 'SELECT jour, revenus, nb_reservations FROM stats_revenus_vehicule_jour WHERE vehicule_id = ?'
+        params = [vehicule_id]
+        if date_debut:
+            query += ' AND jour >= ?'
+            params.append(encoder_date(date_debut) // 86400)
+        if date_fin:
+            query += ' AND jour <= ?'
+            params.append(encoder_date(date_fin) // 86400)
+
+        cursor = self.conn.execute(query + ' ORDER BY jour', params)
+        return [(decoder_date(row['jour'] * 86400), row['revenus'], row['nb_reservations'])
+                for row in cursor.fetchall()]
+
+    def charger_statistiques_parc(self):
+        """
+        agrégats du parc par type de véhicule
+
+        returns:
+            dict: type -> {"nb_vehicules", "somme_annees", "valeur_totale", "cout_entretien_total"}
+        """
+        cursor = self.conn.execute('SELECT * FROM stats_parc_type')
+        return {row['type']: {cle: row[cle] for cle in row.keys() if cle != 'type'}
+                for row in cursor.fetchall()}
+
+    def calculer_bilan(self):
+        """
+        bilan comptable du parc à partir des agrégats (quelques lignes lues, quel que soit
+        le nombre de réservations) : chiffre d'affaires des réservations confirmées ou terminées,
+        coût d'entretien annuel de tous les véhicules et rentabilité
+
+        returns:
+            dict: {"revenus", "cout_entretien", "rentabilite"}
+        """
+        revenus = self.conn.execute('SELECT TOTAL(revenus) FROM stats_revenus_type_mois').fetchone()[0]
+        cout_entretien = self.conn.execute('SELECT TOTAL(cout_entretien_total) FROM stats_parc_type').fetchone()[0]
+        return {
+            "revenus": revenus,
+            "cout_entretien": cout_entretien,
+            "rentabilite": revenus - cout_entretien,
+        }
+
+    # journal des modifications (table journal_modifications, tenue à jour par les triggers
+    # de la migration 9) : synchronisation incrémentale des objets gardés en mémoire
+
+    def dernier_seq_journal(self):
+        """
+        numéro de la dernière modification journalisée
+
+        returns:
+            int: seq le plus récent (0 si aucune écriture n'a eu lieu)
+        """
+        cursor = self.conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'journal_modifications'")
+        row = cursor.fetchone()
+        return row[0] if row else 0
+
+    def lire_journal(self, depuis_seq=0, tables=None):
+        """
+        modifications postérieures à depuis_seq, y compris celles des autres processus et
+        connexions ; les objets concernés sont retirés du cache (ils ont pu changer ailleurs)
+
+        args:
+            depuis_seq (int): dernier seq déjà appliqué
+            tables (iterable, optional): tables à lire (toutes les tables journalisées sinon)
+
+        returns:
+            list: tuples (seq, nom_table, objet_id, operation) par seq croissant,
+                operation valant 'insertion', 'modification' ou 'suppression'
+        """
+        query = 'SELECT seq, nom_table, objet_id, operation FROM journal_modifications WHERE seq > ?'
+        params = [depuis_seq]
+        if tables is not None:
+            tables = list(tables)
+            query += f" AND nom_table IN ({', '.join('?' * len(tables))})"
+            params.extend(tables)
+
+        cursor = self.conn.execute(query + ' ORDER BY seq', params)
+        modifications = [tuple(row) for row in cursor.fetchall()]
+        for _, nom_table, objet_id, _ in modifications:
+            self._invalider(nom_table, objet_id)
+        return modifications
+
+    @_ecriture
+    def purger_journal(self, jusqu_a_seq):
+        """
+        supprime les modifications déjà appliquées par tous les lecteurs
+
+        args:
+            jusqu_a_seq (int): dernier seq supprimé (inclus)
+
+        returns:
+            int: nombre de lignes supprimées
+        """
+        cursor = self.conn.execute('DELETE FROM journal_modifications WHERE seq <= ?', (jusqu_a_seq,))
+        self._valider()
+        return cursor.rowcount
+
+    def exporter_colonnes(self, dossier=None, taille_lot=100000):
+        """
+        exporte réservations (archivées comprises) et véhicules en tableaux structurés numpy :
+        ids, dates en secondes, codes de type et de statut, prix (voir utils/colonnes.py)
+
+        args:
+            dossier (str, optional): dossier où écrire reservations.npy et vehicules.npy,
+                rechargeables sans copie avec utils.colonnes.charger_colonnes
+            taille_lot (int): nombre de lignes lues à la fois
+
+        returns:
+            dict: "reservations" et "vehicules" -> tableau structuré numpy
+
+        raises:
+            ImportError: si numpy n'est pas installé
+        """
+        from utils.colonnes import exporter_colonnes
+        return exporter_colonnes(self, dossier, taille_lot)
+
     # méthodes utilitaires
 
     def generer_donnees_test(self, nb_voitures=5, nb_utilitaires=3, nb_motos=2, nb_clients=4):
@@ -988,7 +2428,6 @@ class Database:
         from model.vehicule import Voiture, Utilitaire, Moto
         from model.client import Client
         from model.reservation import Reservation
-        from datetime import timedelta
 
         # listes de valeurs pour la génération aléatoire
         marques_voiture = ["Renault", "Peugeot", "Citroën", "Toyota", "Volkswagen", "Ford"]
@@ -1031,174 +2470,176 @@ class Database:
 
         print("génération des données de test en cours...")
 
-        # génération des véhicules
-        vehicules_ids = []
-
-        # création des voitures
-        for i in range(nb_voitures):
-            marque = random.choice(marques_voiture)
-            modele = random.choice(modeles_voiture[marque])
-            annee = random.randint(2015, 2023)
-            kilometrage = random.randint(0, 100000)
-            prix_achat = random.randint(10000, 35000)
-            cout_entretien = random.randint(500, 2000)
-
-            # attributs spécifiques pour les voitures
-            nb_places = random.randint(2, 7)
-            puissance = random.randint(70, 250)
-            carburant = random.choice(carburants)
-            nb_options = random.randint(0, 4)
-            options_voiture = random.sample(options, nb_options)
-
-            voiture = Voiture(
-                id=None,
-                marque=marque,
-                modele=modele,
-                annee=annee,
-                kilometrage=kilometrage,
-                prix_achat=prix_achat,
-                cout_entretien_annuel=cout_entretien,
-                nb_places=nb_places,
-                puissance=puissance,
-                carburant=carburant,
-                options=options_voiture
-            )
+        # une seule transaction pour toute la génération (un seul commit)
+        with self.transaction():
+            # génération des véhicules
+            vehicules_ids = []
+
+            # création des voitures
+            for i in range(nb_voitures):
+                marque = random.choice(marques_voiture)
+                modele = random.choice(modeles_voiture[marque])
+                annee = random.randint(2015, 2023)
+                kilometrage = random.randint(0, 100000)
+                prix_achat = random.randint(10000, 35000)
+                cout_entretien = random.randint(500, 2000)
+
+                # attributs spécifiques pour les voitures
+                nb_places = random.randint(2, 7)
+                puissance = random.randint(70, 250)
+                carburant = random.choice(carburants)
+                nb_options = random.randint(0, 4)
+                options_voiture = random.sample(options, nb_options)
+
+                voiture = Voiture(
+                    id=None,
+                    marque=marque,
+                    modele=modele,
+                    annee=annee,
+                    kilometrage=kilometrage,
+                    prix_achat=prix_achat,
+                    cout_entretien_annuel=cout_entretien,
+                    nb_places=nb_places,
+                    puissance=puissance,
+                    carburant=carburant,
+                    options=options_voiture
+                )
 
-            voiture_id = self.sauvegarder_vehicule(voiture)
-            vehicules_ids.append(voiture_id)
-
-        # création des utilitaires
-        for i in range(nb_utilitaires):
-            marque = random.choice(marques_utilitaire)
-            modele = random.choice(modeles_utilitaire[marque])
-            annee = random.randint(2015, 2023)
-            kilometrage = random.randint(0, 150000)
-            prix_achat = random.randint(15000, 40000)
-            cout_entretien = random.randint(800, 2500)
-
-            # attributs spécifiques pour les utilitaires
-            volume = round(random.uniform(3.0, 20.0), 1)
-            charge_utile = random.randint(500, 2000)
-            hayon = random.choice([True, False])
-
-            utilitaire = Utilitaire(
-                id=None,
-                marque=marque,
-                modele=modele,
-                annee=annee,
-                kilometrage=kilometrage,
-                prix_achat=prix_achat,
-                cout_entretien_annuel=cout_entretien,
-                volume=volume,
-                charge_utile=charge_utile,
-                hayon=hayon
-            )
+                voiture_id = self.sauvegarder_vehicule(voiture)
+                vehicules_ids.append(voiture_id)
 
-            utilitaire_id = self.sauvegarder_vehicule(utilitaire)
-            vehicules_ids.append(utilitaire_id)
-
-        # création des motos
-        for i in range(nb_motos):
-            marque = random.choice(marques_moto)
-            modele = random.choice(modeles_moto[marque])
-            annee = random.randint(2015, 2023)
-            kilometrage = random.randint(0, 50000)
-            prix_achat = random.randint(5000, 25000)
-            cout_entretien = random.randint(300, 1500)
-
-            # attributs spécifiques pour les motos
-            cylindree = random.choice([125, 300, 500, 650, 750, 900, 1000, 1200])
-            type_moto = random.choice(types_moto)
-
-            moto = Moto(
-                id=None,
-                marque=marque,
-                modele=modele,
-                annee=annee,
-                kilometrage=kilometrage,
-                prix_achat=prix_achat,
-                cout_entretien_annuel=cout_entretien,
-                cylindree=cylindree,
-                type_moto=type_moto
-            )
+            # création des utilitaires
+            for i in range(nb_utilitaires):
+                marque = random.choice(marques_utilitaire)
+                modele = random.choice(modeles_utilitaire[marque])
+                annee = random.randint(2015, 2023)
+                kilometrage = random.randint(0, 150000)
+                prix_achat = random.randint(15000, 40000)
+                cout_entretien = random.randint(800, 2500)
 
-            moto_id = self.sauvegarder_vehicule(moto)
-            vehicules_ids.append(moto_id)
-
-        # création des clients
-        clients_ids = []
-        for i in range(nb_clients):
-            nom = random.choice(noms)
-            prenom = random.choice(prenoms)
-            ville = random.choice(villes)
-            adresse = f"{random.randint(1, 100)} rue {random.choice(['de la Paix', 'Victor Hugo', 'des Lilas', 'Principale'])}, {random.randint(10000, 99999)} {ville}"
-            telephone = f"0{random.randint(1, 9)}{random.randint(10000000, 99999999)}"
-            email = f"{prenom.lower()}.{nom.lower()}@example.com"
-
-            client = Client(
-                id=None,
-                nom=nom,
-                prenom=prenom,
-                adresse=adresse,
-                telephone=telephone,
-                email=email
-            )
+                # attributs spécifiques pour les utilitaires
+                volume = round(random.uniform(3.0, 20.0), 1)
+                charge_utile = random.randint(500, 2000)
+                hayon = random.choice([True, False])
+
+                utilitaire = Utilitaire(
+                    id=None,
+                    marque=marque,
+                    modele=modele,
+                    annee=annee,
+                    kilometrage=kilometrage,
+                    prix_achat=prix_achat,
+                    cout_entretien_annuel=cout_entretien,
+                    volume=volume,
+                    charge_utile=charge_utile,
+                    hayon=hayon
+                )
 
-            client_id = self.sauvegarder_client(client)
-            clients_ids.append(client_id)
+                utilitaire_id = self.sauvegarder_vehicule(utilitaire)
+                vehicules_ids.append(utilitaire_id)
 
-        # création des réservations
-        maintenant = datetime.now()
-        reservations_ids = []
-        for i in range(min(len(clients_ids) * 2, len(vehicules_ids) * 2)):
-            client_id = random.choice(clients_ids)
-            vehicule_id = random.choice(vehicules_ids)
+            # création des motos
+            for i in range(nb_motos):
+                marque = random.choice(marques_moto)
+                modele = random.choice(modeles_moto[marque])
+                annee = random.randint(2015, 2023)
+                kilometrage = random.randint(0, 50000)
+                prix_achat = random.randint(5000, 25000)
+                cout_entretien = random.randint(300, 1500)
 
-            # dates aléatoires sur les 3 derniers mois et les 3 prochains mois
-            jours_avant_debut = random.randint(-90, 60)
-            duree_location = random.randint(1, 14)
+                # attributs spécifiques pour les motos
+                cylindree = random.choice([125, 300, 500, 650, 750, 900, 1000, 1200])
+                type_moto = random.choice(types_moto)
+
+                moto = Moto(
+                    id=None,
+                    marque=marque,
+                    modele=modele,
+                    annee=annee,
+                    kilometrage=kilometrage,
+                    prix_achat=prix_achat,
+                    cout_entretien_annuel=cout_entretien,
+                    cylindree=cylindree,
+                    type_moto=type_moto
+                )
 
-            date_debut = maintenant + timedelta(days=jours_avant_debut)
-            date_fin = date_debut + timedelta(days=duree_location)
+                moto_id = self.sauvegarder_vehicule(moto)
+                vehicules_ids.append(moto_id)
 
-            # prix aléatoire entre 20 et 100€ par jour
-            prix_journalier = random.randint(20, 100)
-            prix_total = prix_journalier * duree_location
+            # création des clients
+            clients_ids = []
+            for i in range(nb_clients):
+                nom = random.choice(noms)
+                prenom = random.choice(prenoms)
+                ville = random.choice(villes)
+                adresse = f"{random.randint(1, 100)} rue {random.choice(['de la Paix', 'Victor Hugo', 'des Lilas', 'Principale'])}, {random.randint(10000, 99999)} {ville}"
+                telephone = f"0{random.randint(1, 9)}{random.randint(10000000, 99999999)}"
+                email = f"{prenom.lower()}.{nom.lower()}@example.com"
 
-            # statut basé sur les dates
-            if date_fin < maintenant:
-                statut = "terminée"
-            elif date_debut < maintenant:
-                statut = "confirmée"
-            else:
-                statut = "confirmée"
-
-            reservation = Reservation(
-                id=None,
-                client_id=client_id,
-                vehicule_id=vehicule_id,
-                date_debut=date_debut,
-                date_fin=date_fin,
-                prix_total=prix_total,
-                statut=statut
-            )
+                client = Client(
+                    id=None,
+                    nom=nom,
+                    prenom=prenom,
+                    adresse=adresse,
+                    telephone=telephone,
+                    email=email
+                )
+
+                client_id = self.sauvegarder_client(client)
+                clients_ids.append(client_id)
+
+            # création des réservations
+            maintenant = datetime.now()
+            reservations_ids = []
+            for i in range(min(len(clients_ids) * 2, len(vehicules_ids) * 2)):
+                client_id = random.choice(clients_ids)
+                vehicule_id = random.choice(vehicules_ids)
+
+                # dates aléatoires sur les 3 derniers mois et les 3 prochains mois
+                jours_avant_debut = random.randint(-90, 60)
+                duree_location = random.randint(1, 14)
 
-            reservation_id = self.sauvegarder_reservation(reservation)
-            reservations_ids.append(reservation_id)
+                date_debut = maintenant + timedelta(days=jours_avant_debut)
+                date_fin = date_debut + timedelta(days=duree_location)
 
-            # créer une facture pour les réservations terminées
-            if statut == "terminée":
-                from model.facture import Facture
+                # prix aléatoire entre 20 et 100€ par jour
+                prix_journalier = random.randint(20, 100)
+                prix_total = prix_journalier * duree_location
 
-                facture = Facture(
+                # statut basé sur les dates
+                if date_fin < maintenant:
+                    statut = "terminée"
+                elif date_debut < maintenant:
+                    statut = "confirmée"
+                else:
+                    statut = "confirmée"
+
+                reservation = Reservation(
                     id=None,
-                    reservation_id=reservation_id,
-                    date_emission=date_fin + timedelta(days=1),
-                    montant_ht=prix_total / 1.2,  # TVA 20%
-                    taux_tva=0.2,
+                    client_id=client_id,
+                    vehicule_id=vehicule_id,
+                    date_debut=date_debut,
+                    date_fin=date_fin,
+                    prix_total=prix_total,
+                    statut=statut
                 )
 
-                self.sauvegarder_facture(facture)
+                reservation_id = self.sauvegarder_reservation(reservation)
+                reservations_ids.append(reservation_id)
+
+                # créer une facture pour les réservations terminées
+                if statut == "terminée":
+                    from model.facture import Facture
+
+                    facture = Facture(
+                        id=None,
+                        reservation_id=reservation_id,
+                        date_emission=date_fin + timedelta(days=1),
+                        montant_ht=prix_total / 1.2,  # TVA 20%
+                        taux_tva=0.2,
+                    )
+
+                    self.sauvegarder_facture(facture)
 
         print(
             f"données de test générées avec succès: {nb_voitures} voitures, {nb_utilitaires} utilitaires, {nb_motos} motos, {nb_clients} clients et {len(reservations_ids)} réservations")
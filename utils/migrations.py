@@ -0,0 +1,692 @@
+# utils/migrations.py
+# ce fichier implémente le moteur de migrations du schéma sqlite
+# il complète la couche d'accès aux données (utils/database.py)
+#
+# structure:
+# - la version du schéma est stockée dans PRAGMA user_version (un simple entier dans l'en-tête du fichier)
+# - chaque Migration porte un numéro de version, une étape "schema" (ddl, dans une transaction)
+#   et une étape "donnees" optionnelle (reprise de données, découpée en lots)
+# - appliquer_migrations lit la version et n'exécute que les migrations plus récentes
+# - executer_par_lots / mettre_a_jour_par_lots découpent une écriture sur une grosse table
+#   en transactions courtes ; reconstruire_table + remplacer_table changent le type de colonnes
+#
+# interactions:
+# - appelé par Database.__init__ à chaque ouverture de la base
+# - si la base est déjà à jour, le démarrage se limite à la lecture de user_version
+# - pour faire évoluer le schéma : ajouter une Migration en fin de liste MIGRATIONS
+#   (ne jamais modifier une migration déjà livrée)
+
+import sqlite3
+
+
+class Migration:
+    """
+    une étape de migration du schéma
+
+    Attributes:
+        version (int): version atteinte une fois la migration appliquée
+        description (str): description courte (affichée lors de l'application)
+        schema (callable, optional): fonction(db) qui modifie le schéma, exécutée dans une transaction
+        donnees (callable, optional): fonction(db) de reprise de données, responsable
+            de ses propres transactions (voir mettre_a_jour_par_lots)
+    """
+
+    def __init__(self, version, description, schema=None, donnees=None):
+        """
+        initialise une migration
+        """
+        self.version = version
+        self.description = description
+        self.schema = schema
+        self.donnees = donnees
+
+    def __repr__(self):
+        return f"Migration({self.version}, {self.description!r})"
+
+
+def lire_version(conn):
+    """
+    lit la version du schéma stockée dans la base
+
+    Args:
+        conn (sqlite3.Connection): connexion à la base
+
+    Returns:
+        int: valeur de PRAGMA user_version (0 pour une base neuve)
+    """
+    return conn.execute('PRAGMA user_version').fetchone()[0]
+
+
+def ecrire_version(conn, version):
+    """
+    écrit la version du schéma (PRAGMA n'accepte pas de paramètre lié, d'où le int())
+    """
+    conn.execute(f'PRAGMA user_version = {int(version)}')
+
+
+def executer_par_lots(conn, table, requete, parametres=(), taille_lot=10000):
+    """
+    exécute une requête d'écriture par tranches de rowid de la table donnée, avec un commit
+    par tranche : le verrou d'écriture n'est tenu que le temps d'un lot, ce qui permet de
+    migrer une table de plusieurs millions de lignes sans bloquer les autres processus
+    pendant plusieurs minutes.
+
+    la requête doit se terminer par deux paramètres "?" recevant les bornes de la tranche
+    (ex: "... WHERE rowid BETWEEN ? AND ?") et doit être idempotente : en cas d'interruption,
+    la version n'est pas incrémentée et la reprise refait les lots.
+
+    Args:
+        conn (sqlite3.Connection): connexion à la base
+        table (str): table dont les rowid définissent les tranches
+        requete (str): requête à exécuter pour chaque tranche
+        parametres (tuple): paramètres liés placés avant les bornes
+        taille_lot (int): nombre de rowid couverts par transaction
+
+    Returns:
+        int: nombre de lots exécutés
+    """
+    borne_max = conn.execute(f'SELECT MAX(rowid) FROM {table}').fetchone()[0]
+    if borne_max is None:
+        return 0
+
+    nb_lots = 0
+    debut = conn.execute(f'SELECT MIN(rowid) FROM {table}').fetchone()[0]
+    while debut <= borne_max:
+        fin = debut + taille_lot - 1
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.execute(requete, (*parametres, debut, fin))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        nb_lots += 1
+        debut = fin + 1
+
+    return nb_lots
+
+
+def mettre_a_jour_par_lots(conn, table, affectation, condition="1", parametres=(), taille_lot=10000):
+    """
+    exécute "UPDATE table SET affectation WHERE condition" par tranches de rowid
+    (voir executer_par_lots). la condition doit rendre l'opération idempotente
+    (ex: "nouvelle_colonne IS NULL").
+
+    Args:
+        conn (sqlite3.Connection): connexion à la base
+        table (str): table à mettre à jour
+        affectation (str): clause SET (ex: "jours = julianday(date_fin) - julianday(date_debut)")
+        condition (str): filtre supplémentaire
+        parametres (tuple): paramètres liés de l'affectation et de la condition
+        taille_lot (int): nombre de rowid couverts par transaction
+
+    Returns:
+        int: nombre de lots exécutés
+    """
+    requete = f'UPDATE {table} SET {affectation} WHERE ({condition}) AND rowid BETWEEN ? AND ?'
+    return executer_par_lots(conn, table, requete, parametres, taille_lot)
+
+
+def reconstruire_table(conn, table, definition, selection, taille_lot=10000):
+    """
+    prépare la reconstruction d'une table (changement de type de colonnes, que sqlite ne sait
+    pas faire avec ALTER TABLE) : crée "<table>_nouvelle" puis y copie les lignes par lots.
+    la bascule (remplacer_table) doit être faite dans une migration suivante, pour qu'elle
+    soit atomique avec l'incrément de version.
+
+    seules les lignes déjà copiées (reprise après interruption) sont sautées : une ligne que la
+    nouvelle définition refuse (ex: date illisible convertie en NULL dans une colonne NOT NULL)
+    arrête la migration au lieu d'être perdue, la version n'est pas incrémentée et la copie
+    reprend au redémarrage une fois la ligne corrigée.
+
+    Args:
+        conn (sqlite3.Connection): connexion à la base
+        table (str): table à reconstruire
+        definition (str): colonnes de la nouvelle table (contenu du CREATE TABLE)
+        selection (str): expressions du SELECT sur l'ancienne table, dans l'ordre des colonnes
+
+    Returns:
+        int: nombre de lots copiés
+
+    Raises:
+        RuntimeError: si une ligne est refusée par la nouvelle table ou si les deux tables
+            n'ont pas le même nombre de lignes après la copie
+    """
+    conn.execute(f'CREATE TABLE IF NOT EXISTS {table}_nouvelle ({definition})')
+    conn.commit()
+    # ON CONFLICT DO NOTHING n'ignore que les doublons de clé, pas les violations de NOT NULL
+    requete = (f'INSERT INTO {table}_nouvelle SELECT {selection} FROM {table} '
+               f'WHERE rowid BETWEEN ? AND ? ON CONFLICT DO NOTHING')
+    try:
+        nb_lots = executer_par_lots(conn, table, requete, taille_lot=taille_lot)
+    except sqlite3.IntegrityError as e:
+        raise RuntimeError(f"reconstruction de la table {table} interrompue: une ligne ne respecte pas "
+                           f"la nouvelle définition ({e}), corriger les données puis relancer") from e
+
+    nb_lignes = conn.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+    nb_copiees = conn.execute(f'SELECT COUNT(*) FROM {table}_nouvelle').fetchone()[0]
+    if nb_copiees != nb_lignes:
+        raise RuntimeError(f"reconstruction de la table {table} incomplète: "
+                           f"{nb_copiees} lignes copiées pour {nb_lignes} lignes d'origine")
+    return nb_lots
+
+
+def remplacer_table(conn, table):
+    """
+    remplace une table par sa version "<table>_nouvelle" (à appeler dans une étape de schéma,
+    donc dans une transaction). les index de l'ancienne table disparaissent avec elle.
+    """
+    conn.execute(f'DROP TABLE {table}')
+    conn.execute(f'ALTER TABLE {table}_nouvelle RENAME TO {table}')
+
+
+def appliquer_migrations(db, migrations=None):
+    """
+    amène la base à la dernière version connue
+
+    Args:
+        db (Database): base à migrer
+        migrations (list, optional): liste de Migration (MIGRATIONS par défaut)
+
+    Returns:
+        int: nombre de migrations appliquées (0 si la base était à jour)
+
+    Raises:
+        RuntimeError: si la base a été créée par une version plus récente du programme
+    """
+    if migrations is None:
+        migrations = MIGRATIONS
+
+    conn = db.conn
+    version_cible = migrations[-1].version if migrations else 0
+
+    # cas courant : une seule lecture d'entier au démarrage
+    version = lire_version(conn)
+    if version == version_cible:
+        return 0
+    if version > version_cible:
+        raise RuntimeError(f"base en version {version}, ce programme ne connaît que la version {version_cible}")
+
+    # on n'affiche les étapes que pour une base existante (pas à la création d'une base neuve)
+    base_existante = version > 0
+
+    nb_appliquees = 0
+    for migration in migrations:
+        if migration.version <= version:
+            continue
+
+        if base_existante:
+            print(f"migration du schéma vers la version {migration.version}: {migration.description}")
+
+        # étape de schéma : atomique
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            if migration.schema is not None:
+                migration.schema(db)
+            if migration.donnees is None:
+                ecrire_version(conn, migration.version)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+        # étape de données : transactions gérées par lots
+        if migration.donnees is not None:
+            migration.donnees(db)
+            ecrire_version(conn, migration.version)
+            conn.commit()
+
+        version = migration.version
+        nb_appliquees += 1
+
+    return nb_appliquees
+
+
+# migrations du schéma (ordre croissant de version, ne jamais modifier une entrée déjà livrée)
+
+def _schema_initial(db):
+    """tables de base (identiques à la création historique, sans effet sur une base existante)"""
+    db._creer_tables()
+
+
+# index secondaires de la version 2, figés : Database.INDEX_SECONDAIRES évolue avec le programme,
+# la migration 2 doit créer les mêmes index quelle que soit la version qui l'applique
+# (les migrations suivantes alignent ensuite la base sur la liste courante)
+_INDEX_SECONDAIRES_V2 = (
+    "CREATE INDEX IF NOT EXISTS idx_reservations_vehicule_periode ON reservations (vehicule_id, date_debut, date_fin)",
+    "CREATE INDEX IF NOT EXISTS idx_reservations_confirmees ON reservations (vehicule_id, date_debut, date_fin) "
+    "WHERE statut = 'confirmée'",
+    "CREATE INDEX IF NOT EXISTS idx_reservations_client ON reservations (client_id)",
+    "CREATE INDEX IF NOT EXISTS idx_reservations_periode ON reservations (date_debut, date_fin)",
+    "CREATE INDEX IF NOT EXISTS idx_factures_reservation ON factures (reservation_id)",
+    "CREATE INDEX IF NOT EXISTS idx_vehicules_type ON vehicules (type)",
+    "CREATE INDEX IF NOT EXISTS idx_vehicules_marque ON vehicules (marque, modele)",
+    "CREATE INDEX IF NOT EXISTS idx_vehicules_categorie ON vehicules (categorie)",
+    "CREATE INDEX IF NOT EXISTS idx_vehicules_annee ON vehicules (annee)",
+    "CREATE INDEX IF NOT EXISTS idx_vehicules_prix ON vehicules (prix_achat)",
+)
+
+
+def _index_secondaires(db):
+    """index secondaires de la version 2 (définitions figées)"""
+    for sql in _INDEX_SECONDAIRES_V2:
+        db.conn.execute(sql)
+
+
+def _synchroniser_index(db):
+    """
+    aligne les index sur Database.INDEX_SECONDAIRES ; un index sur une table ou une colonne
+    créée par une migration ultérieure est laissé de côté (cette migration resynchronise)
+    """
+    db._synchroniser_index(ignorer_absents=True)
+
+
+# dates stockées en secondes depuis le 1er janvier 1970 (heure locale naïve, comme les datetime
+# du modèle) au lieu de texte '%Y-%m-%d %H:%M:%S' : décodage sans strptime et comparaisons entières
+_DEFINITION_RESERVATIONS_V3 = """
+    id INTEGER PRIMARY KEY,
+    client_id INTEGER NOT NULL,
+    vehicule_id INTEGER NOT NULL,
+    date_debut INTEGER NOT NULL,
+    date_fin INTEGER NOT NULL,
+    prix_total REAL NOT NULL,
+    statut TEXT NOT NULL,
+    FOREIGN KEY (client_id) REFERENCES clients (id),
+    FOREIGN KEY (vehicule_id) REFERENCES vehicules (id)
+"""
+
+_DEFINITION_FACTURES_V3 = """
+    id INTEGER PRIMARY KEY,
+    reservation_id INTEGER NOT NULL,
+    date_emission INTEGER NOT NULL,
+    montant_ht REAL NOT NULL,
+    taux_tva REAL NOT NULL,
+    montant_ttc REAL NOT NULL,
+    FOREIGN KEY (reservation_id) REFERENCES reservations (id)
+"""
+
+
+def _texte_vers_epoch(colonne):
+    """expression sql convertissant une date texte en secondes (entier)"""
+    return f"CAST(strftime('%s', {colonne}) AS INTEGER)"
+
+
+def _copier_dates_entieres(db):
+    """copie par lots des réservations et factures avec dates converties en entiers"""
+    reconstruire_table(db.conn, 'reservations', _DEFINITION_RESERVATIONS_V3,
+                       f"id, client_id, vehicule_id, {_texte_vers_epoch('date_debut')}, "
+                       f"{_texte_vers_epoch('date_fin')}, prix_total, statut")
+    reconstruire_table(db.conn, 'factures', _DEFINITION_FACTURES_V3,
+                       f"id, reservation_id, {_texte_vers_epoch('date_emission')}, "
+                       f"montant_ht, taux_tva, montant_ttc")
+
+
+def _basculer_dates_entieres(db):
+    """bascule atomique vers les tables à dates entières, puis reconstruction des index"""
+    remplacer_table(db.conn, 'reservations')
+    remplacer_table(db.conn, 'factures')
+    _synchroniser_index(db)
+
+
+# attributs spécifiques exposés en colonnes générées (VIRTUAL : calculées à la lecture depuis le json,
+# donc aucune réécriture de la table et aucun changement du chemin d'écriture), indexables
+_COLONNES_ATTRIBUTS = {
+    "nb_places": "INTEGER",
+    "puissance": "INTEGER",
+    "carburant": "TEXT",
+    "options": "TEXT",
+    "volume": "REAL",
+    "charge_utile": "REAL",
+    "hayon": "INTEGER",
+    "cylindree": "INTEGER",
+    "type_moto": "TEXT",
+}
+
+
+def _colonnes_attributs(db):
+    """colonnes générées des attributs spécifiques, table annexe des options et index"""
+    existantes = {row[1] for row in db.conn.execute('PRAGMA table_xinfo(vehicules)')}
+    for colonne, type_sql in _COLONNES_ATTRIBUTS.items():
+        # le type de moto est stocké sous la clé "type" (déjà le nom de la colonne du type de véhicule)
+        cle = 'type' if colonne == 'type_moto' else colonne
+        if colonne not in existantes:
+            db.conn.execute(f"ALTER TABLE vehicules ADD COLUMN {colonne} {type_sql} "
+                            f"GENERATED ALWAYS AS (json_extract(attributs_specifiques, '$.{cle}')) VIRTUAL")
+
+    db.conn.execute("""
+    CREATE TABLE IF NOT EXISTS vehicule_options (
+        option TEXT NOT NULL,
+        vehicule_id INTEGER NOT NULL,
+        PRIMARY KEY (option, vehicule_id),
+        FOREIGN KEY (vehicule_id) REFERENCES vehicules (id)
+    ) WITHOUT ROWID
+    """)
+    _synchroniser_index(db)
+
+
+def _remplir_options(db):
+    """copie par lots des options des voitures existantes dans vehicule_options"""
+    executer_par_lots(db.conn, 'vehicules',
+                      "INSERT OR IGNORE INTO vehicule_options (option, vehicule_id) "
+                      "SELECT o.value, v.id FROM vehicules v, json_each(v.attributs_specifiques, '$.options') o "
+                      "WHERE v.type = 'Voiture' AND v.rowid BETWEEN ? AND ?")
+
+
+def fts5_disponible(conn):
+    """
+    indique si la bibliothèque sqlite utilisée a été compilée avec FTS5 (recherche plein texte)
+    """
+    return bool(conn.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')").fetchone()[0])
+
+
+def _recherche_clients(db):
+    """
+    index plein texte des clients (table FTS5 à contenu externe, tenue à jour par des triggers).
+    sans FTS5, rien n'est créé et rechercher_clients garde ses filtres LIKE.
+    """
+    if not fts5_disponible(db.conn):
+        return
+
+    # unicode61 + remove_diacritics : "helene" trouve "Hélène" ; prefix : index des préfixes
+    # de 2 et 3 caractères pour les recherches "dup*" au fil de la frappe
+    db.conn.execute("""
+    CREATE VIRTUAL TABLE IF NOT EXISTS clients_fts USING fts5(
+        nom, prenom, email, telephone,
+        content = 'clients', content_rowid = 'id',
+        tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3'
+    )
+    """)
+    db.conn.execute("""
+    CREATE TRIGGER IF NOT EXISTS clients_fts_insertion AFTER INSERT ON clients BEGIN
+        INSERT INTO clients_fts (rowid, nom, prenom, email, telephone)
+        VALUES (new.id, new.nom, new.prenom, new.email, new.telephone);
+    END
+    """)
+    db.conn.execute("""
+    CREATE TRIGGER IF NOT EXISTS clients_fts_suppression AFTER DELETE ON clients BEGIN
+        INSERT INTO clients_fts (clients_fts, rowid, nom, prenom, email, telephone)
+        VALUES ('delete', old.id, old.nom, old.prenom, old.email, old.telephone);
+    END
+    """)
+    db.conn.execute("""
+    CREATE TRIGGER IF NOT EXISTS clients_fts_modification AFTER UPDATE ON clients BEGIN
+        INSERT INTO clients_fts (clients_fts, rowid, nom, prenom, email, telephone)
+        VALUES ('delete', old.id, old.nom, old.prenom, old.email, old.telephone);
+        INSERT INTO clients_fts (rowid, nom, prenom, email, telephone)
+        VALUES (new.id, new.nom, new.prenom, new.email, new.telephone);
+    END
+    """)
+    # indexation des clients existants : 'rebuild' relit toute la table clients ; il n'est pas
+    # découpé en lots (une copie partielle ne serait pas idempotente en cas de reprise)
+    db.conn.execute("INSERT INTO clients_fts (clients_fts) VALUES ('rebuild')")
+
+
+# agrégats matérialisés pour les tableaux de bord, tenus à jour par des triggers :
+# - stats_revenus_vehicule_jour : chiffre d'affaires par véhicule et par jour de début de location
+# - stats_revenus_type_mois : chiffre d'affaires par type de véhicule et par mois de début
+# - stats_parc_type : nombre de véhicules, somme des années, valeur d'achat et coût d'entretien par type
+# seules les réservations confirmées ou terminées comptent dans le chiffre d'affaires (comme le bilan)
+
+def _maj_revenus(ligne, signe):
+    """
+    instructions de trigger ajoutant (signe "+") ou retirant (signe "-") une réservation
+    (new ou old) des agrégats de chiffre d'affaires
+    """
+    return f"""
+        INSERT INTO stats_revenus_vehicule_jour (vehicule_id, jour, revenus, nb_reservations)
+        SELECT {ligne}.vehicule_id, {ligne}.date_debut / 86400, {signe}{ligne}.prix_total, {signe}1
+        WHERE {ligne}.statut IN ('confirmée', 'terminée')
+        ON CONFLICT (vehicule_id, jour) DO UPDATE SET
+            revenus = revenus + excluded.revenus,
+            nb_reservations = nb_reservations + excluded.nb_reservations;
+        INSERT INTO stats_revenus_type_mois (type, mois, revenus, nb_reservations)
+        SELECT (SELECT type FROM vehicules WHERE id = {ligne}.vehicule_id),
+               strftime('%Y-%m', {ligne}.date_debut, 'unixepoch'), {signe}{ligne}.prix_total, {signe}1
+        WHERE {ligne}.statut IN ('confirmée', 'terminée')
+          AND EXISTS (SELECT 1 FROM vehicules WHERE id = {ligne}.vehicule_id)
+        ON CONFLICT (type, mois) DO UPDATE SET
+            revenus = revenus + excluded.revenus,
+            nb_reservations = nb_reservations + excluded.nb_reservations;
+        DELETE FROM stats_revenus_vehicule_jour WHERE nb_reservations = 0
+            AND vehicule_id = {ligne}.vehicule_id AND jour = {ligne}.date_debut / 86400;
+        DELETE FROM stats_revenus_type_mois WHERE nb_reservations = 0
+            AND mois = strftime('%Y-%m', {ligne}.date_debut, 'unixepoch');
+    """
+
+
+def _maj_parc(ligne, signe):
+    """
+    instruction de trigger ajoutant ou retirant un véhicule (new ou old) des agrégats du parc
+    """
+    return f"""
+        INSERT INTO stats_parc_type (type, nb_vehicules, somme_annees, valeur_totale, cout_entretien_total)
+        VALUES ({ligne}.type, {signe}1, {signe}{ligne}.annee, {signe}{ligne}.prix_achat,
+                {signe}{ligne}.cout_entretien_annuel)
+        ON CONFLICT (type) DO UPDATE SET
+            nb_vehicules = nb_vehicules + excluded.nb_vehicules,
+            somme_annees = somme_annees + excluded.somme_annees,
+            valeur_totale = valeur_totale + excluded.valeur_totale,
+            cout_entretien_total = cout_entretien_total + excluded.cout_entretien_total;
+    """
+
+
+def _agregats(db):
+    """tables d'agrégats, triggers de mise à jour et calcul initial"""
+    conn = db.conn
+    conn.execute("""
+    CREATE TABLE stats_revenus_vehicule_jour (
+        vehicule_id INTEGER NOT NULL,
+        jour INTEGER NOT NULL,
+        revenus REAL NOT NULL,
+        nb_reservations INTEGER NOT NULL,
+        PRIMARY KEY (vehicule_id, jour)
+    ) WITHOUT ROWID
+    """)
+    conn.execute("""
+    CREATE TABLE stats_revenus_type_mois (
+        type TEXT NOT NULL,
+        mois TEXT NOT NULL,
+        revenus REAL NOT NULL,
+        nb_reservations INTEGER NOT NULL,
+        PRIMARY KEY (type, mois)
+    ) WITHOUT ROWID
+    """)
+    conn.execute("""
+    CREATE TABLE stats_parc_type (
+        type TEXT PRIMARY KEY,
+        nb_vehicules INTEGER NOT NULL,
+        somme_annees INTEGER NOT NULL,
+        valeur_totale REAL NOT NULL,
+        cout_entretien_total REAL NOT NULL
+    ) WITHOUT ROWID
+    """)
+    # réservations en cours de déplacement vers l'archive (Database.archiver_reservations) :
+    # leur suppression de la table courante ne doit pas retirer leur chiffre d'affaires
+    conn.execute("CREATE TABLE archivage_en_cours (id INTEGER PRIMARY KEY)")
+
+    conn.execute(f"""
+    CREATE TRIGGER stats_reservations_insertion AFTER INSERT ON reservations BEGIN
+        {_maj_revenus('new', '+')}
+    END
+    """)
+    conn.execute(f"""
+    CREATE TRIGGER stats_reservations_suppression AFTER DELETE ON reservations
+    WHEN NOT EXISTS (SELECT 1 FROM archivage_en_cours WHERE id = old.id) BEGIN
+        {_maj_revenus('old', '-')}
+    END
+    """)
+    conn.execute(f"""
+    CREATE TRIGGER stats_reservations_modification AFTER UPDATE ON reservations BEGIN
+        {_maj_revenus('old', '-')}
+        {_maj_revenus('new', '+')}
+    END
+    """)
+    conn.execute(f"""
+    CREATE TRIGGER stats_vehicules_insertion AFTER INSERT ON vehicules BEGIN
+        {_maj_parc('new', '+')}
+    END
+    """)
+    conn.execute(f"""
+    CREATE TRIGGER stats_vehicules_suppression AFTER DELETE ON vehicules BEGIN
+        {_maj_parc('old', '-')}
+        DELETE FROM stats_parc_type WHERE type = old.type AND nb_vehicules = 0;
+    END
+    """)
+    conn.execute(f"""
+    CREATE TRIGGER stats_vehicules_modification
+    AFTER UPDATE OF type, annee, prix_achat, cout_entretien_annuel ON vehicules BEGIN
+        {_maj_parc('old', '-')}
+        {_maj_parc('new', '+')}
+        DELETE FROM stats_parc_type WHERE type = old.type AND nb_vehicules = 0;
+    END
+    """)
+
+    # calcul initial depuis les données existantes (dans la même transaction que les triggers),
+    # réservations déjà archivées comprises : l'archivage ne retire pas leur chiffre d'affaires
+    conn.execute(f"""
+    INSERT INTO stats_revenus_vehicule_jour (vehicule_id, jour, revenus, nb_reservations)
+    SELECT vehicule_id, date_debut / 86400, SUM(prix_total), COUNT(*)
+    FROM {db._reservations_rapport} WHERE statut IN ('confirmée', 'terminée')
+    GROUP BY vehicule_id, date_debut / 86400
+    """)
+    conn.execute(f"""
+    INSERT INTO stats_revenus_type_mois (type, mois, revenus, nb_reservations)
+    SELECT v.type, strftime('%Y-%m', reservations.date_debut, 'unixepoch'), SUM(reservations.prix_total), COUNT(*)
+    FROM {db._reservations_rapport} JOIN vehicules v ON v.id = reservations.vehicule_id
+    WHERE reservations.statut IN ('confirmée', 'terminée')
+    GROUP BY v.type, strftime('%Y-%m', reservations.date_debut, 'unixepoch')
+    """)
+    conn.execute("""
+    INSERT INTO stats_parc_type (type, nb_vehicules, somme_annees, valeur_totale, cout_entretien_total)
+    SELECT type, COUNT(*), SUM(annee), SUM(prix_achat), SUM(cout_entretien_annuel)
+    FROM vehicules GROUP BY type
+    """)
+
+
+
+# journal des modifications (capture de changements) : chaque écriture sur une table suivie
+# ajoute une ligne (seq, nom_table, objet_id, operation) ; un processus qui garde des objets en
+# mémoire (Parc) relit seulement les lignes postérieures au dernier seq appliqué
+TABLES_JOURNALISEES = ('vehicules', 'clients', 'reservations')
+
+
+def _journal_modifications(db):
+    """table journal_modifications et triggers d'écriture des tables suivies"""
+    # AUTOINCREMENT : un seq n'est jamais réutilisé, même après purge du journal
+    db.conn.execute("""
+    CREATE TABLE journal_modifications (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        nom_table TEXT NOT NULL,
+        objet_id INTEGER NOT NULL,
+        operation TEXT NOT NULL
+    )
+    """)
+    for table in TABLES_JOURNALISEES:
+        for evenement, operation, ligne in (('INSERT', 'insertion', 'new'), ('UPDATE', 'modification', 'new'),
+                                            ('DELETE', 'suppression', 'old')):
+            # un déplacement vers l'archive ne change pas les réservations visibles
+            condition = ("WHEN NOT EXISTS (SELECT 1 FROM archivage_en_cours WHERE id = old.id)"
+                         if table == 'reservations' and evenement == 'DELETE' else "")
+            db.conn.execute(f"""
+            CREATE TRIGGER journal_{table}_{operation} AFTER {evenement} ON {table} {condition} BEGIN
+                INSERT INTO journal_modifications (nom_table, objet_id, operation)
+                VALUES ('{table}', {ligne}.id, '{operation}');
+            END
+            """)
+
+
+# définition des réservations à partir de la version 10 : AUTOINCREMENT, un id n'est jamais
+# réattribué, même quand les plus récentes ont été déplacées vers l'archive
+_DEFINITION_RESERVATIONS_V10 = """
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    client_id INTEGER NOT NULL,
+    vehicule_id INTEGER NOT NULL,
+    date_debut INTEGER NOT NULL,
+    date_fin INTEGER NOT NULL,
+    prix_total REAL NOT NULL,
+    statut TEXT NOT NULL,
+    FOREIGN KEY (client_id) REFERENCES clients (id),
+    FOREIGN KEY (vehicule_id) REFERENCES vehicules (id)
+"""
+
+
+def _copier_reservations_autoincrement(db):
+    """copie par lots des réservations dans une table à identifiants AUTOINCREMENT"""
+    reconstruire_table(db.conn, 'reservations', _DEFINITION_RESERVATIONS_V10,
+                       "id, client_id, vehicule_id, date_debut, date_fin, prix_total, statut")
+
+
+def _basculer_reservations_autoincrement(db):
+    """
+    bascule atomique vers la table à identifiants AUTOINCREMENT, puis recréation des index et
+    triggers de l'ancienne table, qui disparaissent avec elle. la copie des ids existants a
+    initialisé sqlite_sequence ; Database aligne ensuite la séquence sur l'archive.
+    """
+    conn = db.conn
+    dependances = [row[0] for row in conn.execute(
+        "SELECT sql FROM sqlite_master WHERE tbl_name = 'reservations' "
+        "AND type IN ('index', 'trigger') AND sql IS NOT NULL")]
+    remplacer_table(conn, 'reservations')
+    for sql in dependances:
+        conn.execute(sql)
+
+
+def _mois_revenus_vehicule(vehicule, signe):
+    """
+    instruction de trigger reportant (signe "+") ou retirant (signe "-") tout le chiffre d'affaires
+    d'un véhicule (new ou old) dans stats_revenus_type_mois, mois par mois, sous son type
+    """
+    return f"""
+        INSERT INTO stats_revenus_type_mois (type, mois, revenus, nb_reservations)
+        SELECT {vehicule}.type, strftime('%Y-%m', jour * 86400, 'unixepoch'),
+               {signe}SUM(revenus), {signe}SUM(nb_reservations)
+        FROM stats_revenus_vehicule_jour WHERE vehicule_id = {vehicule}.id
+        GROUP BY strftime('%Y-%m', jour * 86400, 'unixepoch')
+        ON CONFLICT (type, mois) DO UPDATE SET
+            revenus = revenus + excluded.revenus,
+            nb_reservations = nb_reservations + excluded.nb_reservations;
+    """
+
+
+def _agregats_changement_type(db):
+    """
+    trigger déplaçant le chiffre d'affaires d'un véhicule dont le type change, puis recalcul de
+    stats_revenus_type_mois depuis stats_revenus_vehicule_jour (qui couvre aussi les réservations
+    archivées) pour corriger les bases où un type a déjà changé
+    """
+    conn = db.conn
+    conn.execute(f"""
+    CREATE TRIGGER stats_vehicules_changement_type AFTER UPDATE OF type ON vehicules
+    WHEN old.type IS NOT new.type BEGIN
+        {_mois_revenus_vehicule('old', '-')}
+        {_mois_revenus_vehicule('new', '+')}
+        DELETE FROM stats_revenus_type_mois WHERE type = old.type AND nb_reservations = 0;
+    END
+    """)
+
+    conn.execute("DELETE FROM stats_revenus_type_mois")
+    conn.execute("""
+    INSERT INTO stats_revenus_type_mois (type, mois, revenus, nb_reservations)
+    SELECT v.type, strftime('%Y-%m', s.jour * 86400, 'unixepoch'), SUM(s.revenus), SUM(s.nb_reservations)
+    FROM stats_revenus_vehicule_jour s JOIN vehicules v ON v.id = s.vehicule_id
+    GROUP BY v.type, strftime('%Y-%m', s.jour * 86400, 'unixepoch')
+    """)
+
+
+MIGRATIONS = [
+    Migration(1, "tables véhicules, clients, réservations et factures", _schema_initial),
+    Migration(2, "index secondaires", _index_secondaires),
+    Migration(3, "copie des réservations et factures avec dates entières", donnees=_copier_dates_entieres),
+    Migration(4, "bascule vers les dates entières", _basculer_dates_entieres),
+    Migration(5, "colonnes des attributs spécifiques et table des options", _colonnes_attributs, _remplir_options),
+    Migration(6, "recherche plein texte des clients", _recherche_clients),
+    Migration(7, "index des réservations clôturées (archivage)", _synchroniser_index),
+    Migration(8, "agrégats de chiffre d'affaires et du parc", _agregats),
+    Migration(9, "journal des modifications", _journal_modifications),
+    Migration(10, "copie des réservations avec identifiants jamais réattribués",
+              donnees=_copier_reservations_autoincrement),
+    Migration(11, "bascule vers les identifiants de réservation jamais réattribués",
+              _basculer_reservations_autoincrement),
+    Migration(12, "chiffre d'affaires par type suivant les changements de type de véhicule",
+              _agregats_changement_type),
+]
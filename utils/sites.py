@@ -0,0 +1,200 @@
+# utils/sites.py
+# ce fichier implémente la répartition des données par site (agence de location) :
+# un fichier sqlite par site, donc un verrou d'écriture par agence au lieu d'un seul pour toutes
+#
+# structure:
+# - DatabaseMultiSite ouvre une Database (mode pool) par site, dans un même dossier
+#   (<dossier>/<site>.db) ; les sites existants sont retrouvés à l'ouverture
+# - chaque site est une base complète (véhicules, clients, réservations, factures) : les clés
+#   étrangères restent vérifiées dans le site, les ids ne sont uniques qu'à l'intérieur d'un site
+# - base(site) route les lectures et écritures d'une agence vers son fichier
+# - repartir(methode, ...) exécute une méthode de Database sur tous les sites en parallèle
+#   (pool de threads) ; les rapports du siège (bilan, statistiques, revenus, recherches)
+#   fusionnent les résultats par site
+#
+# interactions:
+# - le site d'un compte est la colonne Site de login_info (utilisateurs_data.db,
+#   voir CreateAccScreen.signupfunction)
+# - s'appuie sur le mode pool de Database : chaque thread du pool a sa propre connexion
+
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.database import Database
+
+
+def normaliser_site(site):
+    """
+    nom de site utilisé comme clé et comme nom de fichier (lettres, chiffres, - et _)
+
+    Args:
+        site (str): nom saisi (ex: "Saint Malo")
+
+    Returns:
+        str: nom normalisé (ex: "Saint_Malo")
+
+    Raises:
+        ValueError: si le nom est vide
+    """
+    nom = re.sub(r'[^0-9A-Za-z_-]+', '_', (site or '').strip()).strip('_')
+    if not nom:
+        raise ValueError(f"nom de site invalide: {site!r}")
+    return nom
+
+
+class DatabaseMultiSite:
+    """
+    façade sur une base sqlite par site
+
+    Attributes:
+        dossier (str): dossier contenant un fichier <site>.db par site
+        options (dict): paramètres transmis à chaque Database (taille_cache, delai_attente)
+    """
+
+    def __init__(self, dossier, sites=(), nb_threads=4, **options):
+        """
+        ouvre les sites existants du dossier et ceux demandés
+
+        Args:
+            dossier (str): dossier des fichiers de site (créé si besoin)
+            sites (iterable): sites à ouvrir (ou créer) en plus de ceux déjà présents
+            nb_threads (int): taille du pool de threads des lectures sur tous les sites
+            **options: paramètres de Database (le mode pool est toujours activé)
+        """
+        self.dossier = dossier
+        self.options = options
+        os.makedirs(dossier, exist_ok=True)
+
+        self._bases = {}
+        self._verrou = threading.Lock()
+        # pool conservé d'un rapport à l'autre : ses threads gardent leur connexion à chaque site
+        self._executeur = ThreadPoolExecutor(max_workers=nb_threads, thread_name_prefix='site')
+
+        for fichier in sorted(os.listdir(dossier)):
+            if fichier.endswith('.db'):
+                self.base(fichier[:-len('.db')])
+        for site in sites:
+            self.base(site)
+
+    @property
+    def sites(self):
+        """sites ouverts, triés par nom"""
+        return sorted(self._bases)
+
+    def base(self, site):
+        """
+        base du site (ouverte, et créée à la dernière version du schéma, au premier appel)
+
+        Args:
+            site (str): nom du site
+
+        Returns:
+            Database: base de données du site
+        """
+        site = normaliser_site(site)
+        with self._verrou:
+            db = self._bases.get(site)
+            if db is None:
+                db = Database(os.path.join(self.dossier, f"{site}.db"), pool=True, **self.options)
+                self._bases[site] = db
+            return db
+
+    def repartir(self, methode, *args, sites=None, **kwargs):
+        """
+        appelle la même méthode de Database sur plusieurs sites en parallèle
+
+        Args:
+            methode (str): nom de la méthode (ex: "calculer_bilan")
+            *args: arguments de la méthode
+            sites (iterable, optional): sites interrogés (tous par défaut)
+            **kwargs: arguments nommés de la méthode
+
+        Returns:
+            dict: site -> résultat, dans l'ordre des sites
+
+        Raises:
+            Exception: la première erreur levée par un site
+        """
+        sites = self.sites if sites is None else [normaliser_site(site) for site in sites]
+        futurs = {site: self._executeur.submit(getattr(self.base(site), methode), *args, **kwargs)
+                  for site in sites}
+        return {site: futur.result() for site, futur in futurs.items()}
+
+    # rapports du siège (fusion des résultats de tous les sites)
+
+    def rechercher_vehicules(self, criteres=None):
+        """
+        recherche des véhicules sur tous les sites (voir Database.rechercher_vehicules)
+
+        Returns:
+            list: tuples (site, véhicule)
+        """
+        return [(site, vehicule) for site, vehicules in self.repartir('rechercher_vehicules', criteres).items()
+                for vehicule in vehicules]
+
+    def rechercher_clients(self, criteres=None, limite=None):
+        """
+        recherche des clients sur tous les sites (voir Database.rechercher_clients)
+
+        Returns:
+            list: tuples (site, client)
+        """
+        return [(site, client) for site, clients in self.repartir('rechercher_clients', criteres, limite).items()
+                for client in clients]
+
+    def calculer_bilan(self):
+        """
+        bilan comptable consolidé
+
+        Returns:
+            dict: {"revenus", "cout_entretien", "rentabilite", "par_site": {site: bilan du site}}
+        """
+        par_site = self.repartir('calculer_bilan')
+        bilan = {cle: sum(bilan_site[cle] for bilan_site in par_site.values())
+                 for cle in ("revenus", "cout_entretien", "rentabilite")}
+        bilan["par_site"] = par_site
+        return bilan
+
+    def charger_statistiques_parc(self):
+        """
+        agrégats du parc par type de véhicule, tous sites confondus
+
+        Returns:
+            dict: type -> {"nb_vehicules", "somme_annees", "valeur_totale", "cout_entretien_total"}
+        """
+        statistiques = {}
+        for statistiques_site in self.repartir('charger_statistiques_parc').values():
+            for type_vehicule, valeurs in statistiques_site.items():
+                cumul = statistiques.setdefault(type_vehicule, dict.fromkeys(valeurs, 0))
+                for cle, valeur in valeurs.items():
+                    cumul[cle] += valeur
+        return statistiques
+
+    def charger_revenus_par_type_mois(self, mois_debut=None, mois_fin=None):
+        """
+        chiffre d'affaires par type de véhicule et par mois, tous sites confondus
+
+        Returns:
+            list: dicts {"type", "mois", "revenus", "nb_reservations"} triés par mois puis type
+        """
+        cumuls = {}
+        for lignes in self.repartir('charger_revenus_par_type_mois', mois_debut, mois_fin).values():
+            for ligne in lignes:
+                cumul = cumuls.setdefault((ligne["mois"], ligne["type"]),
+                                          {"type": ligne["type"], "mois": ligne["mois"],
+                                           "revenus": 0.0, "nb_reservations": 0})
+                cumul["revenus"] += ligne["revenus"]
+                cumul["nb_reservations"] += ligne["nb_reservations"]
+        return [cumuls[cle] for cle in sorted(cumuls)]
+
+    def fermer(self):
+        """
+        arrête le pool de threads et ferme les bases de tous les sites
+        """
+        self._executeur.shutdown(wait=True)
+        with self._verrou:
+            for db in self._bases.values():
+                db.fermer()
+            self._bases.clear()
@@ -2,9 +2,11 @@ from PyQt5.QtWidgets import QDialog, QLabel, QVBoxLayout
 from datetime import datetime
 
 class BilanScreen(QDialog):
-    def __init__(self, parc):
+    def __init__(self, parc, db=None):
         super().__init__()
         self.parc = parc
+        # base de données : le bilan est lu dans les agrégats tenus à jour en base
+        self.db = db
         self.setWindowTitle("Bilan Comptable")
         self.setFixedSize(600, 400)
 
@@ -22,15 +24,22 @@ class BilanScreen(QDialog):
         self.afficher_bilan()
 
     def afficher_bilan(self):
-        # Revenus : toutes les réservations terminées ou confirmées
-        revenus = sum(res.prix_total for res in self.parc.reservations
-                      if res.statut in ["confirmée", "terminée"])
+        if self.db is not None:
+            # Agrégats en base : tout l'historique, sans parcourir les réservations
+            bilan = self.db.calculer_bilan()
+            revenus = bilan["revenus"]
+            cout_entretien_total = bilan["cout_entretien"]
+            rentabilite = bilan["rentabilite"]
+        else:
+            # Revenus : toutes les réservations terminées ou confirmées
+            revenus = sum(res.prix_total for res in self.parc.reservations
+                          if res.statut in ["confirmée", "terminée"])
 
-        # Coût d'entretien : total de tous les véhicules
-        cout_entretien_total = sum(v.cout_entretien_annuel for v in self.parc.vehicules)
+            # Coût d'entretien : total de tous les véhicules
+            cout_entretien_total = sum(v.cout_entretien_annuel for v in self.parc.vehicules)
 
-        # Rentabilité
-        rentabilite = revenus - cout_entretien_total
+            # Rentabilité
+            rentabilite = revenus - cout_entretien_total
 
         # Mise à jour des labels
         self.revenus_label.setText(f"💰 Revenus annuels : {revenus:.2f} €")
@@ -133,8 +133,13 @@ class CreateAccScreen(QDialog):
 
 
 class VehiculesScreen(QDialog):
-    def __init__(self):
+    # colonnes lues en base pour le tableau (Database.projeter_vehicules)
+    _ATTRIBUTS = ("id", "type", "marque", "modele", "annee",
+                  "kilometrage", "prix_achat", "cout_entretien_annuel")
+
+    def __init__(self, db=None):
         super().__init__()
+        self.db = db
         self.setWindowTitle("Visualisation des Véhicules")
         self.setFixedSize(1200, 800)
 
@@ -162,7 +167,17 @@ class VehiculesScreen(QDialog):
         layout.addLayout(btn_layout)
 
         self.setLayout(layout)
-        # (chargement BD identique à avant…)
+        self.charger_vehicules()
+
+    def charger_vehicules(self):
+        """Remplit le tableau avec les seules colonnes affichées (sans construire les véhicules)"""
+        if self.db is None:
+            return
+        vehicules = self.db.projeter_vehicules(self._ATTRIBUTS)
+        self.table.setRowCount(len(vehicules))
+        for row, vehicule in enumerate(vehicules):
+            for col, valeur in enumerate(vehicule):
+                self.table.setItem(row, col, QtWidgets.QTableWidgetItem(str(valeur)))
 
     def goToWelcome(self):
         widget.setCurrentIndex(Screen.WELCOME)
@@ -178,10 +193,10 @@ widget.setFixedSize(1200, 800)
 welcome_screen = WelcomeScreen()
 login_screen = LoginScreen()
 create_acc_screen = CreateAccScreen()
-vehicules_screen = VehiculesScreen()
-reservation_screen = ReservationScreen()    
+reservation_screen = ReservationScreen()
+vehicules_screen = VehiculesScreen(reservation_screen.db)
 
-bilan_screen = BilanScreen(reservation_screen.parc_controller.parc)
+bilan_screen = BilanScreen(reservation_screen.parc_controller.parc, reservation_screen.parc_controller.db)
 
 screens = [
     welcome_screen,
@@ -23,6 +23,18 @@ from PyQt5.uic import loadUi
 
 
 class ReservationScreen(QDialog):
+    # colonnes du tableau des véhicules et colonnes lues en base (Database.projeter_vehicules)
+    _COLONNES_TABLEAU = {
+        "Voiture": ["ID", "Marque", "Modèle", "Année", "Carburant", "Puissance", "Places", "Disponible"],
+        "Utilitaire": ["ID", "Marque", "Modèle", "Année", "Volume", "Charge utile", "Hayon", "Disponible"],
+        "Moto": ["ID", "Marque", "Modèle", "Année", "Cylindrée", "Type", "Disponible"],
+    }
+    _ATTRIBUTS_TABLEAU = {
+        "Voiture": ("id", "marque", "modele", "annee", "carburant", "puissance", "nb_places", "disponible"),
+        "Utilitaire": ("id", "marque", "modele", "annee", "volume", "charge_utile", "hayon", "disponible"),
+        "Moto": ("id", "marque", "modele", "annee", "cylindree", "type_moto", "disponible"),
+    }
+
     def __init__(self):
         super(ReservationScreen, self).__init__()
         loadUi('reservation.ui', self)
@@ -96,21 +108,13 @@ class ReservationScreen(QDialog):
             # print(f"DEBUG: Recherche pour véhicule type {type_vehicule}, dates {datetime_debut} à {datetime_fin}")
             # print(f"DEBUG: Nombre total de réservations dans le parc: {len(self.parc_controller.parc.reservations)}")
 
-            # Filtrage selon la checkbox
-            if self.showUnavailableBox.isChecked():
-                # Afficher tous les véhicules (disponibles + indisponibles)
-                # print("DEBUG: Affichage de tous les véhicules (disponibles + indisponibles)")
-                tous_vehicules = self.parc_controller.rechercher_vehicules(criteres={"type": type_vehicule})
-                vehicules_a_afficher = []
-                for v in tous_vehicules:
-                    if self._correspond_criteres(v, criteres):
-                        vehicules_a_afficher.append(v)
-            else:
-                # Afficher seulement les disponibles (comportement actuel)
-                # print("DEBUG: Affichage seulement des véhicules disponibles")
-                vehicules_a_afficher = self.parc_controller.verifier_disponibilite(
-                    type_vehicule, criteres, datetime_debut, datetime_fin
-                )
+            # seules les colonnes du tableau sont lues, disponibilité comprise (calculée en base)
+            criteres["type"] = type_vehicule
+            vehicules_a_afficher = self.parc_controller.projeter_vehicules(
+                self._ATTRIBUTS_TABLEAU[type_vehicule], criteres, datetime_debut, datetime_fin,
+                # la checkbox affiche aussi les véhicules indisponibles
+                disponibles_seulement=not self.showUnavailableBox.isChecked()
+            )
 
             if not vehicules_a_afficher:
                 QMessageBox.information(self, "Aucun résultat", "Aucun véhicule trouvé pour ces critères.")
@@ -187,29 +191,6 @@ class ReservationScreen(QDialog):
             self._afficher_message_prix(f"❌ Erreur: {str(e)}", "red")
             print(f"Erreur calcul devis: {e}")
 
-    def _correspond_criteres(self, vehicule, criteres):
-        """Vérifie si un véhicule correspond aux critères (copie de la logique du parc)"""
-        if not criteres:
-            return True
-
-        for cle, valeur in criteres.items():
-            if not hasattr(vehicule, cle):
-                return False
-            attr_valeur = getattr(vehicule, cle)
-
-            if isinstance(valeur, dict):
-                if "min" in valeur and attr_valeur < valeur["min"]:
-                    return False
-                if "max" in valeur and attr_valeur > valeur["max"]:
-                    return False
-            elif isinstance(attr_valeur, list) and isinstance(valeur, str):
-                if valeur not in attr_valeur:
-                    return False
-            elif attr_valeur != valeur:
-                return False
-
-        return True
-
     def _afficher_message_prix(self, message, couleur):
         """Affiche le message de prix"""
         # Option 1: Si vous avez un label dans votre .ui
@@ -226,17 +207,9 @@ class ReservationScreen(QDialog):
         print(f"PRIX: {message}")
 
     def _afficher_vehicules(self, vehicules, type_vehicule):
-        """Affiche les véhicules dans le tableau"""
-        # Détermination des colonnes selon le type de véhicule
-        if type_vehicule == "Voiture":
-            colonnes = ["ID", "Marque", "Modèle", "Année", "Carburant", "Puissance", "Places", "Disponible"]
-            attributs = ["id", "marque", "modele", "annee", "carburant", "puissance", "nb_places", "disponible"]
-        elif type_vehicule == "Utilitaire":
-            colonnes = ["ID", "Marque", "Modèle", "Année", "Volume", "Charge utile", "Hayon", "Disponible"]
-            attributs = ["id", "marque", "modele", "annee", "volume", "charge_utile", "hayon", "disponible"]
-        elif type_vehicule == "Moto":
-            colonnes = ["ID", "Marque", "Modèle", "Année", "Cylindrée", "Type", "Disponible"]
-            attributs = ["id", "marque", "modele", "annee", "cylindree", "type", "disponible"]
+        """Affiche les véhicules (projections de _ATTRIBUTS_TABLEAU) dans le tableau"""
+        colonnes = self._COLONNES_TABLEAU[type_vehicule]
+        attributs = self._ATTRIBUTS_TABLEAU[type_vehicule]
 
         # Configuration du tableau
         self.tableWidget.setRowCount(0)
@@ -244,32 +217,19 @@ class ReservationScreen(QDialog):
         self.tableWidget.setHorizontalHeaderLabels(colonnes)
         self.tableWidget.horizontalHeader().setStretchLastSection(True)
 
-        # Récupération des dates pour vérifier disponibilité
-        date_debut = self.startDate.date().toPyDate()
-        date_fin = self.endDate.date().toPyDate()
-        datetime_debut = datetime.combine(date_debut, datetime.min.time())
-        datetime_fin = datetime.combine(date_fin, datetime.min.time())
-
         # Ajout des véhicules au tableau
         for vehicule in vehicules:
             row = self.tableWidget.rowCount()
             self.tableWidget.insertRow(row)
 
             for col, attribut in enumerate(attributs):
+                valeur = getattr(vehicule, attribut)
                 if attribut == "disponible":
-                    # Vérification de disponibilité
-                    disponible = self.parc_controller.verifier_disponibilite_vehicule(
-                        vehicule.id, datetime_debut, datetime_fin
-                    )
-                    statut = "✅ Disponible" if disponible else "❌ Occupée"
-                    item = QTableWidgetItem(statut)
-                elif attribut:
-                    valeur = getattr(vehicule, attribut, "")
-                    if attribut == "hayon":
-                        valeur = "Oui" if valeur else "Non"
-                    item = QTableWidgetItem(str(valeur))
+                    item = QTableWidgetItem("✅ Disponible" if valeur else "❌ Occupée")
+                elif attribut == "hayon":
+                    item = QTableWidgetItem("Oui" if valeur else "Non")
                 else:
-                    item = QTableWidgetItem("")
+                    item = QTableWidgetItem(str(valeur))
 
                 item.setFlags(Qt.ItemIsEnabled | Qt.ItemIsSelectable)
                 self.tableWidget.setItem(row, col, item)
@@ -281,7 +241,7 @@ class ReservationScreen(QDialog):
 
     def goToBilan(self):
         from bilan_screen import BilanScreen
-        bilan = BilanScreen(self.parc_controller.parc)
+        bilan = BilanScreen(self.parc_controller.parc, self.parc_controller.db)
         bilan.exec_()
 
     def reserver(self):
@@ -325,8 +285,9 @@ class ReservationScreen(QDialog):
 
             # Sélection du client
             try:
-                clients_disponibles = self.client_controller.lister_tous_clients() if hasattr(self,
-                                                                                              'client_controller') and self.client_controller else []
+                # seuls les noms sont affichés : ni objet Client ni historique des réservations
+                clients_disponibles = self.client_controller.projeter_clients(("id", "nom", "prenom")) if hasattr(
+                    self, 'client_controller') and self.client_controller else []
 
                 if not clients_disponibles:
                     client_id, ok = QInputDialog.getInt(